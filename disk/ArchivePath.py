@@ -0,0 +1,380 @@
+from .pickle_function import unpickle_file
+from .individual_functions import is_nameless
+from .individual_functions import get_size_and_unit
+from .exceptions import ReadOnlyError
+import io
+import os
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from zipfile import ZipFile
+
+
+# ZipArchive keeps a zip file open and uses its central directory as an index of members and directories
+class ZipArchive:
+	def __init__(self, path):
+		"""
+		:type path: str
+		"""
+		self._path = path
+		self._zip_file = ZipFile(file=path, mode='r')
+		self._infos = {info.filename.rstrip('/'): info for info in self._zip_file.infolist()}
+		self._children = None
+		self._lock = Lock()
+
+	def __repr__(self):
+		return f'<ZipArchive:{self._path} - {len(self._infos)} members>'
+
+	def __str__(self):
+		return repr(self)
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	def close(self):
+		self._zip_file.close()
+
+	def _get_children(self):
+		"""
+		archives made by zip_directory have no entries for directories so they are derived from the member names
+		:rtype: dict[str, set[str]]
+		"""
+		with self._lock:
+			if self._children is None:
+				children = {'': set()}
+				for name in self._infos:
+					parent, _, child = name.rpartition('/')
+					while True:
+						if parent in children:
+							children[parent].add(child)
+							break
+						children[parent] = {child}
+						parent, _, child = parent.rpartition('/')
+				for name, info in self._infos.items():
+					if info.is_dir():
+						children.setdefault(name, set())
+				self._children = children
+			return self._children
+
+	def list_names(self):
+		"""
+		:return: the names of all file members
+		:rtype: list[str]
+		"""
+		return [name for name, info in self._infos.items() if not info.is_dir()]
+
+	def get_info(self, name):
+		"""
+		:type name: str
+		:rtype: zipfile.ZipInfo or NoneType
+		"""
+		info = self._infos.get(name)
+		if info is None or info.is_dir():
+			return None
+		return info
+
+	def is_directory(self, name):
+		"""
+		:type name: str
+		:rtype: bool
+		"""
+		return name in self._get_children()
+
+	def list(self, name):
+		"""
+		:type name: str
+		:return: names of the children of a directory
+		:rtype: list[str]
+		"""
+		return sorted(self._get_children().get(name, ()))
+
+	def open(self, name):
+		"""
+		:type name: str
+		:rtype: zipfile.ZipExtFile
+		"""
+		info = self.get_info(name=name)
+		if info is None:
+			raise FileNotFoundError(f'"{name}" is not a file in {self._path}')
+		return self._zip_file.open(info, mode='r')
+
+
+_MAX_OPEN_ARCHIVES = 32
+_archives = OrderedDict()
+_archives_lock = Lock()
+
+
+def get_zip_archive(path):
+	"""
+	returns an open archive from a cache of recently used ones, an archive that changed on disk is opened again
+	:type path: str
+	:rtype: ZipArchive
+	"""
+	path = os.path.abspath(path)
+	stat_result = os.stat(path)
+	signature = stat_result.st_size, stat_result.st_mtime_ns
+	with _archives_lock:
+		cached = _archives.get(path)
+		if cached is not None and cached[0] == signature:
+			_archives.move_to_end(path)
+			return cached[1]
+
+	archive = ZipArchive(path=path)
+	with _archives_lock:
+		if cached is not None:
+			_archives.pop(path, None)
+			# members that are being read keep the file open until they are closed
+			cached[1].close()
+		_archives[path] = (signature, archive)
+		while len(_archives) > _MAX_OPEN_ARCHIVES:
+			_, (_, evicted) = _archives.popitem(last=False)
+			evicted.close()
+	return archive
+
+
+def close_zip_archives():
+	with _archives_lock:
+		for _, archive in _archives.values():
+			archive.close()
+		_archives.clear()
+
+
+# ArchivePath is a read-only Path for a file or directory inside a zip file, members are read without extraction
+class ArchivePath:
+	def __init__(self, zip_path, name=''):
+		"""
+		:param str zip_path: the zip file
+		:param str name: the path of the member inside the archive, '' is the root of the archive
+		"""
+		if not isinstance(zip_path, str):
+			zip_path = zip_path.path
+		self._zip_path = os.path.abspath(zip_path)
+		self._name = name.strip('/')
+
+	def __repr__(self):
+		return f'<ArchivePath:{self.path}>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __getstate__(self):
+		return self._zip_path, self._name
+
+	def __setstate__(self, state):
+		self._zip_path, self._name = state
+
+	def __eq__(self, other):
+		if not isinstance(other, ArchivePath):
+			return NotImplemented
+		return self._zip_path == other._zip_path and self._name == other._name
+
+	def __hash__(self):
+		return hash((self._zip_path, self._name))
+
+	def __truediv__(self, other):
+		"""
+		:type other: str
+		:rtype: ArchivePath
+		"""
+		other = other.replace(os.sep, '/').strip('/')
+		name = f'{self._name}/{other}' if self._name else other
+		return self.__class__(zip_path=self._zip_path, name=name)
+
+	def __add__(self, other):
+		"""
+		:type other: str
+		:rtype: ArchivePath
+		"""
+		if other.startswith('.'):  # other is an extension
+			return self.__class__(zip_path=self._zip_path, name=f'{self._name}{other}')
+		else:
+			return self.__truediv__(other)
+
+	@property
+	def archive(self):
+		"""
+		:rtype: ZipArchive
+		"""
+		return get_zip_archive(path=self._zip_path)
+
+	@property
+	def zip_path(self):
+		"""
+		:rtype: str
+		"""
+		return self._zip_path
+
+	@property
+	def name_in_archive(self):
+		"""
+		:rtype: str
+		"""
+		return self._name
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		if self._name:
+			return f'{self._zip_path}/{self._name}'
+		else:
+			return self._zip_path
+
+	@property
+	def name_and_extension(self):
+		"""
+		:rtype: str
+		"""
+		return self._name.rpartition('/')[2]
+
+	@property
+	def name(self):
+		"""
+		:rtype: str
+		"""
+		return self.name_and_extension.rsplit('.', 1)[0]
+
+	@property
+	def extension(self):
+		"""
+		:rtype: str
+		"""
+		return os.path.splitext(self.name_and_extension)[1][1:]
+
+	@property
+	def parent_directory(self):
+		"""
+		:rtype: ArchivePath
+		"""
+		return self.__class__(zip_path=self._zip_path, name=self._name.rpartition('/')[0])
+
+	def is_file(self):
+		"""
+		:rtype: bool
+		"""
+		return self.archive.get_info(name=self._name) is not None
+
+	def is_directory(self):
+		"""
+		:rtype: bool
+		"""
+		return self.archive.is_directory(name=self._name)
+
+	def exists(self):
+		"""
+		:rtype: bool
+		"""
+		return self.is_file() or self.is_directory()
+
+	@property
+	def type(self):
+		"""
+		:rtype: str
+		"""
+		if self.is_file():
+			return 'file'
+		elif self.is_directory():
+			return 'directory'
+		else:
+			return 'nonexistent path'
+
+	def _get_info(self):
+		info = self.archive.get_info(name=self._name)
+		if info is None:
+			raise FileNotFoundError(f'{self.path} is not a file!')
+		return info
+
+	@property
+	def size_bytes(self):
+		"""
+		:return: the size of the file after decompression
+		:rtype: int
+		"""
+		return self._get_info().file_size
+
+	@property
+	def compressed_size_bytes(self):
+		"""
+		:rtype: int
+		"""
+		return self._get_info().compress_size
+
+	def get_size(self, binary=True):
+		"""
+		:return: the size after decompression and its unit, the same as Path.get_size
+		:rtype: tuple
+		"""
+		return get_size_and_unit(size_bytes=self.size_bytes, binary=binary)
+
+	@property
+	def modification_date(self):
+		"""
+		:rtype: float
+		"""
+		return datetime(*self._get_info().date_time).timestamp()
+
+	def list(self):
+		"""
+		:rtype: list[ArchivePath]
+		"""
+		return [self / name for name in self.archive.list(name=self._name) if not is_nameless(name=name)]
+
+	ls = list
+	dir = list
+
+	@property
+	def files(self):
+		"""
+		:rtype: list[ArchivePath]
+		"""
+		return [path for path in self.list() if path.is_file()]
+
+	@property
+	def directories(self):
+		"""
+		:rtype: list[ArchivePath]
+		"""
+		return [path for path in self.list() if path.is_directory()]
+
+	def open(self, encoding=None):
+		"""
+		:param str or NoneType encoding: if provided, the member is opened as text
+		:rtype: zipfile.ZipExtFile or io.TextIOWrapper
+		"""
+		file = self.archive.open(name=self._name)
+		if encoding is None:
+			return file
+		return io.TextIOWrapper(file, encoding=encoding)
+
+	def read_bytes(self):
+		"""
+		:rtype: bytes
+		"""
+		with self.open() as file:
+			return file.read()
+
+	def read_lines(self, encoding='utf8'):
+		"""
+		:rtype: list[str]
+		"""
+		with self.open(encoding=encoding) as file:
+			return file.readlines()
+
+	def load(self, method='pickle', echo=0):
+		"""
+		:param str method: pickle or dill
+		:rtype: object
+		"""
+		with self.open() as file:
+			return unpickle_file(file=file, method=method, echo=echo, name=self.path)
+
+	def save(self, *args, **kwargs):
+		raise ReadOnlyError(f'{self.path} is inside an archive and cannot be written to')
+
+	def delete(self, *args, **kwargs):
+		raise ReadOnlyError(f'{self.path} is inside an archive and cannot be deleted')
@@ -0,0 +1,236 @@
+from .Path import Path
+from .parallel import get_num_workers
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+
+# asyncio.get_running_loop is new in Python 3.7, before it get_event_loop returned the running loop in a coroutine
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+	"""
+	:return: the thread pool shared by all AsyncPaths, it is created when it is first needed
+	:rtype: ThreadPoolExecutor
+	"""
+	global _executor
+	with _executor_lock:
+		if _executor is None:
+			_executor = ThreadPoolExecutor(max_workers=get_num_workers(None), thread_name_prefix='disk')
+		return _executor
+
+
+def set_executor_size(num_workers):
+	"""
+	replaces the shared thread pool, which bounds how many blocking operations run at the same time
+	:type num_workers: int
+	"""
+	global _executor
+	with _executor_lock:
+		old_executor = _executor
+		_executor = ThreadPoolExecutor(max_workers=get_num_workers(num_workers), thread_name_prefix='disk')
+	if old_executor is not None:
+		old_executor.shutdown(wait=False)
+
+
+def _get_batch(iterator, size):
+	"""
+	:type iterator: collections.Iterator
+	:type size: int
+	:rtype: list
+	"""
+	batch = []
+	for item in iterator:
+		batch.append(item)
+		if len(batch) >= size:
+			break
+	return batch
+
+
+# AsyncPath runs the blocking operations of a Path on a shared thread pool so an event loop never waits for the disk
+class AsyncPath:
+	def __init__(self, path):
+		"""
+		:type path: str or Path or AsyncPath
+		"""
+		if isinstance(path, self.__class__):
+			path = path.path
+		elif not isinstance(path, Path):
+			path = Path(path=path)
+		self._path = path
+
+	def __repr__(self):
+		return f'<AsyncPath:{self._path.path}>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __truediv__(self, other):
+		return self.__class__(path=self._path / other)
+
+	@property
+	def path(self):
+		"""
+		:return: the blocking Path
+		:rtype: Path
+		"""
+		return self._path
+
+	@property
+	def name_and_extension(self):
+		"""
+		:rtype: str
+		"""
+		return self._path.name_and_extension
+
+	@property
+	def absolute_path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path.absolute_path
+
+	@staticmethod
+	async def _run(function, *args, **kwargs):
+		loop = _get_running_loop()
+		return await loop.run_in_executor(get_executor(), functools.partial(function, *args, **kwargs))
+
+	async def exists(self):
+		"""
+		:rtype: bool
+		"""
+		return await self._run(self._path.exists)
+
+	async def is_file(self):
+		"""
+		:rtype: bool
+		"""
+		return await self._run(self._path.is_file)
+
+	async def stat(self, ttl=None, refresh=False):
+		"""
+		:rtype: StatSnapshot
+		"""
+		return await self._run(self._path.stat, ttl=ttl, refresh=refresh)
+
+	async def get_size_bytes(self, num_workers=None):
+		"""
+		:rtype: int
+		"""
+		return await self._run(self._path.get_size_bytes, num_workers=num_workers)
+
+	async def list(self):
+		"""
+		:rtype: list[AsyncPath]
+		"""
+		return [self.__class__(path=x) for x in await self._run(self._path.list)]
+
+	async def read_bytes(self, name=None):
+		"""
+		:rtype: bytes
+		"""
+		return await self._run(self._path.read_bytes, name=name)
+
+	async def read_lines(self, name=None, encoding='utf8'):
+		"""
+		:rtype: list[str]
+		"""
+		return await self._run(self._path.read_lines, name=name, encoding=encoding)
+
+	async def write(self, text, name=None, encoding='utf8'):
+		await self._run(self._path.write, text=text, name=name, encoding=encoding)
+
+	async def write_lines(self, lines, name=None, append=False, encoding='utf8'):
+		await self._run(self._path.write_lines, lines=lines, name=name, append=append, encoding=encoding)
+
+	async def save(self, obj, method='pickle', mode='wb', echo=0):
+		"""
+		:rtype: str
+		"""
+		return await self._run(self._path.save, obj=obj, method=method, mode=mode, echo=echo)
+
+	async def load(self, method='pickle', mode='rb', echo=0):
+		"""
+		:rtype: object
+		"""
+		return await self._run(self._path.load, method=method, mode=mode, echo=echo)
+
+	async def copy(self, new_path=None, new_directory=None, clean_copy=True, num_workers=None, echo=0):
+		"""
+		:type new_path: str or Path or AsyncPath
+		:type new_directory: str or Path or AsyncPath
+		:rtype: AsyncPath
+		"""
+		if isinstance(new_path, AsyncPath):
+			new_path = new_path.path.path
+		if isinstance(new_directory, AsyncPath):
+			new_directory = new_directory.path.path
+		result = await self._run(
+			self._path.copy, new_path=new_path, new_directory=new_directory, clean_copy=clean_copy,
+			num_workers=num_workers, echo=echo
+		)
+		return self.__class__(path=result)
+
+	async def delete(self, name=None, method=None, num_workers=None, echo=0):
+		await self._run(self._path.delete, name=name, method=method, num_workers=num_workers, echo=echo)
+
+	async def make_directory(self, name=None, ignore_if_exists=True, echo=0):
+		"""
+		:rtype: AsyncPath
+		"""
+		result = await self._run(self._path.make_directory, name=name, ignore_if_exists=ignore_if_exists, echo=echo)
+		return self.__class__(path=result)
+
+	async def walk(
+			self, max_depth=None, include=None, exclude=None, sort=True, files=True, directories=True,
+			follow_symlinks=False, batch_size=256
+	):
+		"""
+		asynchronously iterates over Path.walk, the walk is advanced on the thread pool one batch at a time
+		:param int batch_size: number of paths read from the disk in each trip to the thread pool
+		:rtype: collections.AsyncIterable[AsyncPath]
+		"""
+		iterator = self._path.walk(
+			max_depth=max_depth, include=include, exclude=exclude, sort=sort, files=files, directories=directories,
+			follow_symlinks=follow_symlinks
+		)
+		loop = _get_running_loop()
+		future = None
+		try:
+			while True:
+				future = loop.run_in_executor(
+					get_executor(), functools.partial(_get_batch, iterator=iterator, size=batch_size)
+				)
+				# if the walk is cancelled, the batch keeps being read on the pool instead of being abandoned
+				batch = await asyncio.shield(future)
+				future = None
+				if not batch:
+					break
+				for path in batch:
+					yield self.__class__(path=path)
+		finally:
+			# a generator cannot be closed while a thread is advancing it, so the batch is waited for
+			# and the generator is closed on the pool as well
+			if future is not None:
+				await asyncio.wait([future])
+			await self._run(iterator.close)
+
+	def iter_files(self, max_depth=None, include=None, exclude=None, sort=True, follow_symlinks=False, batch_size=256):
+		"""
+		:rtype: collections.AsyncIterable[AsyncPath]
+		"""
+		return self.walk(
+			max_depth=max_depth, include=include, exclude=exclude, sort=sort, files=True, directories=False,
+			follow_symlinks=follow_symlinks, batch_size=batch_size
+		)
+
+	ls = list
+	dir = list
+	mkdir = make_directory
+	pickle = save
+	unpickle = load
@@ -1,4 +1,6 @@
 from .HardFolder import HardFolder
+from .HardFolder import ArchivedHardFolder
+from .exceptions import ReadOnlyError
 
 import atexit
 import functools
@@ -36,7 +38,7 @@ class Cache:
 
 		if isinstance(path, self.__class__):
 			children = path.children.copy()
-			path = path.path
+			path = path.hard_folder if isinstance(path.hard_folder, ArchivedHardFolder) else path.path
 		else:
 			children = {}
 
@@ -45,10 +47,15 @@ class Cache:
 		}
 		self._children = children
 
-		self._hard_folder = HardFolder(path=path)
-		atexit.register(self.hard_folder.save_keys)
+		if isinstance(path, ArchivedHardFolder):
+			# an archive is never written to so there are no keys to save
+			self._hard_folder = path
+		else:
+			self._hard_folder = HardFolder(path=path)
+			atexit.register(self.hard_folder.save_keys)
 
 	_STATE_ATTRIBUTES_ = ['_stats', '_children', '_hard_folder']
+	_CHILDREN_KEY_ = '_cache_children_'
 
 	@property
 	def children(self):
@@ -57,27 +64,61 @@ class Cache:
 		"""
 		return self._children
 
-	def zip(self, zip_path=None, delete_directory=False, compression=ZIP_DEFLATED, echo=0):
-		self['_cache_children_'] = self._children
-		return self.hard_folder.zip(delete_directory=delete_directory, compression=compression, zip_path=zip_path, echo=echo)
+	def zip(
+			self, zip_path=None, delete_directory=False, compression=ZIP_DEFLATED, echo=0, num_workers=None,
+			compression_level=None, incremental=False
+	):
+		self[self._CHILDREN_KEY_] = self._children
+		self._save_children_keys()
+		return self.hard_folder.zip(
+			delete_directory=delete_directory, compression=compression, zip_path=zip_path, echo=echo,
+			num_workers=num_workers, compression_level=compression_level, incremental=incremental
+		)
 
 	@classmethod
-	def from_zip(cls, path, unzip_path=None, delete_original=False):
+	def from_zip(cls, path, unzip_path=None, delete_original=False, num_workers=None, echo=0, extract=True):
 		"""
 		:type path: str or Path or HardFolder or Cache
 		:type unzip_path: str or Path
 		:type delete_original: bool
+		:param int or NoneType num_workers: number of threads extracting the files
+		:param bool extract: if False, nothing is extracted and the read-only cache reads items from the zip
 		:rtype: Cache
 		"""
-		hard_folder = HardFolder.from_zip(path=path, delete_original=delete_original, unzip_path=unzip_path)
+		hard_folder = HardFolder.from_zip(
+			path=path, delete_original=delete_original, unzip_path=unzip_path, num_workers=num_workers, echo=echo,
+			extract=extract
+		)
 		result = cls(path=hard_folder)
-		result._children = result['_cache_children_']
+		if not extract:
+			# loading the pickled children would make their directories again, so they are rebuilt from the
+			# folders in the archive; the key stays because the archive cannot be changed and is hidden instead
+			result._children = result._get_archived_children()
+			return result
+		result._children = result[cls._CHILDREN_KEY_]
 		try:
-			del result['_cache_children_']
+			del result[cls._CHILDREN_KEY_]
 		except Exception as e:
 			print(e)
 		return result
 
+	def _save_children_keys(self):
+		for child in self._children.values():
+			child.hard_folder.save_keys()
+			child._save_children_keys()
+
+	def _get_archived_children(self):
+		"""
+		a hard folder only holds files, so every directory in it is the folder of a child cache
+		:rtype: dict[str, Cache]
+		"""
+		children = {}
+		for sub_directory in self.path.directories:
+			child = self.__class__(path=ArchivedHardFolder(path=sub_directory))
+			child._children = child._get_archived_children()
+			children[sub_directory.path] = child
+		return children
+
 	def __getstate__(self):
 		return {key: getattr(self, key) for key in self._STATE_ATTRIBUTES_}
 
@@ -88,6 +129,13 @@ class Cache:
 	def __hashkey__(self):
 		return self.__class__.__name__, self._hard_folder.__hashkey__()
 
+	@property
+	def is_read_only(self):
+		"""
+		:rtype: bool
+		"""
+		return isinstance(self._hard_folder, ArchivedHardFolder)
+
 	@property
 	def hard_folder(self):
 		"""
@@ -96,7 +144,8 @@ class Cache:
 		return self._hard_folder
 
 	def __del__(self):
-		self.hard_folder.save_keys()
+		if not self.is_read_only:
+			self.hard_folder.save_keys()
 
 	def __getitem__(self, item):
 		try:
@@ -117,8 +166,13 @@ class Cache:
 		self._stats['set_success'] += 1
 
 	def __contains__(self, item):
+		if isinstance(item, str) and item == self._CHILDREN_KEY_:
+			return False
 		return item in self._hard_folder
 
+	def keys(self):
+		return [key for key in self._hard_folder.keys() if not (isinstance(key, str) and key == self._CHILDREN_KEY_)]
+
 	def __delitem__(self, key):
 
 		if key in self._hard_folder:
@@ -166,6 +220,8 @@ class Cache:
 			sub_path = self.path + sub_directory
 			if sub_path.path in self._children:
 				sub_cache = self._children[sub_path.path]
+			elif self.is_read_only:
+				sub_cache = self.__class__(path=ArchivedHardFolder(path=sub_path))
 			else:
 				sub_cache = self.__class__(path=sub_path.path)
 			self._children[sub_path.path] = sub_cache
@@ -262,10 +318,14 @@ def make_cached(
 				should_save_in_cache = False
 
 		if should_save_in_cache:
-			if expire_in is not None:
-				cache[key] = TimedObject(obj=result)
-			else:
-				cache[key] = result
+			# a cache read from an archive returns what it has and only computes the rest
+			try:
+				if expire_in is not None:
+					cache[key] = TimedObject(obj=result)
+				else:
+					cache[key] = result
+			except ReadOnlyError:
+				pass
 
 		return result
 	wrapper.cache = cache
@@ -0,0 +1,357 @@
+from .Path import Path
+from .individual_functions import is_nameless
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+from datetime import timedelta
+from threading import Lock
+from time import time
+
+
+# the files sqlite keeps next to a database while it is written to
+_DATABASE_SUFFIXES = ('', '-journal', '-wal', '-shm')
+
+_SCHEMA = (
+	'CREATE TABLE IF NOT EXISTS directories (path TEXT PRIMARY KEY, modification_time_ns INTEGER NOT NULL)',
+	'CREATE TABLE IF NOT EXISTS entries ('
+	'path TEXT PRIMARY KEY, parent TEXT NOT NULL, name TEXT NOT NULL, extension TEXT NOT NULL, '
+	'is_directory INTEGER NOT NULL, size_bytes INTEGER NOT NULL, modification_time_ns INTEGER NOT NULL)',
+	'CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent)',
+	'CREATE INDEX IF NOT EXISTS entries_name ON entries (name)',
+	'CREATE INDEX IF NOT EXISTS entries_extension ON entries (extension, size_bytes)',
+	'CREATE INDEX IF NOT EXISTS entries_size ON entries (size_bytes)',
+	'CREATE INDEX IF NOT EXISTS entries_modification_time ON entries (modification_time_ns)'
+)
+
+
+def get_default_index_path(root):
+	"""
+	indexes are kept in the cache directory of the user rather than in the trees they index, because writing
+	a database inside the root would change the modification time of the root and it would be scanned every time
+	:param str root: the absolute path of the indexed directory
+	:rtype: str
+	"""
+	cache_directory = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+	name = hashlib.sha1(root.encode('utf-8', 'surrogateescape')).hexdigest()
+	return os.path.join(cache_directory, 'disk', 'indexes', f'{name}.sqlite')
+
+
+def _get_time_ns(value):
+	"""
+	:type value: datetime or float or int
+	:return: nanoseconds since the epoch
+	:rtype: int
+	"""
+	if isinstance(value, datetime):
+		value = value.timestamp()
+	return int(value * 1e9)
+
+
+def _get_seconds(value):
+	"""
+	:type value: timedelta or float or int
+	:rtype: float
+	"""
+	if isinstance(value, timedelta):
+		return value.total_seconds()
+	return value
+
+
+def _get_subtree_range(relative_path):
+	"""
+	every path under a directory is between "directory/" and the directory followed by the character after the separator
+	:type relative_path: str
+	:rtype: tuple[str, str]
+	"""
+	return relative_path + os.sep, relative_path + chr(ord(os.sep) + 1)
+
+
+# DirectoryIndex keeps the entries of a directory tree in an sqlite database so they can be queried without the disk
+class DirectoryIndex:
+	def __init__(self, root, path=None):
+		"""
+		:param str root: the directory that is indexed
+		:param str or NoneType path: the database file, by default it is kept in the cache directory of the user;
+		a database inside the root is left out of the index but it changes the modification time of its directory
+		"""
+		self._root = os.path.abspath(root)
+		if path is None:
+			path = get_default_index_path(root=self._root)
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+		self._path = path
+		self._database_files = {os.path.abspath(path) + suffix for suffix in _DATABASE_SUFFIXES}
+		# the connection can be used by any thread, one at a time
+		self._connection = sqlite3.connect(path, check_same_thread=False)
+		self._lock = Lock()
+		with self._lock, self._connection:
+			for statement in _SCHEMA:
+				self._connection.execute(statement)
+
+	def __repr__(self):
+		return f'<DirectoryIndex:{self._root} - {self.count(directories=True)} entries>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+	@property
+	def root(self):
+		"""
+		:rtype: str
+		"""
+		return self._root
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	def close(self):
+		with self._lock:
+			self._connection.close()
+
+	def _get_absolute_path(self, relative_path):
+		"""
+		:type relative_path: str
+		:rtype: str
+		"""
+		if relative_path:
+			return os.path.join(self._root, relative_path)
+		else:
+			return self._root
+
+	def _remove_tree(self, relative_path):
+		"""
+		removes an entry and, if it was a directory, everything under it
+		:type relative_path: str
+		"""
+		lower, upper = _get_subtree_range(relative_path)
+		for table in ('entries', 'directories'):
+			self._connection.execute(
+				f'DELETE FROM {table} WHERE path = ? OR (path >= ? AND path < ?)', (relative_path, lower, upper)
+			)
+
+	def _get_subdirectories(self, relative_path):
+		"""
+		:type relative_path: str
+		:rtype: list[str]
+		"""
+		cursor = self._connection.execute(
+			'SELECT path FROM entries WHERE parent = ? AND is_directory = 1', (relative_path,)
+		)
+		return [row[0] for row in cursor]
+
+	def _scan_directory(self, relative_path, modification_time_ns):
+		"""
+		replaces the indexed children of one directory with what is on the disk now
+		:type relative_path: str
+		:type modification_time_ns: int
+		:return: the relative paths of the subdirectories
+		:rtype: list[str]
+		"""
+		rows = []
+		subdirectories = []
+		with os.scandir(self._get_absolute_path(relative_path)) as entries:
+			for entry in entries:
+				if is_nameless(entry.name) or os.path.abspath(entry.path) in self._database_files:
+					continue
+				child = os.path.join(relative_path, entry.name) if relative_path else entry.name
+				try:
+					# symlinked directories are not followed, the same as the size engine
+					if entry.is_dir(follow_symlinks=False):
+						is_directory = True
+						stat_result = entry.stat(follow_symlinks=False)
+					elif entry.is_file():
+						is_directory = False
+						stat_result = entry.stat()
+					else:
+						continue
+				except OSError:
+					continue
+
+				extension = os.path.splitext(entry.name)[1][1:]
+				rows.append((
+					child, relative_path, entry.name, extension, int(is_directory),
+					0 if is_directory else stat_result.st_size, stat_result.st_mtime_ns
+				))
+				if is_directory:
+					subdirectories.append(child)
+
+		current = {row[0]: row[4] for row in rows}
+		cursor = self._connection.execute('SELECT path, is_directory FROM entries WHERE parent = ?', (relative_path,))
+		for child, was_directory in cursor.fetchall():
+			if child not in current or (was_directory and not current[child]):
+				self._remove_tree(child)
+
+		self._connection.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+		self._connection.execute(
+			'INSERT OR REPLACE INTO directories VALUES (?, ?)', (relative_path, modification_time_ns)
+		)
+		return subdirectories
+
+	def update(self, full=False):
+		"""
+		brings the index up to date, only the directories whose modification time changed are scanned again
+		a file that is rewritten in place does not change the time of its directory,
+		its size and modification time are refreshed when that directory changes or when full is True
+		:param bool full: if True, every directory is scanned
+		:rtype: DirectoryIndex
+		"""
+		if not os.path.isdir(self._root):
+			raise ValueError(f'The path "{self._root}" is not a directory!')
+
+		stack = ['']
+		with self._lock, self._connection:
+			while stack:
+				relative_path = stack.pop()
+				try:
+					modification_time_ns = os.stat(self._get_absolute_path(relative_path)).st_mtime_ns
+				except OSError:
+					self._remove_tree(relative_path)
+					continue
+
+				row = self._connection.execute(
+					'SELECT modification_time_ns FROM directories WHERE path = ?', (relative_path,)
+				).fetchone()
+				if not full and row is not None and row[0] == modification_time_ns:
+					stack.extend(self._get_subdirectories(relative_path))
+					continue
+
+				try:
+					stack.extend(self._scan_directory(
+						relative_path=relative_path, modification_time_ns=modification_time_ns
+					))
+				except OSError:
+					continue
+		return self
+
+	def _get_condition(
+			self, name, extension, min_size_bytes, max_size_bytes, modified_after, modified_before,
+			min_age, max_age, files, directories, directory
+	):
+		"""
+		:rtype: tuple[str, list]
+		"""
+		conditions = []
+		parameters = []
+		if not files and not directories:
+			conditions.append('0')
+		elif not files:
+			conditions.append('is_directory = 1')
+		elif not directories:
+			conditions.append('is_directory = 0')
+
+		if name is not None:
+			conditions.append('name GLOB ?')
+			parameters.append(name)
+
+		if extension is not None:
+			if isinstance(extension, str):
+				extension = [extension]
+			extensions = [x[1:] if x.startswith('.') else x for x in extension]
+			conditions.append(f'extension IN ({", ".join("?" * len(extensions))})')
+			parameters.extend(extensions)
+
+		if min_size_bytes is not None:
+			conditions.append('size_bytes >= ?')
+			parameters.append(min_size_bytes)
+		if max_size_bytes is not None:
+			conditions.append('size_bytes <= ?')
+			parameters.append(max_size_bytes)
+
+		now = time()
+		if max_age is not None:
+			modified_after = max(_get_time_ns(modified_after or 0) / 1e9, now - _get_seconds(max_age))
+		if min_age is not None:
+			modified_before = now - _get_seconds(min_age)
+		if modified_after is not None:
+			conditions.append('modification_time_ns >= ?')
+			parameters.append(_get_time_ns(modified_after))
+		if modified_before is not None:
+			conditions.append('modification_time_ns <= ?')
+			parameters.append(_get_time_ns(modified_before))
+
+		if directory is not None:
+			if not isinstance(directory, str):
+				directory = directory.path
+			relative_path = os.path.relpath(os.path.abspath(directory), self._root)
+			if relative_path != os.curdir:
+				lower, upper = _get_subtree_range(relative_path)
+				conditions.append('path >= ? AND path < ?')
+				parameters.extend([lower, upper])
+
+		if len(conditions) > 0:
+			return 'WHERE ' + ' AND '.join(conditions), parameters
+		else:
+			return '', parameters
+
+	def query(
+			self, name=None, extension=None, min_size_bytes=None, max_size_bytes=None,
+			modified_after=None, modified_before=None, min_age=None, max_age=None,
+			files=True, directories=False, directory=None
+	):
+		"""
+		finds the indexed entries that match all of the given conditions, e.g.,
+		index.query(extension='pickle', min_size_bytes=100 * 2**20, max_age=timedelta(days=7))
+		:param str or NoneType name: a glob pattern matched against the name and extension, e.g., "report_*.csv"
+		:param str or list[str] or NoneType extension: one or more extensions, with or without the dot
+		:param datetime or float or NoneType modified_after: a datetime or a timestamp
+		:param datetime or float or NoneType modified_before: a datetime or a timestamp
+		:param timedelta or float or NoneType min_age: a timedelta or a number of seconds
+		:param timedelta or float or NoneType max_age: a timedelta or a number of seconds
+		:param str or Path or NoneType directory: only the entries under this directory
+		:rtype: collections.Iterable[Path]
+		"""
+		condition, parameters = self._get_condition(
+			name=name, extension=extension, min_size_bytes=min_size_bytes, max_size_bytes=max_size_bytes,
+			modified_after=modified_after, modified_before=modified_before, min_age=min_age, max_age=max_age,
+			files=files, directories=directories, directory=directory
+		)
+		with self._lock:
+			rows = self._connection.execute(f'SELECT path FROM entries {condition} ORDER BY path', parameters).fetchall()
+		for row in rows:
+			yield Path(path=self._get_absolute_path(row[0]))
+
+	def count(
+			self, name=None, extension=None, min_size_bytes=None, max_size_bytes=None,
+			modified_after=None, modified_before=None, min_age=None, max_age=None,
+			files=True, directories=False, directory=None
+	):
+		"""
+		:return: the number of entries that query would yield
+		:rtype: int
+		"""
+		condition, parameters = self._get_condition(
+			name=name, extension=extension, min_size_bytes=min_size_bytes, max_size_bytes=max_size_bytes,
+			modified_after=modified_after, modified_before=modified_before, min_age=min_age, max_age=max_age,
+			files=files, directories=directories, directory=directory
+		)
+		with self._lock:
+			return self._connection.execute(f'SELECT COUNT(*) FROM entries {condition}', parameters).fetchone()[0]
+
+	def get_size_bytes(
+			self, name=None, extension=None, min_size_bytes=None, max_size_bytes=None,
+			modified_after=None, modified_before=None, min_age=None, max_age=None, directory=None
+	):
+		"""
+		:return: the total size of the files that query would yield
+		:rtype: int
+		"""
+		condition, parameters = self._get_condition(
+			name=name, extension=extension, min_size_bytes=min_size_bytes, max_size_bytes=max_size_bytes,
+			modified_after=modified_after, modified_before=modified_before, min_age=min_age, max_age=max_age,
+			files=True, directories=False, directory=directory
+		)
+		with self._lock:
+			cursor = self._connection.execute(
+				f'SELECT COALESCE(SUM(size_bytes), 0) FROM entries {condition}', parameters
+			)
+			return cursor.fetchone()[0]
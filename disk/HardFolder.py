@@ -1,4 +1,6 @@
 from .Path import Path
+from .ArchivePath import ArchivePath
+from .exceptions import ReadOnlyError
 from slytherin.hash import hash_object
 from datetime import datetime
 import atexit
@@ -42,24 +44,40 @@ class HardFolder:
 	def __hashkey__(self):
 		return (self.__class__.__name__, self._path.path)
 
-	def zip(self, delete_directory=False, compression=ZIP_DEFLATED, zip_path=None, echo=0):
+	def zip(
+			self, delete_directory=False, compression=ZIP_DEFLATED, zip_path=None, echo=0, num_workers=None,
+			compression_level=None, incremental=False
+	):
 		"""
 		:type delete_directory: bool
 		:type compression: int
+		:param int or NoneType num_workers: number of threads compressing the files
+		:param int or NoneType compression_level: 0 to 9 for deflate, None for the default
+		:param bool incremental: if True, an existing zip is updated with the items that were added, changed or deleted
 		:rtype: Path
 		"""
 		self.save_keys()
-		return self._path.zip(compression=compression, delete_original=delete_directory, zip_path=zip_path, echo=echo)
+		return self._path.zip(
+			compression=compression, delete_original=delete_directory, zip_path=zip_path, echo=echo,
+			num_workers=num_workers, compression_level=compression_level, incremental=incremental,
+			remove_deleted=True
+		)
 
 	@classmethod
-	def from_zip(cls, path, delete_original=False, unzip_path=None):
+	def from_zip(cls, path, delete_original=False, unzip_path=None, num_workers=None, echo=0, extract=True):
 		"""
 		:type path: str or Path
 		:type delete_original: bool
+		:param int or NoneType num_workers: number of threads extracting the files
+		:param bool extract: if False, nothing is extracted and a read-only ArchivedHardFolder reads items from the zip
 		:rtype: HardFolder
 		"""
+		if not extract:
+			return ArchivedHardFolder(path=path)
 		zip_path = Path(path=path)
-		unzip_path = zip_path.unzip(delete_original=delete_original, unzip_path=unzip_path)
+		unzip_path = zip_path.unzip(
+			delete_original=delete_original, unzip_path=unzip_path, num_workers=num_workers, echo=echo
+		)
 		return cls(path=unzip_path)
 
 	@property
@@ -162,6 +180,53 @@ class HardFolder:
 		return the_path.get_size()
 
 
+# ArchivedHardFolder is a read-only HardFolder whose items are read one by one from a zipped HardFolder
+class ArchivedHardFolder(HardFolder):
+	def __init__(self, path):
+		"""
+		:param str or Path or ArchivePath path: the zip file or the directory of the HardFolder inside it
+		"""
+		if isinstance(path, ArchivedHardFolder):
+			path = path._path
+		if not isinstance(path, ArchivePath):
+			path = self._find_root(zip_path=path)
+		self._path = path
+		self._items = self.keys_path.load(method='pickle') if self.keys_path.exists() else {}
+
+	def __repr__(self):
+		return f'<ArchivedHardFolder:{self._path.path}>'
+
+	def __setstate__(self, state):
+		for key, value in state.items():
+			setattr(self, key, value)
+
+	@staticmethod
+	def _find_root(zip_path):
+		"""
+		zip_directory names members after the zipped path, so the folder is wherever the shallowest keys file is
+		:type zip_path: str or Path
+		:rtype: ArchivePath
+		"""
+		root = ArchivePath(zip_path=zip_path)
+		names = [name for name in root.archive.list_names() if name.rpartition('/')[2] == 'keys.pickle']
+		if len(names) == 0:
+			return root
+		name = min(names, key=lambda x: (x.count('/'), x))
+		return ArchivePath(zip_path=zip_path, name=name.rpartition('/')[0])
+
+	def zip(self, *args, **kwargs):
+		raise ReadOnlyError(f'{self} is already an archive')
+
+	def save_keys(self):
+		pass
+
+	def set_item(self, key, value, time):
+		raise ReadOnlyError(f'{self} is read-only')
+
+	def __delitem__(self, key):
+		raise ReadOnlyError(f'{self} is read-only')
+
+
 class SoftFolder:
 	def __init__(self):
 		self._objects = {}
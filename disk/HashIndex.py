@@ -0,0 +1,189 @@
+from .pickle_function import pickle as _pickle
+from .pickle_function import unpickle as _unpickle
+from .individual_functions import path_exists
+import atexit
+import os
+import weakref
+from collections import OrderedDict
+from threading import Lock
+
+
+# indexes with a sidecar file are saved when the interpreter exits, the set does not keep them alive
+_open_indexes = weakref.WeakSet()
+
+
+def _save_open_indexes():
+	for index in list(_open_indexes):
+		index.save()
+
+
+atexit.register(_save_open_indexes)
+
+
+# HashIndex remembers content digests of files so a file is only read again after its size or modification time changes,
+# and the fingerprints of directories so a directory is only listed again after its modification time changes
+class HashIndex:
+	def __init__(self, path=None, max_size=None):
+		"""
+		:param str or Path or NoneType path: the sidecar file the index is persisted in, None keeps it in memory only
+		:param int or NoneType max_size: if provided, the least recently used files and directories are forgotten
+		once there are more of them
+		"""
+		if path is not None and not isinstance(path, str):
+			path = path.path
+		self._path = path
+		self._max_size = max_size
+		self._lock = Lock()
+		self._changed = False
+		if path is not None and path_exists(path=path):
+			self._dictionary = OrderedDict(_unpickle(path=path))
+		else:
+			self._dictionary = OrderedDict()
+		self._evict()
+		if path is not None:
+			_open_indexes.add(self)
+
+	def __repr__(self):
+		return f'<HashIndex:{self._path} - {len(self._dictionary)} entries>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __len__(self):
+		return len(self._dictionary)
+
+	@property
+	def path(self):
+		"""
+		:rtype: str or NoneType
+		"""
+		return self._path
+
+	@property
+	def max_size(self):
+		"""
+		:rtype: int or NoneType
+		"""
+		return self._max_size
+
+	def _evict(self):
+		"""
+		forgets the least recently used records beyond max_size, the lock should be held
+		"""
+		if self._max_size is not None:
+			while len(self._dictionary) > self._max_size:
+				self._dictionary.popitem(last=False)
+
+	def _get(self, key, stat_result, name):
+		with self._lock:
+			record = self._dictionary.get(key)
+			if record is not None and self._max_size is not None:
+				self._dictionary.move_to_end(key)
+		if record is None:
+			return None
+		size, modification_time_ns, values = record
+		if size != stat_result.st_size or modification_time_ns != stat_result.st_mtime_ns:
+			return None
+		return values.get(name)
+
+	def _set(self, key, stat_result, name, value):
+		with self._lock:
+			record = self._dictionary.get(key)
+			if record is None or record[0] != stat_result.st_size or record[1] != stat_result.st_mtime_ns:
+				record = (stat_result.st_size, stat_result.st_mtime_ns, {})
+				self._dictionary[key] = record
+			elif self._max_size is not None:
+				self._dictionary.move_to_end(key)
+			record[2][name] = value
+			self._evict()
+			self._changed = True
+
+	def get(self, stat_result, algorithm):
+		"""
+		:type stat_result: os.stat_result
+		:type algorithm: str
+		:return: the digest if the file did not change since it was indexed
+		:rtype: str or NoneType
+		"""
+		return self._get(key=(stat_result.st_dev, stat_result.st_ino), stat_result=stat_result, name=algorithm)
+
+	def set(self, stat_result, algorithm, digest):
+		"""
+		:type stat_result: os.stat_result
+		:type algorithm: str
+		:type digest: str
+		"""
+		self._set(key=(stat_result.st_dev, stat_result.st_ino), stat_result=stat_result, name=algorithm, value=digest)
+
+	def get_directory(self, stat_result, kind):
+		"""
+		:type stat_result: os.stat_result
+		:param str kind: what the digest is made of, e.g., the algorithm and whether file contents are read
+		:return: the children and the digest of a directory whose modification time did not change since it was
+		indexed; its listing is still the same but the digests of the children have to be checked
+		:rtype: tuple[tuple, str] or NoneType
+		"""
+		return self._get(
+			key=('directory', stat_result.st_dev, stat_result.st_ino), stat_result=stat_result, name=kind
+		)
+
+	def set_directory(self, stat_result, kind, children, digest):
+		"""
+		:type stat_result: os.stat_result
+		:type kind: str
+		:param tuple[tuple[str, str, str]] children: the name, type and fingerprint of each child
+		:type digest: str
+		"""
+		self._set(
+			key=('directory', stat_result.st_dev, stat_result.st_ino), stat_result=stat_result, name=kind,
+			value=(children, digest)
+		)
+
+	def invalidate(self, stat_result=None):
+		"""
+		forgets a file or, if stat_result is None, everything
+		:type stat_result: os.stat_result or NoneType
+		"""
+		with self._lock:
+			if stat_result is None:
+				self._dictionary.clear()
+			else:
+				self._dictionary.pop((stat_result.st_dev, stat_result.st_ino), None)
+				self._dictionary.pop(('directory', stat_result.st_dev, stat_result.st_ino), None)
+			self._changed = True
+
+	def on_change(self, event):
+		"""
+		forgets a file that was created or modified, in case its size and modification time did not change;
+		a deleted file cannot be looked up by path but a new file rarely reuses its inode with the same size and time
+		:type event: ChangeEvent
+		"""
+		if event.is_directory or event.kind == event.DELETED:
+			return
+		try:
+			stat_result = os.stat(event.path)
+		except OSError:
+			return
+		self.invalidate(stat_result=stat_result)
+
+	def __del__(self):
+		# an index that is garbage collected before the interpreter exits is saved here
+		try:
+			self.save()
+		except Exception:
+			pass
+
+	def close(self, echo=0):
+		"""
+		saves the index, it is no longer saved when the interpreter exits
+		"""
+		self.save(echo=echo)
+		_open_indexes.discard(self)
+
+	def save(self, echo=0):
+		if self._path is None or not self._changed:
+			return
+		with self._lock:
+			dictionary = {key: (size, time, dict(digests)) for key, (size, time, digests) in self._dictionary.items()}
+			self._changed = False
+		_pickle(obj=dictionary, path=self._path, method='pickle', echo=echo)
@@ -4,9 +4,31 @@ from .individual_functions import *
 from .zip import zip_file
 from .zip import zip_directory
 from .zip import unzip
+from .zip import update_zip
+from .archive import archive
+from .archive import extract_archive
+from .archive import get_archive_suffix
+from .archive import get_codec
 from .get_creation_date import get_creation_date
 from .get_creation_date import get_modification_date
-from .exceptions import DiskError
+from .StatSnapshot import StatSnapshot
+from .walk import walk as _walk
+from .directory_size import get_directory_size as _get_directory_size
+from .copy_function import copy_file as _copy_file
+from .copy_function import copy_directory as _copy_directory
+from .sync import plan_sync as _plan_sync
+from .SyncManifest import SyncManifest
+from .fingerprint import get_fingerprint as _get_fingerprint
+from .fingerprint import DEFAULT_HASH_INDEX
+from .fingerprint import are_the_same_trees as _are_the_same_trees
+from .content_hash import get_content_hash as _get_content_hash
+from .content_hash import hash_files as _hash_files
+from .content_hash import DEFAULT_CHUNK_SIZE
+from .duplicates import find_duplicates as _find_duplicates
+from .duplicates import DEFAULT_PARTIAL_SIZE
+from .Writer import Writer
+from .Watcher import Watcher
+from .ArchivePath import ArchivePath
 from .exceptions import RenameError
 from .exceptions import PathDoesNotExistError
 from .exceptions import PathExistsError
@@ -21,6 +43,7 @@ from pathlib import Path as _Path
 import warnings
 import os
 import shutil
+import mmap as _mmap
 from filecmp import cmp as compare_files
 
 
@@ -29,6 +52,12 @@ def get_parent_directory(path):
 
 
 class Path:
+	# millions of Paths can be alive after listing large trees, so they have no __dict__
+	__slots__ = (
+		'_path', '_show_size', '_entry', '_type', '_stat',
+		'_absolute', '_normalized', '_name_and_extension', '_parent_path'
+	)
+
 	def __init__(self, path, show_size=False):
 		"""
 		:type path: str or Path
@@ -38,9 +67,88 @@ class Path:
 
 		if isinstance(path, self.__class__) or not isinstance(path, str):
 			path = path.path
-		self._path = path
-		self._size = None
 		self._show_size = show_size
+		self._entry = None
+		self._type = None
+		self._stat = None
+		self._set_path(path=path)
+
+	def _set_path(self, path):
+		"""
+		changes the string of the path and forgets what was derived from the old one
+		:type path: str
+		"""
+		self._path = path
+		self._absolute = None
+		self._normalized = None
+		self._name_and_extension = None
+		self._parent_path = None
+
+	def _reset_metadata(self):
+		"""
+		forgets everything that was learned about the file system at this path
+		"""
+		self._entry = None
+		self._type = None
+		if self._stat is not None:
+			self._stat.expire()
+
+	def on_change(self, event):
+		"""
+		forgets the metadata of the path, e.g., the memoized size, when it or anything under it changes;
+		subscribe it to a Watcher to keep long-lived Paths up to date
+		:type event: ChangeEvent
+		"""
+		if event.concerns(path=self._get_normalized()):
+			self._reset_metadata()
+
+	def stat(self, ttl=None, refresh=False):
+		"""
+		takes a snapshot of the metadata of the path with a single os.stat call;
+		after this is called type, exists, is_file, size_bytes, creation_date and modification_date
+		are answered from the snapshot, which is refreshed automatically once it is older than ttl seconds
+		:param float or int or NoneType ttl: seconds the snapshot is trusted for, None means until refresh
+		:param bool refresh: if True, a new snapshot is taken even if the current one is fresh
+		:rtype: StatSnapshot
+		"""
+		if self._stat is None:
+			stat_result = None
+			if self._entry is not None and self._type != 'nonexistent path':
+				try:
+					stat_result = self._entry.stat()
+				except OSError:
+					stat_result = None
+			self._stat = StatSnapshot(path=self.path, ttl=ttl, stat_result=stat_result)
+		else:
+			if ttl is not None:
+				self._stat.ttl = ttl
+			if refresh or self._stat.is_expired():
+				self._stat.refresh()
+		return self._stat
+
+	def _get_stat(self):
+		"""
+		:return: the stat snapshot if one was requested through Path.stat, otherwise None
+		:rtype: StatSnapshot or NoneType
+		"""
+		if self._stat is None:
+			return None
+		if self._stat.is_expired():
+			self._stat.refresh()
+		return self._stat
+
+	def _get_child(self, entry):
+		"""
+		:type entry: os.DirEntry
+		:rtype: Path
+		"""
+		child = self / entry.name
+		child._entry = entry
+		child._type = get_entry_type(entry=entry)
+		# an entry name has no separators so joining it to a normalized absolute path keeps it normalized
+		child._absolute = os.path.join(self.get_absolute(), entry.name)
+		child._name_and_extension = entry.name
+		return child
 
 	def rename(self, new_name):
 		"""
@@ -61,6 +169,7 @@ class Path:
 
 	def move_and_rename(self, new_name=None, new_directory=None, new_path=None):
 		"""
+		changes the path of self in place and returns self, see __hash__ about renaming a Path kept in a set
 		:type new_name: str or Path
 		:type new_directory: str or Path
 		:type new_path: str or Path
@@ -100,16 +209,20 @@ class Path:
 			raise PathExistsError(f'"{old_path}" cannot be renamed to "{new_path.absolute}" because it already exists!')
 
 		shutil.move(self.absolute_path, new_path.absolute_path)
-		self._path = new_path.absolute_path
+		self._set_path(path=new_path.absolute_path)
+		self._reset_metadata()
 		if not self.exists():
 			raise RenameError(f'could not rename "{old_path}" to "{self.absolute}"')
 		return self
 
-	def copy(self, new_path=None, new_directory=None, clean_copy=True, echo=0):
+	def copy(self, new_path=None, new_directory=None, clean_copy=True, num_workers=None, delete_method=None, echo=0):
 		"""
 		:type new_path str or Path
 		:type echo: int or bool
 		:param bool clean_copy: if True, first delete destination
+		:param int or NoneType num_workers: if provided, a directory is planned once and its files are copied
+		by this many threads
+		:param str or NoneType delete_method: how the destination is deleted, see Path.delete
 		:rtype: Path
 		"""
 		if not self.exists():
@@ -136,8 +249,9 @@ class Path:
 			if echo:
 				print(f'Copying "{self.absolute_path}" to "{new_path.absolute_path}"')
 			if clean_copy and new_path.exists():
-				new_path.delete(echo=echo)
-			shutil.copy2(self.path, new_path.path)
+				new_path.delete(method=delete_method, echo=echo)
+			_copy_file(source=self.path, destination=new_path.path)
+			new_path._reset_metadata()
 
 		elif self.is_directory():
 			if new_path.exists() and new_path.is_file():
@@ -147,11 +261,15 @@ class Path:
 			if not new_path.exists():
 				new_path.make_dir()
 			elif clean_copy:
-				new_path.delete()
+				new_path.delete(method=delete_method, num_workers=num_workers)
 				new_path.make_dir()
 
-			for path in self.list():
-				path.copy(new_directory=new_path, clean_copy=clean_copy)
+			if num_workers is None:
+				for path in self.list():
+					path.copy(new_directory=new_path, clean_copy=clean_copy, delete_method=delete_method)
+			else:
+				# the report is shown by the progress bar of copy_directory
+				_copy_directory(path=self.path, new_path=new_path.path, num_workers=num_workers, echo=echo)
 
 		return new_path
 
@@ -169,30 +287,36 @@ class Path:
 	def __getstate__(self):
 		return {
 			'string': self._path,
-			'size': self._size,
+			# sizes are no longer kept, the key lets older versions read the state
+			'size': None,
 			'show_size': self._show_size
 		}
 
 	def __setstate__(self, state):
-		self._path = state['string']
-		self._size = state['size']
+		self._set_path(path=state['string'])
 		self._show_size = state['show_size']
+		self._entry = None
+		self._type = None
+		self._stat = None
 
 	def __hashkey__(self):
 		if self.exists():
 			if self.is_file():
 				return self.__class__.__name__, 1, self.size_bytes, self.creation_date, self.modification_date
 			else:
-				return self.__class__.__name__, 2, [x.__hashkey__() for x in self.list(show_size=False)]
+				return self.__class__.__name__, 2, self.get_fingerprint(content=False)
 
 		else:
 			return self.__class__.__name__, 0, self._path
 
 	def get_absolute(self):
 		"""
+		the absolute path is resolved against the working directory once and then remembered
 		:rtype: str
 		"""
-		return get_absolute_path(path=self.path)
+		if self._absolute is None:
+			self._absolute = get_absolute_path(path=self.path)
+		return self._absolute
 
 	@property
 	def absolute(self):
@@ -222,12 +346,13 @@ class Path:
 		"""
 		if absolute:
 			return Path(path=get_parent_directory(self.absolute_path))
+		# only the string is kept, a Path is changed by rename and move_and_rename so a new one is made every time
+		if self._parent_path is None:
+			self._parent_path = self._path[:-len(self.name_and_extension)]
+		if len(self._parent_path) > 0:
+			return Path(path=self._parent_path)
 		else:
-			string_except_name_and_extension = self._path[:-len(self.name_and_extension)]
-			if len(string_except_name_and_extension) > 0:
-				return Path(path=string_except_name_and_extension)
-			else:
-				return self.get_current_directory(show_size=self._show_size)
+			return self.get_current_directory(show_size=self._show_size)
 
 	@property
 	def parent_directory(self):
@@ -254,8 +379,38 @@ class Path:
 		else:
 			return []
 
+	def _get_normalized(self):
+		"""
+		the absolute path in the case the operating system compares paths with, used for equality and hashing
+		:rtype: str
+		"""
+		if self._normalized is None:
+			self._normalized = os.path.normcase(self.get_absolute())
+		return self._normalized
+
 	def __hash__(self):
-		return self.absolute_path
+		"""
+		the hash follows the path, and rename, move and move_and_rename change the path of a Path in place,
+		so a Path that is in a set or is a key of a dictionary should not be renamed or moved;
+		the set or the dictionary would no longer find it
+		:rtype: int
+		"""
+		return hash(self._get_normalized())
+
+	def get_relative_path(self, directory):
+		"""
+		:type directory: Path
+		:return: the path of self relative to directory
+		:rtype: str
+		"""
+		directory_absolute = directory.get_absolute()
+		prefix = directory_absolute if directory_absolute.endswith(os.sep) else directory_absolute + os.sep
+		absolute = self.get_absolute()
+		if absolute == directory_absolute:
+			return os.curdir
+		elif absolute.startswith(prefix):
+			return absolute[len(prefix):]
+		return os.path.relpath(absolute, directory_absolute)
 
 	@property
 	def path(self):
@@ -264,6 +419,16 @@ class Path:
 		"""
 		return self._path
 
+	@property
+	def aio(self):
+		"""
+		the same path with awaitable operations that run on a shared thread pool
+		:rtype: AsyncPath
+		"""
+		# AsyncPath is built on Path so it is imported when it is first needed
+		from .AsyncPath import AsyncPath
+		return AsyncPath(path=self)
+
 	@property
 	def pretty_path(self):
 		"""
@@ -285,7 +450,9 @@ class Path:
 		"""
 		:rtype: str
 		"""
-		return get_basename(path=self.absolute_path)
+		if self._name_and_extension is None:
+			self._name_and_extension = get_basename(path=self.absolute_path)
+		return self._name_and_extension
 
 	full_name = name_and_extension
 
@@ -309,29 +476,85 @@ class Path:
 
 	@property
 	def creation_date(self):
+		stat = self._get_stat()
+		if stat is not None:
+			return stat.creation_date
 		return get_creation_date(self.path)
 
 	@property
 	def modification_date(self):
+		stat = self._get_stat()
+		if stat is not None:
+			return stat.modification_date
 		return get_modification_date(self.path)
 
-	def get_size_bytes(self):
+	def get_size_bytes(self, num_workers=None, cache=None):
 		"""
+		:param int or NoneType num_workers: number of threads scanning a directory
+		:param DirectorySizeCache or NoneType cache: directories that did not change since the last scan are not rescanned
 		:rtype: int or float
 		"""
 		if self.is_file():
+			if self._entry is not None:
+				return self._entry.stat().st_size
 			return get_file_size_bytes(path=self.path)
 		else:
-			return sum([x.size_bytes for x in self.list()])
+			return self.get_directory_size(num_workers=num_workers, cache=cache).size_bytes
+
+	def get_directory_size(self, num_workers=None, cache=None, follow_symlinks=True, on_error=None):
+		"""
+		scans the directory tree, on a thread pool if it is large or num_workers is given, and returns the total size,
+		the number of files and a breakdown by subdirectory
+		:param int or NoneType num_workers: number of threads scanning directories
+		:param DirectorySizeCache or NoneType cache: directories whose modification time did not change are not rescanned
+		:param bool follow_symlinks: if True, symbolic links to directories are included like the entries of list;
+		if False, they are left out like du does
+		:param callable or NoneType on_error: called with the OSError of a directory that cannot be scanned
+		:rtype: DirectorySize
+		"""
+		if self.is_file():
+			raise NotADirectoryError(f'{self.path} is not a directory!')
+		return _get_directory_size(
+			path=self.path, num_workers=num_workers, cache=cache, follow_symlinks=follow_symlinks, on_error=on_error
+		)
+
+	def build_index(self, path=None, full=False):
+		"""
+		creates or updates an sqlite index of the directory tree that can be queried by name, extension, size and age;
+		an existing index only rescans the directories whose modification time changed
+		:param str or NoneType path: the database file, by default it is kept in the cache directory of the user
+		:param bool full: if True, every directory is scanned again
+		:rtype: DirectoryIndex
+		"""
+		if self.is_file():
+			raise NotADirectoryError(f'{self.path} is not a directory!')
+		# DirectoryIndex returns Paths so it is imported when it is first needed
+		from .DirectoryIndex import DirectoryIndex
+		return DirectoryIndex(root=self.path, path=path).update(full=full)
+
+	def watch(self, interval=1, method=None, on_error=None):
+		"""
+		starts reporting the files and directories that are created, modified or deleted under this directory
+		:param float or int interval: seconds between two polls, inotify reports changes as soon as they happen
+		:param str or NoneType method: 'inotify', 'polling' or None to use inotify where it is available
+		:param callable or NoneType on_error: called with the event and the error when a subscriber fails
+		:rtype: Watcher
+		"""
+		if self.is_file():
+			raise NotADirectoryError(f'{self.path} is not a directory!')
+		return Watcher(path=self.path, interval=interval, method=method, on_error=on_error).start()
 
 	@property
 	def size_bytes(self):
 		"""
+		the size is read every time because files and directories change; a stat snapshot, if enabled,
+		serves the size of a file until it expires
 		:rtype: int or float
 		"""
-		if self._size is None:
-			self._size = self.get_size_bytes()
-		return self._size
+		stat = self._get_stat()
+		if stat is not None and stat.exists and stat.is_file:
+			return stat.size_bytes
+		return self.get_size_bytes()
 
 	def get_size_kb(self, binary=True):
 		"""
@@ -364,26 +587,33 @@ class Path:
 		"""
 		:rtype: tuple
 		"""
-		main_unit = 'B' if binary else 'b'
-		if self.size_bytes <= 1e3:
-			return self.size_bytes, 'B'
-		elif self.size_bytes <= 1e6:
-			return self.get_size_kb(binary=binary), 'K' + main_unit
-		elif self.size_bytes <= 1e9:
-			return self.get_size_mb(binary=binary), 'M' + main_unit
-		else:
-			return self.get_size_gb(binary=binary), 'G' + main_unit
+		# the size is read once, for a directory it means scanning the tree
+		return get_size_and_unit(size_bytes=self.size_bytes, binary=binary)
 
 	def exists(self):
 		"""
 		:rtype: bool
 		"""
+		stat = self._get_stat()
+		if stat is not None:
+			return stat.exists
+		if self._type is not None:
+			return self._type != 'nonexistent path'
 		return path_exists(path=self.path)
 
 	def is_file(self):
 		"""
 		:rtype: bool
 		"""
+		stat = self._get_stat()
+		if stat is not None:
+			if not stat.exists:
+				raise ValueError(f'The path "{self.path}" does not exist!')
+			return stat.is_file
+		if self._type == 'file':
+			return True
+		elif self._type == 'directory':
+			return False
 		return path_is_file(path=self.path)
 
 	def is_directory(self):
@@ -394,7 +624,12 @@ class Path:
 		"""
 		:rtype: str
 		"""
-		if not self.exists():
+		stat = self._get_stat()
+		if stat is not None:
+			return stat.type
+		if self._type is not None:
+			return self._type
+		elif not self.exists():
 			return 'nonexistent path'
 		elif self.is_file():
 			return 'file'
@@ -467,17 +702,22 @@ class Path:
 
 	def __eq__(self, other):
 		"""
+		two Paths are equal if they point to the same location, the file system is not touched
 		:type other: Path
 		:rtype: bool
 		"""
-		return self._sort_key() == other._sort_key()
+		if not isinstance(other, Path):
+			return NotImplemented
+		return self._get_normalized() == other._get_normalized()
 
 	def __ne__(self, other):
 		"""
 		:type other: Path
 		:rtype: bool
 		"""
-		return self._sort_key() != other._sort_key()
+		if not isinstance(other, Path):
+			return NotImplemented
+		return self._get_normalized() != other._get_normalized()
 
 	def __contains__(self, item):
 		if isinstance(item, Path):
@@ -495,15 +735,24 @@ class Path:
 	def is_empty(self):
 		return self.get_num_files() == 0
 
+	def _iterate_children(self):
+		"""
+		yields the children in the order os.scandir finds them, each child carries its directory entry
+		:rtype: collections.Iterable[Path]
+		"""
+		for entry in iterate_directory(path=self.path):
+			# the name of a child (without extension) is computed from the entry to avoid touching the disk
+			if not is_nameless(name=entry.name):
+				yield self._get_child(entry=entry)
+
 	def list(self, show_size=None):
 		"""
 		:rtype: list[Path]
 		"""
 		if show_size is not None:
 			self._show_size = show_size
-		result = [self / x for x in list_directory(path=self.path)]
-		result = [x for x in result if x.name != '']
-		result.sort()
+		result = list(self._iterate_children())
+		result.sort(key=self.__class__._sort_key)
 		return result
 
 	@property
@@ -521,7 +770,115 @@ class Path:
 		return [x for x in self.list() if x.is_file()]
 
 	def get(self, full_name):
-		return [x for x in self.list() if x.full_name == full_name][0]
+		for path in self._iterate_children():
+			if path.name_and_extension == full_name:
+				return path
+		raise IndexError(f'"{full_name}" does not exist in "{self.path}"')
+
+	def walk(
+			self, max_depth=None, include=None, exclude=None, sort=True, files=True, directories=True,
+			follow_symlinks=False, on_error=None
+	):
+		"""
+		lazily yields every path under this directory, top-down, without holding the tree in memory
+		:param int or NoneType max_depth: 1 means only the children, None means no limit
+		:param callable or NoneType include: only paths for which include(path) is True are yielded
+		:param callable or NoneType exclude: paths for which exclude(path) is True are skipped with their subtrees
+		:param bool sort: if False, children are yielded in the order the file system returns them
+		:param bool files: if False, files are not yielded
+		:param bool directories: if False, directories are not yielded but are still walked into
+		:param bool follow_symlinks: if True, symbolic links to directories are walked into
+		:param callable or NoneType on_error: called with the OSError of a directory that cannot be listed;
+		if None the error is raised
+		:rtype: collections.Iterable[Path]
+		"""
+		return _walk(
+			path=self, max_depth=max_depth, include=include, exclude=exclude, sort=sort,
+			files=files, directories=directories, follow_symlinks=follow_symlinks, on_error=on_error
+		)
+
+	def iter_files(self, max_depth=None, include=None, exclude=None, sort=True, follow_symlinks=False, on_error=None):
+		"""
+		lazily yields every file under this directory, see Path.walk
+		:rtype: collections.Iterable[Path]
+		"""
+		return self.walk(
+			max_depth=max_depth, include=include, exclude=exclude, sort=sort,
+			files=True, directories=False, follow_symlinks=follow_symlinks, on_error=on_error
+		)
+
+	def find_duplicates(
+			self, min_size_bytes=1, partial_size_bytes=DEFAULT_PARTIAL_SIZE, algorithm='sha256', index=None,
+			num_workers=None, on_error=None
+	):
+		"""
+		lazily yields groups of files under this directory that have the same content,
+		files are compared by size, then by a hash of their head and tail and only then by a full hash
+		:param int min_size_bytes: smaller files are ignored
+		:param int partial_size_bytes: number of bytes hashed from the head and from the tail of each file
+		:type algorithm: str
+		:param HashIndex or NoneType index: full digests of files that did not change are taken from the index
+		:param int or NoneType num_workers: number of threads reading files
+		:param callable or NoneType on_error: called with the path and the OSError of a file that cannot be read
+		:rtype: collections.Iterable[list[Path]]
+		"""
+		return _find_duplicates(
+			directories=[self], min_size_bytes=min_size_bytes, partial_size_bytes=partial_size_bytes,
+			algorithm=algorithm, index=index, num_workers=num_workers, on_error=on_error
+		)
+
+	def get_tree(self, files=True, directories=True):
+		"""
+		:return: every path under this directory
+		:rtype: set[Path]
+		"""
+		return set(self.walk(sort=False, files=files, directories=directories))
+
+	def _get_tree_of(self, other, files, directories):
+		"""
+		:type other: Path
+		:return: the paths under other, moved to the same relative locations under self
+		:rtype: set[Path]
+		"""
+		return {
+			self / x.get_relative_path(directory=other)
+			for x in other.walk(sort=False, files=files, directories=directories)
+		}
+
+	def difference(self, other, files=True, directories=True):
+		"""
+		:type other: Path
+		:return: the paths under self that have no counterpart at the same relative location under other
+		:rtype: set[Path]
+		"""
+		return self.get_tree(files=files, directories=directories) - self._get_tree_of(
+			other=other, files=files, directories=directories
+		)
+
+	def intersection(self, other, files=True, directories=True):
+		"""
+		:type other: Path
+		:return: the paths under self that also exist at the same relative location under other
+		:rtype: set[Path]
+		"""
+		return self.get_tree(files=files, directories=directories) & self._get_tree_of(
+			other=other, files=files, directories=directories
+		)
+
+	def symmetric_difference(self, other, files=True, directories=True):
+		"""
+		:type other: Path
+		:return: the paths under self that have no counterpart under other and the paths under other
+		that have no counterpart under self
+		:rtype: set[Path]
+		"""
+		self_tree = {x.get_relative_path(directory=self): x for x in self.get_tree(files=files, directories=directories)}
+		other_tree = {
+			x.get_relative_path(directory=other): x for x in other.get_tree(files=files, directories=directories)
+		}
+		return {x for name, x in self_tree.items() if name not in other_tree} | {
+			x for name, x in other_tree.items() if name not in self_tree
+		}
 
 	def make_directory(self, name=None, ignore_if_exists=True, echo=0):
 		if name:
@@ -532,6 +889,7 @@ class Path:
 		if echo:
 			print(f'Making directory "{path.absolute_path}"')
 		make_dir(path=path.path, ignore_if_exists=ignore_if_exists)
+		path._reset_metadata()
 
 		return path
 
@@ -540,14 +898,20 @@ class Path:
 			self.parent_directory.make_directory(ignore_if_exists=ignore_if_exists, echo=echo)
 		return self.parent_directory
 
-	def delete(self, name=None, echo=0):
+	def delete(self, name=None, method=None, num_workers=None, echo=0):
+		"""
+		:type name: str or NoneType
+		:param str or NoneType method: 'trash' or 'permanent', None means the method set by set_delete_method
+		:param int or NoneType num_workers: number of threads removing a directory tree permanently
+		"""
 		if name:
 			to_delete = self / name
 		else:
 			to_delete = self
 		if echo:
 			print(f'Deleting "{to_delete.absolute_path}"')
-		delete(path=to_delete.path)
+		delete(path=to_delete.path, method=method, num_workers=num_workers)
+		to_delete._reset_metadata()
 
 	def delete_directory(self, name):
 		delete_dir(path=(self / name).path)
@@ -592,6 +956,120 @@ class Path:
 			raise e
 		return content
 
+	def iter_lines(self, name=None, encoding='utf8', buffer_size=2 ** 16):
+		"""
+		yields the lines of a text file one at a time, so only one buffer of the file is in memory
+		:type name: str or NoneType
+		:type encoding: str
+		:param int buffer_size: number of bytes read from the disk at a time
+		:rtype: collections.Iterable[str]
+		"""
+		if name is None:
+			path = self.path
+		else:
+			path = (self / name).path
+		try:
+			with open(path, encoding=encoding, buffering=buffer_size) as file:
+				for line in file:
+					yield line
+		except Exception as e:
+			warnings.warn(f'error reading file {path}')
+			raise e
+
+	def iter_chunks(self, size=2 ** 20, name=None):
+		"""
+		yields the content of a file in chunks of bytes
+		:param int size: number of bytes in each chunk, the last chunk can be smaller
+		:type name: str or NoneType
+		:rtype: collections.Iterable[bytes]
+		"""
+		if name is None:
+			path = self.path
+		else:
+			path = (self / name).path
+		try:
+			with open(path, mode='rb') as file:
+				while True:
+					chunk = file.read(size)
+					if not chunk:
+						break
+					yield chunk
+		except Exception as e:
+			warnings.warn(f'error reading file {path}')
+			raise e
+
+	def tail(self, n=10, name=None, encoding='utf8'):
+		"""
+		returns the last n lines of a text file by reading backwards from its end
+		:type n: int
+		:type name: str or NoneType
+		:type encoding: str
+		:rtype: list[str]
+		"""
+		if name is None:
+			path = self.path
+		else:
+			path = (self / name).path
+		try:
+			return read_last_lines(path=path, num_lines=n, encoding=encoding)
+		except Exception as e:
+			warnings.warn(f'error reading file {path}')
+			raise e
+
+	def read_bytes(self, name=None):
+		"""
+		:type name: str or NoneType
+		:rtype: bytes
+		"""
+		if name is None:
+			path = self.path
+		else:
+			path = (self / name).path
+		try:
+			with open(path, mode='rb') as file:
+				content = file.read()
+		except Exception as e:
+			warnings.warn(f'error reading file {path}')
+			raise e
+		return content
+
+	def mmap(self, name=None, write=False):
+		"""
+		maps the file into memory so it can be sliced and parsed without reading it into Python objects;
+		the result can be used as a context manager that unmaps the file
+		:type name: str or NoneType
+		:param bool write: if True, changes to the map are written to the file, otherwise the map is read-only
+		:rtype: mmap.mmap
+		"""
+		if name is None:
+			path = self.path
+		else:
+			path = (self / name).path
+		try:
+			# the map keeps its own handle to the file so the file object can be closed right away
+			with open(path, mode='r+b' if write else 'rb') as file:
+				if os.fstat(file.fileno()).st_size == 0:
+					raise ValueError(f'the empty file "{path}" cannot be memory-mapped')
+				return _mmap.mmap(file.fileno(), 0, access=_mmap.ACCESS_WRITE if write else _mmap.ACCESS_READ)
+		except Exception as e:
+			warnings.warn(f'error memory-mapping file {path}')
+			raise e
+
+	def memoryview(self, name=None):
+		"""
+		a read-only, zero-copy view of the content of the file backed by a memory map;
+		slicing the view does not copy, and the file stays mapped as long as the view or any slice of it exists
+		:type name: str or NoneType
+		:rtype: memoryview
+		"""
+		if name is None:
+			path = self
+		else:
+			path = self / name
+		if get_file_size_bytes(path=path.path) == 0:
+			return memoryview(b'')
+		return memoryview(path.mmap(write=False))
+
 	def write(self, text, name=None, encoding='utf8'):
 		if name is None:
 			path = self.path
@@ -622,10 +1100,55 @@ class Path:
 			warnings.warn(f'error writing file {path}')
 			raise e
 
-	def zip(self, zip_path=None, compression=ZIP_DEFLATED, delete_original=False, echo=0):
+	def writer(
+			self, name=None, append=False, encoding='utf8', buffer_size=2 ** 16, flush_interval=None, fsync='never',
+			thread_safe=False
+	):
+		"""
+		opens a buffered writer that collects records and writes them in groups; use it as a context manager
+		:type name: str or NoneType
+		:param bool append: if True, records are added to the end of the file, otherwise the file is truncated
+		:type encoding: str
+		:param int buffer_size: number of bytes collected before they are written to the file
+		:param float or int or NoneType flush_interval: if provided, records never wait longer than this many seconds
+		:param str fsync: 'never', 'flush' to make every flush durable, or 'close' to make the file durable when closed
+		:param bool thread_safe: if True, many threads can write at the same time
+		:rtype: Writer
+		"""
+		if name is None:
+			path = self
+		else:
+			path = self / name
+		path._reset_metadata()
+		return Writer(
+			path=path.path, append=append, encoding=encoding, buffer_size=buffer_size, flush_interval=flush_interval,
+			fsync=fsync, thread_safe=thread_safe
+		)
+
+	def appender(
+			self, name=None, encoding='utf8', buffer_size=2 ** 16, flush_interval=None, fsync='never', thread_safe=False
+	):
+		"""
+		opens a buffered writer that adds records to the end of the file, see Path.writer
+		:rtype: Writer
+		"""
+		return self.writer(
+			name=name, append=True, encoding=encoding, buffer_size=buffer_size, flush_interval=flush_interval,
+			fsync=fsync, thread_safe=thread_safe
+		)
+
+	def zip(
+			self, zip_path=None, compression=ZIP_DEFLATED, delete_original=False, echo=0, num_workers=None,
+			compression_level=None, incremental=False, remove_deleted=False
+	):
 		"""
 		:type zip_path: NoneType or Path or str
 		:type compression: int
+		:param int or NoneType num_workers: number of threads compressing the files of a directory
+		:param int or NoneType compression_level: 0 to 9 for deflate, None for the default
+		:param bool incremental: if True, an existing archive of a directory is updated, only the files whose size
+		or modification time changed are compressed again
+		:param bool remove_deleted: if True, an incremental update removes the members whose files were deleted
 		:rtype: Path
 		"""
 		if isinstance(zip_path, self.__class__):
@@ -633,19 +1156,68 @@ class Path:
 
 		if self.is_file():
 			zip_path = zip_path or f'{self.path}.zip'
-			result = zip_file(path=self.path, compression=compression, zip_path=zip_path, echo=echo)
+			result = zip_file(
+				path=self.path, compression=compression, zip_path=zip_path, echo=echo,
+				compression_level=compression_level
+			)
 		else:
 			zip_path = zip_path or f'{self.path}.dir.zip'
-			result = zip_directory(path=self.path, compression=compression, zip_path=zip_path, echo=echo)
+			if incremental:
+				result = update_zip(
+					path=self.path, compression=compression, zip_path=zip_path, remove_deleted=remove_deleted,
+					echo=echo, num_workers=num_workers, compression_level=compression_level
+				)
+			else:
+				result = zip_directory(
+					path=self.path, compression=compression, zip_path=zip_path, echo=echo, num_workers=num_workers,
+					compression_level=compression_level
+				)
 
 		if delete_original:
 			self.delete()
 
 		return Path(path=result)
 
-	def unzip(self, unzip_path=None, delete_original=False):
+	def archive(
+			self, archive_path=None, compression=None, preset='balanced', level=None, delete_original=False,
+			num_workers=None, echo=0
+	):
+		"""
+		writes the file or directory to a compressed tar archive, Path.unzip extracts it
+		:param NoneType or Path or str or io.BufferedIOBase archive_path: the archive or a binary file object
+		to stream into, by default the path followed by the suffix of the codec, e.g., ".tar.zst"
+		:param str or NoneType compression: 'tar', 'gz', 'bz2', 'xz', 'zst' or 'lz4', None chooses by preset
+		:param str preset: 'fast', 'balanced' or 'small', trades speed for the size of the archive
+		:param int or NoneType level: a compression level of the codec, it overrides the preset
+		:param int or NoneType num_workers: number of threads for codecs that compress on several threads
+		:rtype: Path or io.BufferedIOBase
+		"""
+		if isinstance(archive_path, self.__class__):
+			archive_path = archive_path.path
+		if archive_path is None:
+			codec = get_codec(compression=compression, preset=preset)
+			archive_path = f'{self.path}{codec.extension}'
+			compression = codec.name
+
+		result = archive(
+			path=self.path, archive_path=archive_path, compression=compression, preset=preset, level=level,
+			num_workers=num_workers, echo=echo
+		)
+
+		if delete_original:
+			self.delete()
+
+		if isinstance(result, str):
+			return Path(path=result)
+		return result
+
+	def unzip(self, unzip_path=None, delete_original=False, num_workers=None, members=None, echo=0):
 		"""
 		:type unzip_path: str or NoneType or Path
+		:param int or NoneType num_workers: number of threads extracting members of a zip archive,
+		a tar archive is a single stream so it is always extracted by one thread
+		:param list[str] or callable or NoneType members: only these members are extracted, either a list of names
+		or a function that takes a name and returns True for the members to extract
 		:rtype: Path
 		"""
 		if isinstance(unzip_path, self.__class__):
@@ -658,14 +1230,26 @@ class Path:
 
 		zipped_directory_extension = '.dir.zip'
 		zipped_file_extension = '.zip'
+		archive_suffix = get_archive_suffix(self.name_and_extension)
 		if self.name_and_extension.endswith(zipped_directory_extension):
 			unzip_path = directory / self.path[:-len(zipped_directory_extension)]
 		elif self.name_and_extension.endswith(zipped_file_extension):
 			unzip_path = directory / self.path[:-len(zipped_file_extension)]
+		elif archive_suffix is not None:
+			# tar archives keep the file or directory under its own name
+			codec, suffix = archive_suffix
+			if num_workers is not None and num_workers != 1:
+				warnings.warn(f'num_workers is ignored for "{self.name_and_extension}", tar archives are read as a stream')
+			extract_archive(
+				archive_path=self.path, unzip_path=directory.path, compression=codec.name, members=members, echo=echo
+			)
+			if delete_original:
+				self.delete()
+			return directory / self.name_and_extension[:-len(suffix)]
 		else:
 			raise ValueError('unknown extension!')
 
-		unzip(path=self.path, unzip_path=directory.path)
+		unzip(path=self.path, unzip_path=directory.path, num_workers=num_workers, members=members, echo=echo)
 
 		if delete_original:
 			self.delete()
@@ -678,6 +1262,14 @@ class Path:
 		"""
 		return is_zipfile(self.path)
 
+	def open_zip(self):
+		"""
+		opens the zip file for reading members without extracting them
+		:return: the root of the archive
+		:rtype: ArchivePath
+		"""
+		return ArchivePath(zip_path=self.path)
+
 	def run(self, command):
 		if not self.is_directory():
 			raise TypeError(f'{self.absolute} is not a directory')
@@ -726,10 +1318,13 @@ class Path:
 
 		return compare_files(self.absolute_path, other.absolute_path)
 
-	def is_the_same_directory(self, other):
+	def is_the_same_directory(self, other, content=False, index=None):
 		"""
-		checks if self is the same directory as path
+		checks if self is the same directory as path; like is_the_same_file, files with the same size and
+		modification time are taken to be the same and only the other files are read
 		:type other: Path
+		:param bool content: if True, every file is compared by its content digest
+		:param HashIndex or NoneType index: None means the bounded in-memory index shared by all Paths
 		:rtype: bool
 		"""
 		if not self.exists():
@@ -744,118 +1339,102 @@ class Path:
 		if not other.is_directory():
 			raise NotADirectoryError(other)
 
-		self_file_names = {f.name_and_extension: f for f in self.files}
-		other_file_names = {f.name_and_extension: f for f in other.files}
-
-		for name, file in self_file_names.items():
-			if name not in other_file_names:
-				return False
-			if not file.is_the_same_file(other_file_names[name]):
-				return False
-
-		for name in other_file_names.keys():
-			if name not in self_file_names:
-				return False
+		if index is None:
+			index = DEFAULT_HASH_INDEX
+		return _are_the_same_trees(path=self.path, other_path=other.path, content=content, index=index)
 
-		self_dir_names = {d.name_and_extension: d for d in self.directories}
-		other_dir_names = {d.name_and_extension: d for d in other.directories}
+	def get_fingerprint(self, content=True, index=None, algorithm='sha256'):
+		"""
+		a Merkle-style digest of a file or a whole directory tree; content digests of files are indexed by
+		device, inode, size and modification time so only changed files are read again
+		:param bool content: if True, files are identified by their content, otherwise by their size and dates
+		:param HashIndex or NoneType index: None means the bounded in-memory index shared by all Paths
+		:type algorithm: str
+		:rtype: str
+		"""
+		if index is None:
+			index = DEFAULT_HASH_INDEX
+		return _get_fingerprint(path=self.path, content=content, index=index, algorithm=algorithm)
 
-		for name, directory in self_dir_names.items():
-			if name not in other_dir_names:
-				return False
+	def content_hash(self, algorithm='sha256', chunk_size=DEFAULT_CHUNK_SIZE, index=None):
+		"""
+		streams the file in chunks and returns the hex digest of its content
+		:param str algorithm: any algorithm hashlib.new accepts, e.g., 'md5', 'sha256', 'blake2b'
+		:param int chunk_size: number of bytes read at a time
+		:param HashIndex or NoneType index: if the file did not change since it was indexed, it is not read
+		:rtype: str
+		"""
+		if not self.is_file():
+			raise NotAFileError(self)
+		return _get_content_hash(path=self.path, algorithm=algorithm, chunk_size=chunk_size, index=index)
+
+	def get_content_hashes(
+			self, algorithm='sha256', chunk_size=DEFAULT_CHUNK_SIZE, index=None, num_workers=None, on_error=None
+	):
+		"""
+		hashes every file under this directory on a thread pool
+		:type algorithm: str
+		:type chunk_size: int
+		:type index: HashIndex or NoneType
+		:type num_workers: int or NoneType
+		:param callable or NoneType on_error: called with the path and the OSError of a file that cannot be read
+		:return: the digest of each file by its path
+		:rtype: dict[str, str]
+		"""
+		return _hash_files(
+			paths=self.iter_files(sort=False), algorithm=algorithm, chunk_size=chunk_size, index=index,
+			num_workers=num_workers, on_error=on_error
+		)
 
-		for name in other_dir_names.keys():
-			if name not in self_dir_names:
-				return False
+	def plan_mimic(self, other, ignore_function=None, method='content', manifest=None):
+		"""
+		compares self with other without changing anything and returns the operations
+		that mimic would apply, see Path.mimic
+		:type other: Path
+		:type ignore_function: callable or NoneType
+		:type method: str
+		:type manifest: str or Path or SyncManifest or NoneType
+		:rtype: SyncPlan
+		"""
+		if manifest is not None and not isinstance(manifest, SyncManifest):
+			manifest = SyncManifest(path=Path(manifest).path)
 
-		for name, directory in self_dir_names.items():
-			other_directory = other_dir_names[name]
+		if manifest is not None and manifest.path is not None:
+			# the manifest can live inside self without being deleted for not existing in other
+			manifest_path = get_absolute_path(path=manifest.path)
+			user_ignore_function = ignore_function
 
-			if not directory.is_the_same_directory(other_directory):
-				return False
+			def ignore_function(x):
+				if x.absolute_path == manifest_path:
+					return True
+				return user_ignore_function is not None and user_ignore_function(x)
 
-		return True
+		return _plan_sync(
+			destination=self, source=other, ignore_function=ignore_function, method=method, manifest=manifest
+		)
 
-	def mimic(self, other, ignore_function=None, echo=1):
+	def mimic(
+			self, other, ignore_function=None, method='content', manifest=None, num_workers=None, delete_method=None,
+			echo=1
+	):
 		"""
 		syncs self with other path which must be a directory by mimicking it
 		:type other: Path
 		:type ignore_function: callable or NoneType
+		:param str method: how files with the same name are compared: 'content' compares bytes when the stat
+		signatures differ, 'stat' only compares size and modification time, 'hash' compares content digests
+		:param str or Path or SyncManifest or NoneType manifest: where the state of the synced files is kept,
+		files that did not change on either side since the last sync are skipped without being compared
+		:param int or NoneType num_workers: maximum number of files deleted or copied at the same time
+		:param str or NoneType delete_method: how paths that are not in other are deleted, see Path.delete
 		:rtype: Path
 		"""
 		if echo:
 			print(f'"{self.absolute_path}" mimicking "{other.absolute_path}" ')
-		if not self.exists():
-			self.make_directory()
-		if not other.exists():
-			raise PathDoesNotExistError(other)
-		if other.is_file():
-			raise NotADirectoryError(other)
-		if self.is_inside(path=other):
-			raise DiskError(f'"{self.path}" is inside "{other.path}"!')
-		if self.contains(path=other):
-			raise DiskError(f'"{self.path}" contains "{other.path}"!')
-
-		self_files = {file.name_and_extension: file for file in self.files}
-		other_files = {file.name_and_extension: file for file in other.files}
-
-		if ignore_function is None:
-			def ignore_function(x):
-				return False
-
-		for name, file in self_files.items():
-			if ignore_function(file):
-				continue
-
-			elif name not in other_files:
-				file.delete(echo=echo)
-
-		for name, other_file in other_files.items():
-			if ignore_function(other_file):
-				continue
-
-			elif name not in self_files:
-				self_file = self / name
-				if ignore_function(self_file):
-					continue
-				else:
-					other_file.copy(new_path=self_file.absolute_path, echo=echo)
-
-			else:
-				self_file = self_files[name]
-				if ignore_function(self_file):
-					continue
-
-				elif not other_file.is_the_same_file(self_file):
-					self_file.delete(echo=echo)
-					other_file.copy(new_path=self_file.absolute_path, echo=echo)
-
-		self_directories = {d.name_and_extension: d for d in self.directories}
-		other_directories = {d.name_and_extension: d for d in other.directories}
-
-		for name, directory in self_directories.items():
-			if ignore_function(directory):
-				continue
-			elif name not in other_directories:
-				directory.delete(echo=echo)
-
-		for name, other_directory in other_directories.items():
-			if ignore_function(other_directory):
-				continue
-
-			elif name not in self_directories:
-				self_directory = self / name
-				if ignore_function is not None and ignore_function(self_directory):
-					continue
-
-				else:
-					other_directory.copy(new_path=self_directory.absolute_path, echo=echo)
-			else:
-				self_directory = self_directories[name]
-				if ignore_function(self_directory):
-					continue
-				else:
-					self_directory.mimic(other_directory, ignore_function=ignore_function, echo=echo)
+		plan = self.plan_mimic(other=other, ignore_function=ignore_function, method=method, manifest=manifest)
+		plan.execute(num_workers=num_workers, delete_method=delete_method, echo=echo)
+		self._reset_metadata()
+		return self
 
 	# aliases
 
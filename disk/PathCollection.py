@@ -0,0 +1,228 @@
+from .Path import Path
+from .individual_functions import path_exists
+from .directory_size import get_directory_size
+from .parallel import get_num_workers
+import numbers
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+
+# BatchResult keeps the outcome of every path in the order the paths were given, so a path given twice is there twice
+class BatchResult:
+	def __init__(self, operation):
+		"""
+		:param str operation: name of the operation that produced the result
+		"""
+		self._operation = operation
+		self._results = []
+		self._errors = []
+		self._num_paths = 0
+
+	def __repr__(self):
+		return f'<BatchResult:{self._operation} - {len(self._results)} succeeded, {len(self._errors)} failed>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __len__(self):
+		return self._num_paths
+
+	def _add(self, path, succeeded, result):
+		"""
+		:type path: Path
+		:type succeeded: bool
+		:param object result: the result of the operation or the error it raised
+		"""
+		if succeeded:
+			self._results.append((path, result))
+		else:
+			self._errors.append((path, result))
+		self._num_paths += 1
+
+	@property
+	def results(self):
+		"""
+		:return: the path and the result of each operation that succeeded, in the order of the paths
+		:rtype: list[tuple[Path, object]]
+		"""
+		return list(self._results)
+
+	@property
+	def errors(self):
+		"""
+		:return: the path and the error of each operation that failed, in the order of the paths
+		:rtype: list[tuple[Path, Exception]]
+		"""
+		return list(self._errors)
+
+	@property
+	def succeeded(self):
+		"""
+		:rtype: list[Path]
+		"""
+		return [path for path, _ in self._results]
+
+	@property
+	def failed(self):
+		"""
+		:rtype: list[Path]
+		"""
+		return [path for path, _ in self._errors]
+
+	@property
+	def total(self):
+		"""
+		:return: the sum of the results, e.g., the total size or the number of existing paths,
+		the total st_size of stat results, or None if the results are not numbers
+		:rtype: int or float or NoneType
+		"""
+		values = [value for _, value in self._results]
+		if all(isinstance(value, os.stat_result) for value in values):
+			return sum(value.st_size for value in values)
+		if all(isinstance(value, numbers.Number) for value in values):
+			return sum(values)
+		return None
+
+	def is_successful(self):
+		"""
+		:rtype: bool
+		"""
+		return len(self._errors) == 0
+
+	def raise_errors(self):
+		"""
+		raises the first error, if there was any
+		"""
+		for path, error in self._errors:
+			raise error
+
+
+def _get_size_bytes(path):
+	"""
+	:type path: str
+	:rtype: int
+	"""
+	stat_result = os.stat(path)
+	if stat.S_ISDIR(stat_result.st_mode):
+		return get_directory_size(path=path, num_workers=1).size_bytes
+	return stat_result.st_size
+
+
+# PathCollection runs the same operation on many paths at once on a thread pool
+class PathCollection:
+	def __init__(self, paths, num_workers=None, chunk_size=256):
+		"""
+		:type paths: collections.Iterable[str or Path]
+		:param int or NoneType num_workers: number of threads running the operations
+		:param int chunk_size: number of paths each thread handles at a time, which keeps the overhead per path low
+		"""
+		self._paths = [x if isinstance(x, Path) else Path(path=x) for x in paths]
+		self._num_workers = num_workers
+		self._chunk_size = chunk_size
+
+	def __repr__(self):
+		return f'<PathCollection:{len(self._paths)} paths>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __len__(self):
+		return len(self._paths)
+
+	def __iter__(self):
+		return iter(self._paths)
+
+	def __getitem__(self, item):
+		if isinstance(item, slice):
+			return self.__class__(paths=self._paths[item], num_workers=self._num_workers, chunk_size=self._chunk_size)
+		return self._paths[item]
+
+	@property
+	def paths(self):
+		"""
+		:rtype: list[Path]
+		"""
+		return list(self._paths)
+
+	def _run(self, operation, function):
+		"""
+		:param str operation: name of the operation
+		:param callable function: takes a Path and returns its result
+		:rtype: BatchResult
+		"""
+		def run_chunk(paths):
+			results = []
+			for path in paths:
+				try:
+					results.append((path, True, function(path)))
+				except Exception as error:
+					results.append((path, False, error))
+			return results
+
+		chunks = [self._paths[i:i + self._chunk_size] for i in range(0, len(self._paths), self._chunk_size)]
+		batch_result = BatchResult(operation=operation)
+		with ThreadPoolExecutor(max_workers=get_num_workers(self._num_workers)) as executor:
+			for results in executor.map(run_chunk, chunks):
+				for path, succeeded, result in results:
+					batch_result._add(path=path, succeeded=succeeded, result=result)
+		return batch_result
+
+	def exists(self):
+		"""
+		:return: True or False for each path
+		:rtype: BatchResult
+		"""
+		return self._run(operation='exists', function=lambda x: path_exists(path=x.path))
+
+	def stat(self):
+		"""
+		:return: the os.stat_result of each path
+		:rtype: BatchResult
+		"""
+		return self._run(operation='stat', function=lambda x: os.stat(x.path))
+
+	def get_size_bytes(self):
+		"""
+		:return: the size of each path, directories are added up; BatchResult.total is the size of all of them
+		:rtype: BatchResult
+		"""
+		return self._run(operation='get_size_bytes', function=lambda x: _get_size_bytes(path=x.path))
+
+	def delete(self, method=None, echo=0):
+		"""
+		:param str or NoneType method: 'trash' or 'permanent', None means the method set by set_delete_method
+		:rtype: BatchResult
+		"""
+		return self._run(operation='delete', function=lambda x: x.delete(method=method, num_workers=1, echo=echo))
+
+	def move(self, new_directory):
+		"""
+		:type new_directory: str or Path
+		:return: the new Path of each path
+		:rtype: BatchResult
+		"""
+		new_directory = Path(new_directory)
+		if not new_directory.exists():
+			new_directory.make_dir()
+
+		def move(path):
+			# the collection keeps pointing at the old locations
+			return Path(path=path.path).move(new_directory=new_directory)
+
+		return self._run(operation='move', function=move)
+
+	def copy(self, new_directory, clean_copy=True, echo=0):
+		"""
+		:type new_directory: str or Path
+		:type clean_copy: bool
+		:return: the Path of each copy
+		:rtype: BatchResult
+		"""
+		new_directory = Path(new_directory)
+		if not new_directory.exists():
+			new_directory.make_dir()
+		return self._run(
+			operation='copy',
+			function=lambda x: x.copy(new_directory=new_directory, clean_copy=clean_copy, echo=echo)
+		)
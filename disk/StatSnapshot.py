@@ -0,0 +1,178 @@
+from .get_creation_date import get_creation_date_from_stat
+import os
+import stat
+from time import monotonic
+
+
+# StatSnapshot holds the result of a single os.stat call and answers every metadata question from it
+class StatSnapshot:
+	def __init__(self, path, ttl=None, stat_result=None):
+		"""
+		:param str path: the path to stat
+		:param float or int or NoneType ttl: seconds before the snapshot is considered stale, None means never
+		:param os.stat_result or NoneType stat_result: a stat result that is already available, e.g., from os.scandir
+		"""
+		self._path = path
+		self._ttl = ttl
+		self._stat_result = None
+		self._time = None
+		if stat_result is None:
+			self.refresh()
+		else:
+			self._set_stat_result(stat_result=stat_result)
+
+	def __repr__(self):
+		return f'<StatSnapshot:{self._path}>'
+
+	def __str__(self):
+		return repr(self)
+
+	def _set_stat_result(self, stat_result):
+		self._stat_result = stat_result
+		self._time = monotonic()
+
+	def refresh(self):
+		"""
+		takes a new snapshot with one os.stat call
+		:rtype: StatSnapshot
+		"""
+		try:
+			stat_result = os.stat(self._path)
+		except (OSError, ValueError):
+			stat_result = None
+		self._set_stat_result(stat_result=stat_result)
+		return self
+
+	def expire(self):
+		"""
+		makes the snapshot stale so it is refreshed the next time it is used
+		"""
+		self._time = None
+
+	def on_change(self, event):
+		"""
+		expires the snapshot when its path, or anything under it, changes
+		:type event: ChangeEvent
+		"""
+		if event.concerns(path=os.path.abspath(self._path)):
+			self.expire()
+
+	@property
+	def ttl(self):
+		"""
+		:rtype: float or int or NoneType
+		"""
+		return self._ttl
+
+	@ttl.setter
+	def ttl(self, ttl):
+		self._ttl = ttl
+
+	@property
+	def age(self):
+		"""
+		:return: number of seconds since the snapshot was taken
+		:rtype: float
+		"""
+		if self._time is None:
+			return float('inf')
+		return monotonic() - self._time
+
+	def is_expired(self):
+		"""
+		:rtype: bool
+		"""
+		if self._time is None:
+			return True
+		elif self._ttl is None:
+			return False
+		else:
+			return self.age >= self._ttl
+
+	@property
+	def stat_result(self):
+		"""
+		:rtype: os.stat_result or NoneType
+		"""
+		return self._stat_result
+
+	@property
+	def exists(self):
+		"""
+		:rtype: bool
+		"""
+		return self._stat_result is not None
+
+	def _get_stat_result(self):
+		if self._stat_result is None:
+			raise FileNotFoundError(f'The path "{self._path}" does not exist!')
+		return self._stat_result
+
+	@property
+	def is_file(self):
+		"""
+		:rtype: bool
+		"""
+		return stat.S_ISREG(self._get_stat_result().st_mode)
+
+	@property
+	def is_directory(self):
+		"""
+		:rtype: bool
+		"""
+		return stat.S_ISDIR(self._get_stat_result().st_mode)
+
+	@property
+	def type(self):
+		"""
+		:return: the same values as Path.type
+		:rtype: str
+		"""
+		if not self.exists:
+			return 'nonexistent path'
+		elif self.is_file:
+			return 'file'
+		else:
+			return 'directory'
+
+	@property
+	def size_bytes(self):
+		"""
+		:rtype: int
+		"""
+		return self._get_stat_result().st_size
+
+	@property
+	def creation_date(self):
+		"""
+		:rtype: float
+		"""
+		return get_creation_date_from_stat(self._get_stat_result())
+
+	@property
+	def modification_date(self):
+		"""
+		:rtype: float
+		"""
+		return self._get_stat_result().st_mtime
+
+	@property
+	def modification_time_ns(self):
+		"""
+		:rtype: int
+		"""
+		return self._get_stat_result().st_mtime_ns
+
+	@property
+	def inode(self):
+		"""
+		:rtype: int
+		"""
+		return self._get_stat_result().st_ino
+
+	@property
+	def device(self):
+		"""
+		:rtype: int
+		"""
+		return self._get_stat_result().st_dev
@@ -0,0 +1,106 @@
+from .pickle_function import pickle as _pickle
+from .pickle_function import unpickle as _unpickle
+from .individual_functions import path_exists
+from threading import Lock
+
+
+def get_signature(stat_result):
+	"""
+	:type stat_result: os.stat_result
+	:rtype: tuple
+	"""
+	return stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino
+
+
+# SyncManifest remembers the state of every file pair after a sync so the next sync can skip the ones that did not change
+class SyncManifest:
+	def __init__(self, path=None):
+		"""
+		:param str or NoneType path: the file the manifest is persisted in, None keeps it in memory only
+		"""
+		if path is not None and not isinstance(path, str):
+			path = path.path
+		self._path = path
+		self._lock = Lock()
+		if path is not None and path_exists(path=path):
+			self._records = _unpickle(path=path)
+		else:
+			self._records = {}
+
+	def __repr__(self):
+		return f'<SyncManifest:{self._path} - {len(self._records)} files>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __len__(self):
+		return len(self._records)
+
+	def __contains__(self, relative_path):
+		return relative_path in self._records
+
+	@property
+	def path(self):
+		"""
+		:rtype: str or NoneType
+		"""
+		return self._path
+
+	def is_unchanged(self, relative_path, source_stat, destination_stat):
+		"""
+		:type relative_path: str
+		:type source_stat: os.stat_result
+		:type destination_stat: os.stat_result
+		:return: True if neither file changed since they were recorded as the same
+		:rtype: bool
+		"""
+		record = self._records.get(relative_path)
+		if record is None:
+			return False
+		source_signature, destination_signature, _ = record
+		return source_signature == get_signature(source_stat) and destination_signature == get_signature(destination_stat)
+
+	def get_digest(self, relative_path, stat_result, source=True):
+		"""
+		:type relative_path: str
+		:type stat_result: os.stat_result
+		:param bool source: True for the source file, False for the destination file
+		:return: the recorded content digest if the file did not change since it was recorded
+		:rtype: str or NoneType
+		"""
+		record = self._records.get(relative_path)
+		if record is None:
+			return None
+		signature = record[0] if source else record[1]
+		if signature != get_signature(stat_result):
+			return None
+		return record[2]
+
+	def set(self, relative_path, source_stat, destination_stat, digest=None):
+		"""
+		records that the two files are the same
+		:type relative_path: str
+		:type source_stat: os.stat_result
+		:type destination_stat: os.stat_result
+		:type digest: str or NoneType
+		"""
+		with self._lock:
+			self._records[relative_path] = (get_signature(source_stat), get_signature(destination_stat), digest)
+
+	def remove(self, relative_path):
+		"""
+		forgets a file or every file inside a directory
+		:type relative_path: str
+		"""
+		with self._lock:
+			self._records.pop(relative_path, None)
+			prefixes = tuple(f'{relative_path}{separator}' for separator in ('/', '\\'))
+			for key in [key for key in self._records if key.startswith(prefixes)]:
+				del self._records[key]
+
+	def save(self, echo=0):
+		if self._path is None:
+			return
+		with self._lock:
+			records = dict(self._records)
+		_pickle(obj=records, path=self._path, method='pickle', echo=echo)
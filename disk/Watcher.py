@@ -0,0 +1,498 @@
+from .individual_functions import is_nameless
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import warnings
+from threading import Event
+from threading import Lock
+from threading import Thread
+
+
+class ChangeEvent:
+	CREATED = 'created'
+	MODIFIED = 'modified'
+	DELETED = 'deleted'
+
+	def __init__(self, kind, path, is_directory=False):
+		"""
+		:param str kind: one of 'created', 'modified' or 'deleted'
+		:param str path: the absolute path that changed
+		:param bool is_directory: True if the path is, or was, a directory
+		"""
+		self._kind = kind
+		self._path = path
+		self._is_directory = is_directory
+
+	def __repr__(self):
+		return f'<ChangeEvent:{self._kind} "{self._path}">'
+
+	def __str__(self):
+		return repr(self)
+
+	def __eq__(self, other):
+		if not isinstance(other, ChangeEvent):
+			return NotImplemented
+		return (self._kind, self._path, self._is_directory) == (other._kind, other._path, other._is_directory)
+
+	def __hash__(self):
+		return hash((self._kind, self._path, self._is_directory))
+
+	@property
+	def kind(self):
+		"""
+		:rtype: str
+		"""
+		return self._kind
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	@property
+	def is_directory(self):
+		"""
+		:rtype: bool
+		"""
+		return self._is_directory
+
+	@property
+	def parent_directory(self):
+		"""
+		:rtype: str
+		"""
+		return os.path.dirname(self._path)
+
+	def concerns(self, path):
+		"""
+		:param str path: an absolute path
+		:return: True if the change happened at the path or anywhere under it,
+		or the path is under a directory that changed as a whole
+		:rtype: bool
+		"""
+		path = os.path.normcase(path)
+		own_path = os.path.normcase(self._path)
+		if own_path == path or own_path.startswith(path.rstrip(os.sep) + os.sep):
+			return True
+		return self._is_directory and path.startswith(own_path.rstrip(os.sep) + os.sep)
+
+
+def _take_snapshot(root):
+	"""
+	:type root: str
+	:return: the type, size and modification time of every entry under root
+	:rtype: dict[str, tuple]
+	"""
+	snapshot = {}
+	stack = [root]
+	while stack:
+		directory = stack.pop()
+		try:
+			with os.scandir(directory) as entries:
+				entries = list(entries)
+		except OSError:
+			continue
+		for entry in entries:
+			if is_nameless(name=entry.name):
+				continue
+			try:
+				is_directory = entry.is_dir(follow_symlinks=False)
+				stat_result = entry.stat(follow_symlinks=False)
+			except OSError:
+				continue
+			if is_directory:
+				# only the entries of a directory matter, they are compared on their own
+				snapshot[entry.path] = (True, None, None)
+				stack.append(entry.path)
+			else:
+				snapshot[entry.path] = (False, stat_result.st_size, stat_result.st_mtime_ns)
+	return snapshot
+
+
+def _compare_snapshots(old, new):
+	"""
+	:type old: dict[str, tuple]
+	:type new: dict[str, tuple]
+	:rtype: list[ChangeEvent]
+	"""
+	events = []
+	for path, (was_directory, _, _) in old.items():
+		record = new.get(path)
+		if record is None or record[0] != was_directory:
+			events.append(ChangeEvent(kind=ChangeEvent.DELETED, path=path, is_directory=was_directory))
+	for path, record in new.items():
+		previous = old.get(path)
+		if previous is None or previous[0] != record[0]:
+			events.append(ChangeEvent(kind=ChangeEvent.CREATED, path=path, is_directory=record[0]))
+		elif previous != record:
+			events.append(ChangeEvent(kind=ChangeEvent.MODIFIED, path=path, is_directory=record[0]))
+	return events
+
+
+class _PollingBackend:
+	def __init__(self, root):
+		self._root = root
+		self._snapshot = _take_snapshot(root)
+
+	def read(self, timeout, stop_event):
+		if timeout:
+			stop_event.wait(timeout)
+		snapshot = _take_snapshot(self._root)
+		events = _compare_snapshots(old=self._snapshot, new=snapshot)
+		self._snapshot = snapshot
+		return events
+
+	def close(self):
+		pass
+
+
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ONLYDIR = 0x1000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_INOTIFY_MASK = (
+	_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+	"""
+	:return: the C library if it provides inotify
+	:rtype: ctypes.CDLL or NoneType
+	"""
+	if not sys.platform.startswith('linux'):
+		return None
+	try:
+		libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+	except OSError:
+		return None
+	if not hasattr(libc, 'inotify_init1'):
+		return None
+	return libc
+
+
+_libc = _load_libc()
+
+
+def is_inotify_available():
+	"""
+	:rtype: bool
+	"""
+	return _libc is not None
+
+
+class _InotifyBackend:
+	def __init__(self, root):
+		self._root = root
+		self._fd = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+		if self._fd < 0:
+			error_number = ctypes.get_errno()
+			raise OSError(error_number, os.strerror(error_number))
+		self._watches = {}
+		# snapshots of the directories that could not be watched, they are polled instead
+		self._polled = {}
+		self._add_tree(root, events=None)
+
+	def _add_watch(self, directory, events):
+		"""
+		:return: True if the directory is watched, False if it is gone, cannot be read or is polled instead
+		:rtype: bool
+		"""
+		watch_descriptor = _libc.inotify_add_watch(self._fd, os.fsencode(directory), _INOTIFY_MASK)
+		if watch_descriptor >= 0:
+			self._watches[watch_descriptor] = directory
+			return True
+
+		error_number = ctypes.get_errno()
+		if error_number in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+			# a directory that is already gone or cannot be read is not watched, nor could it be polled
+			return False
+		if error_number in (errno.ENOSPC, errno.ENOMEM):
+			# the limit of watches, fs.inotify.max_user_watches, is reached
+			warnings.warn(f'"{directory}" is polled because it cannot be watched: {os.strerror(error_number)}')
+			# the entries of a new directory are reported as created, the same as when it is watched
+			self._polled[directory] = {} if events is not None else _take_snapshot(directory)
+			return False
+		raise OSError(error_number, os.strerror(error_number), directory)
+
+	def _add_tree(self, directory, events):
+		"""
+		watches a directory and everything under it; for a new directory, its entries are reported as created
+		because they may have appeared before the watch was added
+		"""
+		stack = [directory]
+		while stack:
+			directory = stack.pop()
+			if not self._add_watch(directory, events=events):
+				continue
+			try:
+				with os.scandir(directory) as entries:
+					entries = list(entries)
+			except OSError:
+				continue
+			for entry in entries:
+				if is_nameless(name=entry.name):
+					continue
+				try:
+					is_directory = entry.is_dir(follow_symlinks=False)
+				except OSError:
+					continue
+				if events is not None:
+					events.append(ChangeEvent(kind=ChangeEvent.CREATED, path=entry.path, is_directory=is_directory))
+				if is_directory:
+					stack.append(entry.path)
+
+	def _remove_tree(self, directory):
+		"""
+		stops watching a directory that was moved away, the kernel keeps its watch under the old path
+		"""
+		prefix = directory + os.sep
+		for watch_descriptor, path in list(self._watches.items()):
+			if path == directory or path.startswith(prefix):
+				_libc.inotify_rm_watch(self._fd, watch_descriptor)
+				self._watches.pop(watch_descriptor, None)
+		for path in list(self._polled):
+			if path == directory or path.startswith(prefix):
+				del self._polled[path]
+
+	def _poll(self):
+		"""
+		:return: the changes in the directories that are polled
+		:rtype: list[ChangeEvent]
+		"""
+		events = []
+		for directory, snapshot in list(self._polled.items()):
+			new_snapshot = _take_snapshot(directory)
+			events.extend(_compare_snapshots(old=snapshot, new=new_snapshot))
+			if os.path.isdir(directory):
+				self._polled[directory] = new_snapshot
+			else:
+				# its deletion is reported by the watch of its parent
+				del self._polled[directory]
+		return events
+
+	def _read_data(self):
+		chunks = []
+		while True:
+			try:
+				chunk = os.read(self._fd, 65536)
+			except BlockingIOError:
+				break
+			if not chunk:
+				break
+			chunks.append(chunk)
+		return b''.join(chunks)
+
+	def read(self, timeout, stop_event):
+		ready, _, _ = select.select([self._fd], [], [], timeout)
+		if not ready:
+			return self._poll()
+		data = self._read_data()
+		events = []
+		offset = 0
+		while offset + _EVENT_HEADER.size <= len(data):
+			watch_descriptor, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+			name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+			offset += _EVENT_HEADER.size + length
+
+			if mask & _IN_Q_OVERFLOW:
+				# events were lost, so everything under the root has to be considered changed
+				events.append(ChangeEvent(kind=ChangeEvent.MODIFIED, path=self._root, is_directory=True))
+				continue
+			if mask & _IN_IGNORED:
+				self._watches.pop(watch_descriptor, None)
+				continue
+			directory = self._watches.get(watch_descriptor)
+			if directory is None or not name:
+				continue
+			name = os.fsdecode(name)
+			if is_nameless(name=name):
+				continue
+
+			path = os.path.join(directory, name)
+			is_directory = bool(mask & _IN_ISDIR)
+			if mask & (_IN_CREATE | _IN_MOVED_TO):
+				event = ChangeEvent(kind=ChangeEvent.CREATED, path=path, is_directory=is_directory)
+			elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+				event = ChangeEvent(kind=ChangeEvent.DELETED, path=path, is_directory=is_directory)
+			else:
+				event = ChangeEvent(kind=ChangeEvent.MODIFIED, path=path, is_directory=is_directory)
+
+			# a single write can produce several modify events in a row
+			if len(events) == 0 or events[-1] != event:
+				events.append(event)
+			if is_directory and event.kind == ChangeEvent.CREATED:
+				self._add_tree(path, events=events)
+			elif is_directory and mask & _IN_MOVED_FROM:
+				self._remove_tree(path)
+		return events + self._poll()
+
+	def close(self):
+		if self._fd is not None:
+			os.close(self._fd)
+			self._fd = None
+
+
+# Watcher reports the files and directories that are created, modified or deleted under a directory
+# and passes them to its subscribers, e.g., the on_change methods of caches that must not serve stale values
+class Watcher:
+	POLLING = 'polling'
+	INOTIFY = 'inotify'
+
+	def __init__(self, path, interval=1, method=None, on_error=None):
+		"""
+		:param str or Path path: the directory to watch
+		:param float or int interval: seconds between two polls, inotify reports changes as soon as they happen
+		:param str or NoneType method: 'inotify', 'polling' or None to use inotify where it is available
+		:param callable or NoneType on_error: called with the event and the error when a subscriber fails;
+		if None, the error is raised by poll and, on the background thread, it is reported as a warning
+		"""
+		if not isinstance(path, str):
+			path = path.path
+		self._path = os.path.abspath(path)
+		self._interval = interval
+		if method is None:
+			method = self.INOTIFY if is_inotify_available() else self.POLLING
+		if method == self.INOTIFY:
+			if not is_inotify_available():
+				raise OSError('inotify is not available on this system')
+			self._backend = _InotifyBackend(root=self._path)
+		elif method == self.POLLING:
+			self._backend = _PollingBackend(root=self._path)
+		else:
+			raise ValueError(f'method should be one of "{self.INOTIFY}" or "{self.POLLING}", not "{method}"')
+		self._method = method
+		self._on_error = on_error
+		self._subscribers = []
+		self._lock = Lock()
+		self._poll_lock = Lock()
+		self._stop_event = Event()
+		self._thread = None
+
+	def __repr__(self):
+		return f'<Watcher:{self._path} - {self._method}>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __enter__(self):
+		return self.start()
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	@property
+	def method(self):
+		"""
+		:rtype: str
+		"""
+		return self._method
+
+	@property
+	def is_running(self):
+		"""
+		:rtype: bool
+		"""
+		return self._thread is not None and self._thread.is_alive()
+
+	def subscribe(self, callback):
+		"""
+		:param callable callback: called with every ChangeEvent, e.g., DirectorySizeCache.on_change
+		:rtype: callable
+		"""
+		with self._lock:
+			self._subscribers.append(callback)
+		return callback
+
+	def unsubscribe(self, callback):
+		"""
+		:type callback: callable
+		"""
+		with self._lock:
+			if callback in self._subscribers:
+				self._subscribers.remove(callback)
+
+	def _dispatch(self, events, on_error):
+		with self._lock:
+			subscribers = list(self._subscribers)
+		for event in events:
+			for callback in subscribers:
+				try:
+					callback(event)
+				except Exception as error:
+					if on_error is None:
+						raise error
+					on_error(event, error)
+
+	def _warn(self, event, error):
+		warnings.warn(f'a subscriber of {self} failed on {event}: {error!r}')
+
+	def _poll(self, timeout, on_error):
+		with self._poll_lock:
+			events = self._backend.read(timeout=timeout, stop_event=self._stop_event)
+		self._dispatch(events=events, on_error=on_error)
+		return events
+
+	def poll(self, timeout=0):
+		"""
+		collects the changes since the last poll and passes them to the subscribers
+		:param float or int timeout: seconds to wait for changes
+		:rtype: list[ChangeEvent]
+		"""
+		return self._poll(timeout=timeout, on_error=self._on_error)
+
+	def _run(self):
+		# nobody could catch an error raised on this thread, and it would stop the watching
+		on_error = self._warn if self._on_error is None else self._on_error
+		while not self._stop_event.is_set():
+			self._poll(timeout=self._interval, on_error=on_error)
+
+	def start(self):
+		"""
+		watches on a background thread until stop is called
+		:rtype: Watcher
+		"""
+		if not self.is_running:
+			self._stop_event.clear()
+			self._thread = Thread(target=self._run, daemon=True)
+			self._thread.start()
+		return self
+
+	def stop(self):
+		"""
+		stops the background thread, the watcher can be started again
+		"""
+		self._stop_event.set()
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+
+	def close(self):
+		"""
+		stops watching and releases the inotify descriptor
+		"""
+		self.stop()
+		self._backend.close()
@@ -0,0 +1,236 @@
+import os
+import atexit
+import weakref
+from threading import Event
+from threading import Lock
+from threading import Thread
+from time import monotonic
+
+
+FSYNC_POLICIES = ('never', 'flush', 'close')
+
+
+# writers that were not closed are closed when the interpreter exits, the set does not keep them alive
+_open_writers = weakref.WeakSet()
+
+
+def _close_open_writers():
+	for writer in list(_open_writers):
+		writer.close()
+
+
+atexit.register(_close_open_writers)
+
+
+def _flush_periodically(reference, stop_event, flush_interval):
+	"""
+	the thread only holds a weak reference so a writer that is no longer used can be collected
+	:type reference: weakref.ref
+	:type stop_event: Event
+	:type flush_interval: float or int
+	"""
+	while not stop_event.wait(flush_interval):
+		writer = reference()
+		if writer is None:
+			return
+		writer._flush_if_idle()
+		del writer
+
+
+class _NoLock:
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		return False
+
+
+# Writer collects records in memory and writes them to the file in groups, with one system call per flush
+class Writer:
+	def __init__(
+			self, path, append=False, encoding='utf8', buffer_size=2 ** 16, flush_interval=None, fsync='never',
+			thread_safe=False
+	):
+		"""
+		:type path: str
+		:param bool append: if True, records are added to the end of the file, otherwise the file is truncated
+		:param str encoding: used for the records that are str, bytes are written as they are
+		:param int buffer_size: number of bytes collected before they are written to the file
+		:param float or int or NoneType flush_interval: if provided, records never wait longer than this many seconds
+		:param str fsync: 'never', 'flush' to make every flush durable, or 'close' to make the file durable when closed
+		:param bool thread_safe: if True, many threads can write at the same time
+		"""
+		if fsync not in FSYNC_POLICIES:
+			raise ValueError(f'fsync "{fsync}" should be one of {FSYNC_POLICIES}')
+
+		self._path = path
+		self._encoding = encoding
+		self._buffer_size = buffer_size
+		self._flush_interval = flush_interval
+		self._fsync = fsync
+		self._buffer = []
+		self._buffered_size = 0
+		self._flush_time = monotonic()
+		self._num_records = 0
+		self._num_flushes = 0
+		self._file = open(path, mode='ab' if append else 'wb', buffering=0)
+
+		if thread_safe or flush_interval is not None:
+			self._lock = Lock()
+		else:
+			self._lock = _NoLock()
+
+		self._error = None
+		self._stop_event = None
+		self._flusher = None
+		if flush_interval is not None:
+			# flushes the records of idle writers, busy writers flush while they write
+			self._stop_event = Event()
+			self._flusher = Thread(
+				target=_flush_periodically, args=(weakref.ref(self), self._stop_event, flush_interval), daemon=True
+			)
+			self._flusher.start()
+
+		_open_writers.add(self)
+
+	def __repr__(self):
+		return f'<Writer:{self._path}>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+		return False
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	@property
+	def closed(self):
+		"""
+		:rtype: bool
+		"""
+		return self._file.closed
+
+	@property
+	def num_records(self):
+		"""
+		:rtype: int
+		"""
+		return self._num_records
+
+	@property
+	def num_flushes(self):
+		"""
+		:rtype: int
+		"""
+		return self._num_flushes
+
+	def __del__(self):
+		# a writer that is garbage collected before the interpreter exits writes its records here
+		try:
+			self.close()
+		except Exception:
+			pass
+
+	def _flush_if_idle(self):
+		with self._lock:
+			if not self._file.closed and monotonic() - self._flush_time >= self._flush_interval:
+				try:
+					self._flush()
+				except Exception as error:
+					# the records stay in the buffer and the error is raised by the next write or flush
+					self._error = error
+
+	def _raise_error(self):
+		"""
+		raises the error of the last background flush, if it failed, the lock should be held
+		"""
+		if self._error is not None:
+			error = self._error
+			self._error = None
+			raise error
+
+	def _flush(self):
+		"""
+		writes the buffer to the file, the lock should be held;
+		if writing fails, the records that were not written stay in the buffer
+		"""
+		if self._buffer:
+			data = memoryview(b''.join(self._buffer))
+			try:
+				while len(data) > 0:
+					data = data[self._file.write(data):]
+			finally:
+				self._buffer = [data.tobytes()] if len(data) > 0 else []
+				self._buffered_size = len(data)
+			self._num_flushes += 1
+			if self._fsync == 'flush':
+				os.fsync(self._file.fileno())
+		self._flush_time = monotonic()
+
+	def write(self, record):
+		"""
+		:type record: str or bytes
+		"""
+		if isinstance(record, str):
+			record = record.encode(self._encoding)
+		with self._lock:
+			if self._file.closed:
+				raise ValueError(f'{self} is closed!')
+			self._raise_error()
+			self._buffer.append(record)
+			self._buffered_size += len(record)
+			self._num_records += 1
+			if self._buffered_size >= self._buffer_size or (
+				self._flush_interval is not None and monotonic() - self._flush_time >= self._flush_interval
+			):
+				self._flush()
+
+	def write_line(self, line):
+		"""
+		:param str or bytes line: a new line is added to the end
+		"""
+		if isinstance(line, str):
+			self.write(f'{line}\n')
+		else:
+			self.write(line + b'\n')
+
+	def write_lines(self, lines):
+		"""
+		:type lines: collections.Iterable[str or bytes]
+		"""
+		for line in lines:
+			self.write(line)
+
+	def flush(self):
+		"""
+		writes the collected records to the file now
+		"""
+		with self._lock:
+			if not self._file.closed:
+				self._raise_error()
+				self._flush()
+
+	def close(self):
+		"""
+		writes the collected records and closes the file, if they cannot be written the file stays open
+		"""
+		if self._stop_event is not None:
+			self._stop_event.set()
+		with self._lock:
+			if self._file.closed:
+				return
+			self._flush()
+			if self._fsync != 'never':
+				os.fsync(self._file.fileno())
+			self._file.close()
+		_open_writers.discard(self)
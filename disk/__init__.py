@@ -1,14 +1,42 @@
 from .Path import Path
+from .StatSnapshot import StatSnapshot
+from .PathCollection import PathCollection
+from .PathCollection import BatchResult
+from .AsyncPath import AsyncPath
+from .directory_size import DirectorySize
+from .directory_size import DirectorySizeCache
+from .directory_size import get_directory_size
+from .DirectoryIndex import DirectoryIndex
+from .Watcher import Watcher
+from .Watcher import ChangeEvent
+from .copy_function import copy_file
+from .copy_function import copy_directory
+from .copy_function import CopyReport
+from .SyncManifest import SyncManifest
+from .sync import SyncPlan
+from .sync import SyncOperation
+from .HashIndex import HashIndex
+from .content_hash import get_content_hash
+from .content_hash import hash_files
+from .duplicates import find_duplicates
 from .individual_functions import *
 from .pickle_function import pickle
 from .pickle_function import unpickle
 from .Cache import Cache
 from .Cache import make_cached
 from .Buffer import Buffer
+from .Writer import Writer
 from .HardFolder import HardFolder
+from .HardFolder import ArchivedHardFolder
 from .Box import Box
 from .zip import zip_file
 from .zip import zip_directory
 from .zip import unzip
+from .zip import update_zip
+from .archive import archive
+from .archive import extract_archive
+from .archive import Codec
+from .archive import register_codec
+from .ArchivePath import ArchivePath
 from .get_creation_date import get_creation_date
 from .get_creation_date import get_modification_date
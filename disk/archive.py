@@ -0,0 +1,406 @@
+from .parallel import get_num_workers
+from .exceptions import UnsafeArchiveError
+import bz2
+import gzip
+import lzma
+import os
+import tarfile
+import warnings
+from chronometry.progress import ProgressBar
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+try:
+	import lz4.frame
+except ImportError:
+	lz4 = None
+
+
+PRESETS = ('fast', 'balanced', 'small')
+
+
+# Codec compresses and decompresses the stream a tar archive is written to and read from
+class Codec:
+	def __init__(self, name, extensions, levels, magic, open_writer, open_reader, is_available=True):
+		"""
+		:param str name: the name used to choose the codec, e.g., 'gz'
+		:param tuple[str] extensions: the archive suffixes of the codec, the first one is used for new archives
+		:param dict[str, int] levels: the compression level of each preset
+		:param bytes or NoneType magic: the bytes compressed streams start with
+		:param callable open_writer: takes a binary file object, a level and a number of threads
+		and returns a file object that compresses
+		:param callable open_reader: takes a binary file object and returns a file object that decompresses
+		:param bool is_available: False if a package the codec needs is not installed
+		"""
+		self._name = name
+		self._extensions = extensions
+		self._levels = levels
+		self._magic = magic
+		self._open_writer = open_writer
+		self._open_reader = open_reader
+		self._is_available = is_available
+
+	def __repr__(self):
+		return f'<Codec:{self._name}>'
+
+	def __str__(self):
+		return repr(self)
+
+	@property
+	def name(self):
+		"""
+		:rtype: str
+		"""
+		return self._name
+
+	@property
+	def extension(self):
+		"""
+		:rtype: str
+		"""
+		return self._extensions[0]
+
+	@property
+	def extensions(self):
+		"""
+		:rtype: tuple[str]
+		"""
+		return self._extensions
+
+	@property
+	def magic(self):
+		"""
+		:rtype: bytes or NoneType
+		"""
+		return self._magic
+
+	@property
+	def is_available(self):
+		"""
+		:rtype: bool
+		"""
+		return self._is_available
+
+	def get_level(self, preset='balanced', level=None):
+		"""
+		:type preset: str
+		:type level: int or NoneType
+		:rtype: int or NoneType
+		"""
+		if level is not None:
+			return level
+		if preset not in PRESETS:
+			raise ValueError(f'preset should be one of {PRESETS}, not "{preset}"')
+		return self._levels.get(preset)
+
+	def check_availability(self):
+		"""
+		raises an ImportError if a package the codec needs is not installed
+		"""
+		if not self._is_available:
+			raise ImportError(f'the "{self._name}" codec needs a package that is not installed')
+
+	def open_writer(self, file, level=None, num_workers=None):
+		"""
+		:type file: io.BufferedIOBase
+		:rtype: io.BufferedIOBase
+		"""
+		self.check_availability()
+		return self._open_writer(file, level, num_workers)
+
+	def open_reader(self, file):
+		"""
+		:type file: io.BufferedIOBase
+		:rtype: io.BufferedIOBase
+		"""
+		self.check_availability()
+		return self._open_reader(file)
+
+
+class _Uncompressed:
+	"""
+	passes a file object through without closing it when the tar stream is closed
+	"""
+	def __init__(self, file):
+		self._file = file
+
+	def write(self, data):
+		return self._file.write(data)
+
+	def read(self, size=-1):
+		return self._file.read(size)
+
+	def close(self):
+		self._file.flush()
+
+
+def _open_zstandard_writer(file, level, num_workers):
+	# zstandard compresses on several threads by itself
+	compressor = zstandard.ZstdCompressor(level=level, threads=get_num_workers(num_workers))
+	return compressor.stream_writer(file, closefd=False)
+
+
+CODECS = {}
+
+
+def register_codec(codec):
+	"""
+	makes a codec available to archive and extract_archive
+	:type codec: Codec
+	"""
+	CODECS[codec.name] = codec
+
+
+register_codec(Codec(
+	name='tar', extensions=('.tar',), levels={}, magic=None,
+	open_writer=lambda file, level, num_workers: _Uncompressed(file),
+	open_reader=lambda file: _Uncompressed(file)
+))
+register_codec(Codec(
+	name='gz', extensions=('.tar.gz', '.tgz'), levels={'fast': 1, 'balanced': 6, 'small': 9}, magic=b'\x1f\x8b',
+	# the modification time is left out of the header so the same tree always gives the same archive
+	open_writer=lambda file, level, num_workers: gzip.GzipFile(
+		fileobj=file, mode='wb', compresslevel=9 if level is None else level, mtime=0
+	),
+	open_reader=lambda file: gzip.GzipFile(fileobj=file, mode='rb')
+))
+register_codec(Codec(
+	name='bz2', extensions=('.tar.bz2', '.tbz2'), levels={'fast': 1, 'balanced': 6, 'small': 9}, magic=b'BZh',
+	open_writer=lambda file, level, num_workers: bz2.BZ2File(
+		file, mode='wb', compresslevel=9 if level is None else level
+	),
+	open_reader=lambda file: bz2.BZ2File(file, mode='rb')
+))
+register_codec(Codec(
+	name='xz', extensions=('.tar.xz', '.txz'), levels={'fast': 0, 'balanced': 6, 'small': 9},
+	magic=b'\xfd7zXZ\x00',
+	open_writer=lambda file, level, num_workers: lzma.LZMAFile(file, mode='wb', preset=level),
+	open_reader=lambda file: lzma.LZMAFile(file, mode='rb')
+))
+register_codec(Codec(
+	name='zst', extensions=('.tar.zst', '.tzst'), levels={'fast': 1, 'balanced': 3, 'small': 19},
+	magic=b'\x28\xb5\x2f\xfd', is_available=zstandard is not None,
+	open_writer=_open_zstandard_writer,
+	open_reader=lambda file: zstandard.ZstdDecompressor().stream_reader(file, closefd=False)
+))
+register_codec(Codec(
+	name='lz4', extensions=('.tar.lz4',), levels={'fast': 0, 'balanced': 4, 'small': 16},
+	magic=b'\x04\x22\x4d\x18', is_available=lz4 is not None,
+	open_writer=lambda file, level, num_workers: lz4.frame.LZ4FrameFile(
+		file, mode='wb', compression_level=0 if level is None else level
+	),
+	open_reader=lambda file: lz4.frame.LZ4FrameFile(file, mode='rb')
+))
+
+
+# the codec a preset uses when none is chosen, the first one that is installed
+_PRESET_CODECS = {'fast': ('zst', 'lz4', 'gz'), 'balanced': ('zst', 'gz'), 'small': ('xz',)}
+
+
+def get_codec(compression=None, preset='balanced'):
+	"""
+	:param str or NoneType compression: the name of a codec, e.g., 'gz', 'xz' or 'zst', None chooses by preset
+	:type preset: str
+	:rtype: Codec
+	"""
+	if compression is None:
+		if preset not in PRESETS:
+			raise ValueError(f'preset should be one of {PRESETS}, not "{preset}"')
+		for name in _PRESET_CODECS[preset]:
+			if CODECS[name].is_available:
+				return CODECS[name]
+	if compression not in CODECS:
+		raise ValueError(f'compression should be one of {list(CODECS)}, not "{compression}"')
+	return CODECS[compression]
+
+
+def get_archive_suffix(path):
+	"""
+	:type path: str
+	:return: the codec and the suffix of an archive path, e.g., ".tar.gz", or None if it is not an archive
+	:rtype: tuple[Codec, str] or NoneType
+	"""
+	name = os.path.basename(path).lower()
+	for codec in sorted(CODECS.values(), key=lambda x: x.name == 'tar'):
+		for extension in codec.extensions:
+			if name.endswith(extension):
+				return codec, extension
+	return None
+
+
+def detect_codec(file):
+	"""
+	recognizes the codec of a seekable binary file object from its first bytes
+	:type file: io.BufferedIOBase
+	:rtype: Codec
+	"""
+	position = file.tell()
+	head = file.read(8)
+	file.seek(position)
+	for codec in CODECS.values():
+		if codec.magic is not None and head.startswith(codec.magic):
+			return codec
+	return CODECS['tar']
+
+
+def archive(
+		path, archive_path, compression=None, preset='balanced', level=None, num_workers=None, echo=0
+):
+	"""
+	writes a file or a directory to a tar stream compressed by a codec
+	:param str path: the file or directory, it is stored under its own name
+	:param str or io.BufferedIOBase archive_path: the archive file or a binary file object to stream into
+	:param str or NoneType compression: 'tar', 'gz', 'bz2', 'xz', 'zst' or 'lz4', None chooses by preset
+	:param str preset: 'fast', 'balanced' or 'small', trades speed for the size of the archive
+	:param int or NoneType level: a compression level of the codec, it overrides the preset
+	:param int or NoneType num_workers: number of threads for codecs that compress on several threads
+	:rtype: str or io.BufferedIOBase
+	"""
+	echo = max(0, echo)
+	codec = get_codec(compression=compression, preset=preset)
+	level = codec.get_level(preset=preset, level=level)
+	codec.check_availability()
+	progress_bar = ProgressBar(echo=echo, total=None)
+	amount = 0
+
+	def show(tar_info):
+		nonlocal amount
+		progress_bar.show(amount=amount, text=f'"{os.path.basename(tar_info.name)}" archived')
+		amount += 1
+		return tar_info
+
+	file = open(archive_path, 'wb') if isinstance(archive_path, str) else archive_path
+	try:
+		stream = codec.open_writer(file, level=level, num_workers=num_workers)
+		try:
+			with tarfile.open(fileobj=stream, mode='w|') as tar_file:
+				tar_file.add(os.path.normpath(path), arcname=os.path.basename(os.path.normpath(path)), filter=show)
+		finally:
+			stream.close()
+	finally:
+		if file is not archive_path:
+			file.close()
+
+	progress_bar.show(amount=amount, text='archive complete!')
+	return archive_path
+
+
+def _is_under(path, directory):
+	"""
+	:type path: str
+	:type directory: str
+	:rtype: bool
+	"""
+	try:
+		return os.path.commonpath([path, directory]) == directory
+	except ValueError:  # on different drives
+		return False
+
+
+def _check_member(member, root):
+	"""
+	rejects a member that would be written outside of the directory or that links outside of it, and special files;
+	the data filter of tarfile does the same but it is missing before Python 3.12 and a few earlier patch releases
+	:type member: tarfile.TarInfo
+	:param str root: the real path of the directory the archive is extracted into
+	"""
+	member_path = os.path.join(root, member.name)
+	if not _is_under(os.path.realpath(member_path), root):
+		raise UnsafeArchiveError(f'"{member.name}" would be extracted outside of {root}')
+	if member.issym():
+		link_target = os.path.join(os.path.realpath(os.path.dirname(member_path)), member.linkname)
+	elif member.islnk():
+		link_target = os.path.join(root, member.linkname)
+	else:
+		link_target = None
+	if link_target is not None and not _is_under(os.path.realpath(link_target), root):
+		raise UnsafeArchiveError(f'"{member.name}" links to "{member.linkname}" outside of {root}')
+	if member.ischr() or member.isblk() or member.isfifo():
+		raise UnsafeArchiveError(f'"{member.name}" is a special file')
+
+
+def extract_archive(archive_path, unzip_path, compression=None, members=None, echo=0):
+	"""
+	extracts a tar archive as a stream, so it can also be read from a pipe or a socket;
+	members that would be written or link outside of unzip_path are rejected with an UnsafeArchiveError
+	:param str or io.BufferedIOBase archive_path: the archive file or a binary file object to read from
+	:param str unzip_path: the directory the archive is extracted into
+	:param str or NoneType compression: the codec, None infers it from the suffix or the first bytes of the archive
+	:param list[str] or callable or NoneType members: only these members are extracted, either a list of names or
+	a function that takes a name and returns True for the members to extract; a stream cannot be read backwards,
+	so a hard link whose target is not extracted is skipped with a warning
+	:rtype: str
+	"""
+	echo = max(0, echo)
+	file = open(archive_path, 'rb') if isinstance(archive_path, str) else archive_path
+	try:
+		if compression is not None:
+			codec = get_codec(compression=compression)
+		elif isinstance(archive_path, str) and get_archive_suffix(archive_path) is not None:
+			codec = get_archive_suffix(archive_path)[0]
+		elif file.seekable():
+			codec = detect_codec(file)
+		else:
+			raise ValueError('compression should be provided for a stream that is not seekable')
+
+		if members is None:
+			is_selected = None
+		elif callable(members):
+			is_selected = members
+		else:
+			names = set(members)
+			is_selected = names.__contains__
+
+		root = os.path.realpath(unzip_path)
+		# where it exists, the data filter also drops set-user-id bits and the like; it is applied here
+		# rather than by extract so that the attributes of directories are the filtered ones
+		extract_arguments = {'filter': 'fully_trusted'} if hasattr(tarfile, 'data_filter') else {}
+		progress_bar = ProgressBar(echo=echo, total=None)
+		amount = 0
+		extracted = set()
+		directories = []
+		stream = codec.open_reader(file)
+		try:
+			with tarfile.open(fileobj=stream, mode='r|') as tar_file:
+				for member in tar_file:
+					if is_selected is not None and not is_selected(member.name):
+						continue
+					_check_member(member=member, root=root)
+					if hasattr(tarfile, 'data_filter'):
+						member = tarfile.data_filter(member, root)
+					if member.islnk() and member.linkname not in extracted:
+						warnings.warn(
+							f'"{member.name}" is skipped, it is a hard link to "{member.linkname}" which was not extracted'
+						)
+						continue
+
+					# like extractall, the times and modes of directories are set at the end,
+					# after the members in them are written
+					is_directory = member.isdir()
+					tar_file.extract(member, path=root, set_attrs=not is_directory, **extract_arguments)
+					if is_directory:
+						directories.append(member)
+					extracted.add(member.name)
+					progress_bar.show(amount=amount, text=f'"{os.path.basename(member.name)}" extracted')
+					amount += 1
+
+				for member in sorted(directories, key=lambda x: x.name, reverse=True):
+					directory_path = os.path.join(root, member.name)
+					try:
+						tar_file.chown(member, directory_path, False)
+						tar_file.utime(member, directory_path)
+						tar_file.chmod(member, directory_path)
+					except tarfile.ExtractError:
+						# extractall ignores these as well
+						pass
+		finally:
+			stream.close()
+	finally:
+		if file is not archive_path:
+			file.close()
+
+	progress_bar.show(amount=amount, text='extraction complete!')
+	return unzip_path
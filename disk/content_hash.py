@@ -0,0 +1,91 @@
+from .parallel import get_num_workers
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures import wait
+from concurrent.futures import FIRST_COMPLETED
+
+
+DEFAULT_CHUNK_SIZE = 2 ** 20
+
+
+def get_content_hash(path, algorithm='sha256', chunk_size=DEFAULT_CHUNK_SIZE, index=None):
+	"""
+	reads a file in chunks into one reused buffer and returns the hex digest of its content
+	:type path: str
+	:param str algorithm: any algorithm hashlib.new accepts, e.g., 'md5', 'sha1', 'sha256', 'blake2b'
+	:param int chunk_size: number of bytes read at a time
+	:param HashIndex or NoneType index: files whose device, inode, size and modification time are indexed are not read
+	:rtype: str
+	"""
+	if index is not None:
+		digest = index.get(stat_result=os.stat(path), algorithm=algorithm)
+		if digest is not None:
+			return digest
+
+	digest = hashlib.new(algorithm)
+	buffer = bytearray(chunk_size)
+	view = memoryview(buffer)
+	with open(path, 'rb', buffering=0) as file:
+		stat_before = os.fstat(file.fileno())
+		while True:
+			size = file.readinto(buffer)
+			if not size:
+				break
+			digest.update(view[:size])
+		stat_after = os.fstat(file.fileno())
+	result = digest.hexdigest()
+
+	# a file that changed while it was being read is not indexed
+	if index is not None and (stat_before.st_size, stat_before.st_mtime_ns) == (stat_after.st_size, stat_after.st_mtime_ns):
+		index.set(stat_result=stat_before, algorithm=algorithm, digest=result)
+	return result
+
+
+def hash_files(paths, algorithm='sha256', chunk_size=DEFAULT_CHUNK_SIZE, index=None, num_workers=None, on_error=None):
+	"""
+	hashes many files on a thread pool; hashlib and file reads release the GIL so the threads run in parallel
+	:type paths: collections.Iterable[str or Path]
+	:type algorithm: str
+	:type chunk_size: int
+	:type index: HashIndex or NoneType
+	:param int or NoneType num_workers: number of threads reading files
+	:param callable or NoneType on_error: called with the path and the OSError of a file that cannot be read;
+	if None the error is raised
+	:return: the digest of each path
+	:rtype: dict[str, str]
+	"""
+	num_workers = get_num_workers(num_workers)
+	result = {}
+	with ThreadPoolExecutor(max_workers=num_workers) as executor:
+		pending = {}
+
+		def collect(futures):
+			for future in futures:
+				path = pending.pop(future)
+				try:
+					result[path] = future.result()
+				except OSError as error:
+					if on_error is None:
+						raise error
+					on_error(path, error)
+
+		try:
+			for path in paths:
+				if not isinstance(path, str):
+					path = path.path
+				future = executor.submit(
+					get_content_hash, path=path, algorithm=algorithm, chunk_size=chunk_size, index=index
+				)
+				pending[future] = path
+				# only a few files wait for a thread, so the paths can come from a lazy walk of a large tree
+				if len(pending) >= num_workers * 2:
+					done, _ = wait(pending, return_when=FIRST_COMPLETED)
+					collect(done)
+			collect(as_completed(list(pending)))
+		except BaseException as error:
+			for future in pending:
+				future.cancel()
+			raise error
+	return result
@@ -0,0 +1,234 @@
+from .individual_functions import is_nameless
+from .parallel import get_num_workers
+import os
+import errno
+import shutil
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from chronometry.progress import ProgressBar
+
+
+_CHUNK_SIZE = 2 ** 30
+
+# the errors that mean the kernel cannot copy between these two files, so a slower method should be tried
+_UNSUPPORTED_ERRORS = {
+	errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ETXTBSY, errno.ENOTSOCK
+}
+
+
+def _copy_in_kernel(function, source_descriptor, destination_descriptor):
+	"""
+	copies with os.copy_file_range or os.sendfile until the end of the source file
+	:return: False if nothing was copied, either because the method is not supported for these files or because
+	the source is empty or, like files in procfs, sysfs and some FUSE file systems, only reports data when read
+	:rtype: bool
+	"""
+	offset = 0
+	while True:
+		try:
+			if function is os.sendfile:
+				copied = os.sendfile(destination_descriptor, source_descriptor, offset, _CHUNK_SIZE)
+			else:
+				copied = function(source_descriptor, destination_descriptor, _CHUNK_SIZE)
+		except OSError as error:
+			if offset == 0 and error.errno in _UNSUPPORTED_ERRORS:
+				return False
+			raise error
+		if copied == 0:
+			# an empty file is copied just as well by the fallback
+			return offset > 0
+		offset += copied
+
+
+def copy_file(source, destination):
+	"""
+	copies the content and the metadata of a file like shutil.copy2 does, but lets the kernel move the data
+	with os.copy_file_range (which can share blocks on copy-on-write file systems) or os.sendfile when available
+	:type source: str
+	:type destination: str
+	:return: number of bytes copied
+	:rtype: int
+	"""
+	with open(source, 'rb') as source_file, open(destination, 'wb') as destination_file:
+		source_descriptor = source_file.fileno()
+		destination_descriptor = destination_file.fileno()
+
+		copied = False
+		for function in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+			if function is not None and _copy_in_kernel(
+				function=function, source_descriptor=source_descriptor, destination_descriptor=destination_descriptor
+			):
+				copied = True
+				break
+
+		if not copied:
+			shutil.copyfileobj(source_file, destination_file, length=2 ** 20)
+		# the size reported by stat is 0 for files that are generated when they are read
+		size_bytes = destination_file.tell()
+
+	shutil.copystat(source, destination)
+	return size_bytes
+
+
+class CopyReport:
+	def __init__(self, source, destination, num_files, num_directories, size_bytes, seconds):
+		"""
+		:type source: str
+		:type destination: str
+		:type num_files: int
+		:type num_directories: int
+		:type size_bytes: int
+		:type seconds: float
+		"""
+		self._source = source
+		self._destination = destination
+		self._num_files = num_files
+		self._num_directories = num_directories
+		self._size_bytes = size_bytes
+		self._seconds = seconds
+
+	def __repr__(self):
+		return (
+			f'<CopyReport:{self._num_files} files ({self._size_bytes} bytes) in {round(self._seconds, 3)} seconds'
+			f' - {round(self.megabytes_per_second, 3)} MB/s>'
+		)
+
+	def __str__(self):
+		return repr(self)
+
+	@property
+	def source(self):
+		"""
+		:rtype: str
+		"""
+		return self._source
+
+	@property
+	def destination(self):
+		"""
+		:rtype: str
+		"""
+		return self._destination
+
+	@property
+	def num_files(self):
+		"""
+		:rtype: int
+		"""
+		return self._num_files
+
+	@property
+	def num_directories(self):
+		"""
+		:rtype: int
+		"""
+		return self._num_directories
+
+	@property
+	def size_bytes(self):
+		"""
+		:rtype: int
+		"""
+		return self._size_bytes
+
+	@property
+	def seconds(self):
+		"""
+		:rtype: float
+		"""
+		return self._seconds
+
+	@property
+	def bytes_per_second(self):
+		"""
+		:rtype: float
+		"""
+		if self._seconds == 0:
+			return float('inf') if self._size_bytes > 0 else 0.0
+		return self._size_bytes / self._seconds
+
+	@property
+	def megabytes_per_second(self):
+		"""
+		:rtype: float
+		"""
+		return self.bytes_per_second / (2 ** 20)
+
+	@property
+	def files_per_second(self):
+		"""
+		:rtype: float
+		"""
+		if self._seconds == 0:
+			return float('inf') if self._num_files > 0 else 0.0
+		return self._num_files / self._seconds
+
+
+def plan_directory_copy(path):
+	"""
+	lists the whole tree once, in the same way Path.list sees it
+	:type path: str
+	:return: relative paths of the directories (parents before children) and relative paths of the files
+	:rtype: tuple[list[str], list[str]]
+	"""
+	directories = []
+	files = []
+	stack = ['']
+	while stack:
+		relative_directory = stack.pop()
+		with os.scandir(os.path.join(path, relative_directory)) as entries:
+			for entry in entries:
+				if is_nameless(name=entry.name):
+					continue
+				relative_path = os.path.join(relative_directory, entry.name)
+				if entry.is_file():
+					files.append(relative_path)
+				elif entry.is_dir():
+					directories.append(relative_path)
+					stack.append(relative_path)
+	return directories, files
+
+
+def copy_directory(path, new_path, num_workers=None, echo=0):
+	"""
+	copies the content of a directory into another directory: the tree is planned once,
+	the directories are created and then the files are copied on a thread pool
+	:type path: str
+	:type new_path: str
+	:param int or NoneType num_workers: number of threads copying files
+	:type echo: int or bool
+	:rtype: CopyReport
+	"""
+	echo = max(0, echo)
+	start = perf_counter()
+	directories, files = plan_directory_copy(path=path)
+
+	os.makedirs(new_path, exist_ok=True)
+	for directory in directories:
+		os.makedirs(os.path.join(new_path, directory), exist_ok=True)
+
+	progress_bar = ProgressBar(echo=echo, total=len(files))
+	size_bytes = 0
+	amount = 0
+	with ThreadPoolExecutor(max_workers=get_num_workers(num_workers)) as executor:
+		futures = {
+			executor.submit(copy_file, source=os.path.join(path, file), destination=os.path.join(new_path, file)): file
+			for file in files
+		}
+		try:
+			for future in as_completed(futures):
+				size_bytes += future.result()
+				amount += 1
+				progress_bar.show(amount=amount, text=f'"{futures[future]}" copied')
+		except BaseException as error:
+			for future in futures:
+				future.cancel()
+			raise error
+
+	report = CopyReport(
+		source=path, destination=new_path, num_files=len(files), num_directories=len(directories),
+		size_bytes=size_bytes, seconds=perf_counter() - start
+	)
+	progress_bar.show(amount=amount, text=f'{report}')
+	return report
@@ -0,0 +1,301 @@
+from .individual_functions import is_nameless
+from .parallel import get_num_workers
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from concurrent.futures import FIRST_COMPLETED
+from threading import Lock
+
+
+class DirectorySize:
+	def __init__(self, path):
+		"""
+		:type path: str
+		"""
+		self._path = path
+		self._files_size_bytes = 0
+		self._num_own_files = 0
+		self._subdirectories = {}
+		self._size_bytes = None
+		self._num_files = None
+		self._num_directories = None
+
+	def __repr__(self):
+		return f'<DirectorySize:{self._path} - {self.size_bytes} bytes in {self.num_files} files>'
+
+	def __str__(self):
+		return repr(self)
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	@property
+	def size_bytes(self):
+		"""
+		:return: total size of the files in this directory and all of its subdirectories
+		:rtype: int
+		"""
+		return self._size_bytes
+
+	@property
+	def num_files(self):
+		"""
+		:return: number of files in this directory and all of its subdirectories
+		:rtype: int
+		"""
+		return self._num_files
+
+	@property
+	def num_directories(self):
+		"""
+		:return: number of directories under this directory, at any depth
+		:rtype: int
+		"""
+		return self._num_directories
+
+	@property
+	def subdirectories(self):
+		"""
+		:return: the breakdown of the immediate subdirectories by name
+		:rtype: dict[str, DirectorySize]
+		"""
+		return self._subdirectories
+
+	def _add_up(self):
+		"""
+		computes the totals, the subdirectories should already be added up
+		"""
+		self._size_bytes = self._files_size_bytes + sum(x.size_bytes for x in self._subdirectories.values())
+		self._num_files = self._num_own_files + sum(x.num_files for x in self._subdirectories.values())
+		self._num_directories = len(self._subdirectories) + sum(
+			x.num_directories for x in self._subdirectories.values()
+		)
+
+
+# DirectorySizeCache remembers what was found in each directory until the modification time of the directory changes
+class DirectorySizeCache:
+	def __init__(self):
+		"""
+		a directory's modification time only changes when entries are added, removed or renamed, so files that are
+		rewritten in place are not noticed; use this cache for trees whose files are written once
+		or subscribe its on_change method to a Watcher
+		"""
+		self._dictionary = {}
+		self._lock = Lock()
+
+	def __repr__(self):
+		return f'<DirectorySizeCache:{len(self._dictionary)} directories>'
+
+	def __str__(self):
+		return repr(self)
+
+	def __len__(self):
+		return len(self._dictionary)
+
+	@staticmethod
+	def _get_key(path):
+		"""
+		:type path: str
+		:rtype: str
+		"""
+		return os.path.normcase(os.path.abspath(path))
+
+	def get(self, path, modification_time_ns):
+		"""
+		:type path: str
+		:type modification_time_ns: int
+		:rtype: tuple or NoneType
+		"""
+		with self._lock:
+			cached = self._dictionary.get(self._get_key(path))
+		if cached is None or cached[0] != modification_time_ns:
+			return None
+		return cached[1]
+
+	def set(self, path, modification_time_ns, value):
+		"""
+		:type path: str
+		:type modification_time_ns: int
+		:type value: tuple
+		"""
+		with self._lock:
+			self._dictionary[self._get_key(path)] = (modification_time_ns, value)
+
+	def invalidate(self, path=None):
+		"""
+		forgets a directory or, if path is None, everything
+		:type path: str or NoneType
+		"""
+		with self._lock:
+			if path is None:
+				self._dictionary.clear()
+			else:
+				self._dictionary.pop(self._get_key(path), None)
+
+	def on_change(self, event):
+		"""
+		forgets the directory that holds a changed entry and, if the entry is a directory, everything under it
+		:type event: ChangeEvent
+		"""
+		self.invalidate(path=event.parent_directory)
+		if event.is_directory:
+			key = self._get_key(event.path)
+			prefix = key + os.sep
+			with self._lock:
+				for path in [x for x in self._dictionary if x == key or x.startswith(prefix)]:
+					del self._dictionary[path]
+
+
+# a tree with fewer directories than this is scanned on the calling thread unless num_workers is given,
+# starting a thread pool costs more than it saves on a small tree
+_SERIAL_DIRECTORIES = 64
+
+
+def _scan_directory(path, cache, follow_symlinks):
+	"""
+	:type path: str
+	:type cache: DirectorySizeCache or NoneType
+	:type follow_symlinks: bool
+	:return: size of the files directly in the directory, their count, and the names of the subdirectories
+	:rtype: tuple
+	"""
+	modification_time_ns = None
+	if cache is not None:
+		# the modification time is read before scanning so a change during the scan invalidates the result
+		modification_time_ns = os.stat(path).st_mtime_ns
+		cached = cache.get(path=path, modification_time_ns=modification_time_ns)
+		if cached is not None:
+			return cached
+
+	files_size_bytes = 0
+	num_files = 0
+	subdirectory_names = []
+	with os.scandir(path) as entries:
+		for entry in entries:
+			if is_nameless(name=entry.name):
+				continue
+			if entry.is_dir(follow_symlinks=follow_symlinks):
+				if entry.is_symlink() and _links_to_an_ancestor(link=entry.path, directory=path):
+					# following it would never end
+					continue
+				subdirectory_names.append(entry.name)
+			elif entry.is_file():
+				files_size_bytes += entry.stat().st_size
+				num_files += 1
+
+	result = files_size_bytes, num_files, subdirectory_names
+	if cache is not None:
+		cache.set(path=path, modification_time_ns=modification_time_ns, value=result)
+	return result
+
+
+def _links_to_an_ancestor(link, directory):
+	"""
+	:param str link: a symbolic link to a directory
+	:param str directory: the directory that holds the link, as it was reached
+	:return: True if the link points to the directory or to a directory it is in, through links or not
+	:rtype: bool
+	"""
+	target = os.path.realpath(link)
+	directory = os.path.abspath(directory)
+	while True:
+		if os.path.realpath(directory) == target:
+			return True
+		parent = os.path.dirname(directory)
+		if parent == directory:
+			return False
+		directory = parent
+
+
+def _add_scan(directory, scan):
+	"""
+	:type directory: DirectorySize
+	:param tuple scan: the result of _scan_directory
+	:return: the subdirectories that are found
+	:rtype: list[DirectorySize]
+	"""
+	files_size_bytes, num_files, subdirectory_names = scan
+	directory._files_size_bytes = files_size_bytes
+	directory._num_own_files = num_files
+	result = []
+	for name in subdirectory_names:
+		subdirectory = DirectorySize(path=os.path.join(directory.path, name))
+		directory._subdirectories[name] = subdirectory
+		result.append(subdirectory)
+	return result
+
+
+def get_directory_size(path, num_workers=None, cache=None, follow_symlinks=True, on_error=None):
+	"""
+	computes the size of a directory: a small tree is scanned on this thread, a large one or one given num_workers
+	has its directories scanned on a thread pool, which keeps many stat calls in flight at once
+	on slow or network-mounted volumes
+	:type path: str
+	:param int or NoneType num_workers: number of threads scanning directories, 1 scans them all on this thread;
+	if None, a thread pool is only used once the tree has more than a few dozen directories
+	:param DirectorySizeCache or NoneType cache: directories whose modification time did not change are not rescanned
+	:param bool follow_symlinks: if True, symbolic links to directories are included the way Path.list includes them,
+	except those that lead back to a directory they were reached from; if False, they are left out like du does
+	:param callable or NoneType on_error: called with the OSError of a directory that cannot be scanned;
+	if None the error is raised
+	:rtype: DirectorySize
+	"""
+	root = DirectorySize(path=path)
+	# every directory is appended after its parent so going backwards adds up children first
+	directories = [root]
+
+	if num_workers is None:
+		serial_limit = _SERIAL_DIRECTORIES
+	elif get_num_workers(num_workers) == 1:
+		serial_limit = float('inf')
+	else:
+		serial_limit = 0
+
+	queue = deque([root])
+	while queue and len(directories) <= serial_limit:
+		directory = queue.popleft()
+		try:
+			scan = _scan_directory(path=directory.path, cache=cache, follow_symlinks=follow_symlinks)
+		except OSError as error:
+			if on_error is None:
+				raise error
+			on_error(error)
+			continue
+		subdirectories = _add_scan(directory=directory, scan=scan)
+		directories.extend(subdirectories)
+		queue.extend(subdirectories)
+
+	if queue:
+		with ThreadPoolExecutor(max_workers=get_num_workers(num_workers)) as executor:
+			def submit(directory):
+				return executor.submit(
+					_scan_directory, path=directory.path, cache=cache, follow_symlinks=follow_symlinks
+				)
+
+			pending = {submit(directory): directory for directory in queue}
+			while pending:
+				done, _ = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					directory = pending.pop(future)
+					try:
+						scan = future.result()
+					except OSError as error:
+						if on_error is None:
+							for other_future in pending:
+								other_future.cancel()
+							raise error
+						on_error(error)
+						continue
+
+					for subdirectory in _add_scan(directory=directory, scan=scan):
+						directories.append(subdirectory)
+						pending[submit(subdirectory)] = subdirectory
+
+	for directory in reversed(directories):
+		directory._add_up()
+	return root
@@ -0,0 +1,144 @@
+from .content_hash import get_content_hash
+from .parallel import get_num_workers
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from concurrent.futures import FIRST_COMPLETED
+
+
+DEFAULT_PARTIAL_SIZE = 2 ** 12
+
+_PARTIAL = 'partial'
+_FULL = 'full'
+
+
+def get_partial_hash(path, size_bytes, partial_size_bytes=DEFAULT_PARTIAL_SIZE, algorithm='sha256'):
+	"""
+	hashes only the head and the tail of a file, which tells most files of the same size apart
+	:type path: str
+	:type size_bytes: int
+	:type partial_size_bytes: int
+	:type algorithm: str
+	:rtype: str
+	"""
+	digest = hashlib.new(algorithm)
+	with open(path, 'rb') as file:
+		digest.update(file.read(partial_size_bytes))
+		if size_bytes > partial_size_bytes:
+			file.seek(max(partial_size_bytes, size_bytes - partial_size_bytes))
+			digest.update(file.read(partial_size_bytes))
+	return digest.hexdigest()
+
+
+def _group_by_size(directories, min_size_bytes, on_error):
+	"""
+	:type directories: list[Path]
+	:type min_size_bytes: int
+	:type on_error: callable or NoneType
+	:rtype: dict[int, list[Path]]
+	"""
+	if on_error is None:
+		walk_on_error = None
+	else:
+		def walk_on_error(error):
+			on_error(error.filename, error)
+
+	groups = {}
+	inodes = set()
+	for directory in directories:
+		for file in directory.iter_files(sort=False, on_error=walk_on_error):
+			stat_result = file.stat().stat_result
+			if stat_result is None or stat_result.st_size < min_size_bytes:
+				continue
+			# hard links to the same file do not take extra space so they are not duplicates
+			inode = stat_result.st_dev, stat_result.st_ino
+			if inode in inodes:
+				continue
+			inodes.add(inode)
+			groups.setdefault(stat_result.st_size, []).append(file)
+	return groups
+
+
+def find_duplicates(
+		directories, min_size_bytes=1, partial_size_bytes=DEFAULT_PARTIAL_SIZE, algorithm='sha256', index=None,
+		num_workers=None, on_error=None
+):
+	"""
+	finds files with the same content in stages: files are grouped by size, then the groups are split by a hash
+	of the head and tail of each file, and only the files that still collide are hashed fully on a thread pool;
+	each group of duplicates is yielded as soon as it is known
+	:param Path or list[Path] directories: the directories that are searched
+	:param int min_size_bytes: smaller files are ignored
+	:param int partial_size_bytes: number of bytes hashed from the head and from the tail of each file
+	:type algorithm: str
+	:param HashIndex or NoneType index: full digests of files that did not change are taken from the index
+	:param int or NoneType num_workers: number of threads reading files
+	:param callable or NoneType on_error: called with the path and the OSError of a file that cannot be read;
+	if None the error is raised
+	:rtype: collections.Iterable[list[Path]]
+	"""
+	if not isinstance(directories, (list, tuple, set)):
+		directories = [directories]
+
+	size_groups = _group_by_size(directories=directories, min_size_bytes=min_size_bytes, on_error=on_error)
+
+	with ThreadPoolExecutor(max_workers=get_num_workers(num_workers)) as executor:
+		# each future maps to (stage, group key, file); each group key counts its unfinished futures
+		pending = {}
+		remaining = {}
+		results = {}
+
+		def submit(stage, key, file):
+			if stage == _PARTIAL:
+				future = executor.submit(
+					get_partial_hash, path=file.path, size_bytes=key, partial_size_bytes=partial_size_bytes,
+					algorithm=algorithm
+				)
+			else:
+				future = executor.submit(get_content_hash, path=file.path, algorithm=algorithm, index=index)
+			pending[future] = stage, key, file
+
+		for size_bytes, files in size_groups.items():
+			if len(files) > 1:
+				remaining[(_PARTIAL, size_bytes)] = len(files)
+				results[(_PARTIAL, size_bytes)] = {}
+				for file in files:
+					submit(stage=_PARTIAL, key=size_bytes, file=file)
+		del size_groups
+
+		try:
+			while pending:
+				done, _ = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					stage, key, file = pending.pop(future)
+					try:
+						digest = future.result()
+					except OSError as error:
+						if on_error is None:
+							raise error
+						on_error(file.path, error)
+						digest = None
+
+					if digest is not None:
+						results[(stage, key)].setdefault(digest, []).append(file)
+					remaining[(stage, key)] -= 1
+					if remaining[(stage, key)] > 0:
+						continue
+
+					del remaining[(stage, key)]
+					groups = results.pop((stage, key))
+					for partial_digest, files in groups.items():
+						if len(files) < 2:
+							continue
+						if stage == _FULL or (stage == _PARTIAL and key <= 2 * partial_size_bytes):
+							# the head and the tail of a small file cover all of it
+							yield sorted(files, key=lambda x: x.path)
+						else:
+							full_key = key, partial_digest
+							remaining[(_FULL, full_key)] = len(files)
+							results[(_FULL, full_key)] = {}
+							for duplicate in files:
+								submit(stage=_FULL, key=full_key, file=duplicate)
+		finally:
+			for future in pending:
+				future.cancel()
@@ -14,6 +14,14 @@ class RenameError(DiskError):
 	pass
 
 
+class ReadOnlyError(DiskError):
+	pass
+
+
+class UnsafeArchiveError(DiskError):
+	pass
+
+
 class PathDoesNotExistError(DiskError):
 	pass
 
@@ -0,0 +1,159 @@
+from .individual_functions import is_nameless
+from .get_creation_date import get_creation_date_from_stat
+from .content_hash import get_content_hash
+from .HashIndex import HashIndex
+import os
+import stat
+import hashlib
+
+
+# the index Path uses when no other index is provided, it is bounded so a long running process does not grow with it
+DEFAULT_HASH_INDEX_SIZE = 2 ** 16
+DEFAULT_HASH_INDEX = HashIndex(max_size=DEFAULT_HASH_INDEX_SIZE)
+
+
+def _get_file_fingerprint(path, stat_result, content, index, algorithm):
+	"""
+	:type path: str
+	:type stat_result: os.stat_result
+	:type content: bool
+	:type index: HashIndex or NoneType
+	:type algorithm: str
+	:rtype: str
+	"""
+	if not content:
+		signature = stat_result.st_size, get_creation_date_from_stat(stat_result), stat_result.st_mtime_ns
+		return hashlib.new(algorithm, repr(signature).encode()).hexdigest()
+
+	if index is not None:
+		digest = index.get(stat_result=stat_result, algorithm=algorithm)
+		if digest is not None:
+			return digest
+	return get_content_hash(path=path, algorithm=algorithm, index=index)
+
+
+def _list_children(path):
+	"""
+	:type path: str
+	:return: the name and type of each child that is a file or a directory, sorted by name
+	:rtype: list[tuple[str, str]]
+	"""
+	with os.scandir(path) as entries:
+		children = []
+		for entry in entries:
+			if is_nameless(name=entry.name):
+				continue
+			if entry.is_file():
+				children.append((entry.name, 'file'))
+			elif entry.is_dir():
+				children.append((entry.name, 'directory'))
+	return sorted(children)
+
+
+def _get_child_fingerprint(path, kind, content, index, algorithm):
+	"""
+	:type path: str
+	:param str kind: 'file' or 'directory'
+	:rtype: str
+	"""
+	if kind == 'file':
+		return _get_file_fingerprint(
+			path=path, stat_result=os.stat(path), content=content, index=index, algorithm=algorithm
+		)
+	return get_fingerprint(path=path, content=content, index=index, algorithm=algorithm)
+
+
+def get_fingerprint(path, content=True, index=None, algorithm='sha256'):
+	"""
+	computes a Merkle-style fingerprint: a file's fingerprint is its digest and a directory's fingerprint is
+	the digest of the names, types and fingerprints of its children, so two trees are the same if and only if
+	their fingerprints are; the tree is still walked but only files whose size or modification time changed
+	since they were indexed are read and only directories whose modification time changed are listed
+	:type path: str
+	:param bool content: if True, files are identified by their content, otherwise by their size and dates
+	:param HashIndex or NoneType index: digests of files and directories that did not change are taken from the index
+	:type algorithm: str
+	:rtype: str
+	"""
+	stat_result = os.stat(path)
+	if stat.S_ISREG(stat_result.st_mode):
+		return _get_file_fingerprint(
+			path=path, stat_result=stat_result, content=content, index=index, algorithm=algorithm
+		)
+
+	kind = f'{algorithm}:{"content" if content else "stat"}'
+	cached = None if index is None else index.get_directory(stat_result=stat_result, kind=kind)
+	while True:
+		if cached is None:
+			listing = _list_children(path=path)
+		else:
+			# the modification time of a directory changes when a child is added, removed or renamed
+			listing = [(name, child_kind) for name, child_kind, _ in cached[0]]
+		try:
+			children = tuple(
+				(name, child_kind, _get_child_fingerprint(
+					path=os.path.join(path, name), kind=child_kind, content=content, index=index, algorithm=algorithm
+				))
+				for name, child_kind in listing
+			)
+			break
+		except FileNotFoundError:
+			if cached is None:
+				raise
+			# the directory changed after it was stat-ed, it is listed again
+			cached = None
+
+	if cached is not None and cached[0] == children:
+		return cached[1]
+
+	digest = hashlib.new(algorithm)
+	for name, child_kind, child_fingerprint in children:
+		digest.update(f'{len(name)}:{name}:{child_kind}:{child_fingerprint};'.encode('utf-8', 'surrogateescape'))
+	digest = digest.hexdigest()
+	if index is not None:
+		index.set_directory(stat_result=stat_result, kind=kind, children=children, digest=digest)
+	return digest
+
+
+def are_the_same_trees(path, other_path, content=False, index=None, algorithm='sha256'):
+	"""
+	compares two trees the way filecmp compares files: the names and types of everything and the sizes of the files
+	are compared first without reading any file, then files with the same size and modification time are taken to
+	be the same and only the others are hashed; it stops at the first difference
+	:type path: str
+	:type other_path: str
+	:param bool content: if True, every pair of files is compared by content digest
+	:param HashIndex or NoneType index: digests of files that did not change are taken from the index
+	:type algorithm: str
+	:rtype: bool
+	"""
+	stack = [(path, other_path)]
+	pairs = []
+	while stack:
+		path, other_path = stack.pop()
+		listing = _list_children(path=path)
+		if listing != _list_children(path=other_path):
+			return False
+		for name, kind in listing:
+			child_path = os.path.join(path, name)
+			other_child_path = os.path.join(other_path, name)
+			if kind == 'directory':
+				stack.append((child_path, other_child_path))
+				continue
+			stat_result = os.stat(child_path)
+			other_stat_result = os.stat(other_child_path)
+			if stat_result.st_size != other_stat_result.st_size:
+				return False
+			if content or stat_result.st_mtime_ns != other_stat_result.st_mtime_ns:
+				pairs.append(((child_path, stat_result), (other_child_path, other_stat_result)))
+
+	for (child_path, stat_result), (other_child_path, other_stat_result) in pairs:
+		digest = _get_file_fingerprint(
+			path=child_path, stat_result=stat_result, content=True, index=index, algorithm=algorithm
+		)
+		other_digest = _get_file_fingerprint(
+			path=other_child_path, stat_result=other_stat_result, content=True, index=index, algorithm=algorithm
+		)
+		if digest != other_digest:
+			return False
+	return True
@@ -2,23 +2,34 @@ import os
 import platform
 
 
-def get_creation_date(path):
+# the platform does not change while the process runs
+_IS_WINDOWS = platform.system() == 'Windows'
+
+
+def get_creation_date_from_stat(stat_result):
 	"""
-	From: https://stackoverflow.com/questions/237079/how-to-get-file-creation-modification-date-times-in-python
-	Try to get the date that a file was created, falling back to when it was
-	last modified if that isn't possible.
-	See http://stackoverflow.com/a/39501288/1709587 for explanation.
+	:type stat_result: os.stat_result
+	:rtype: float
 	"""
-	if platform.system() == 'Windows':
-		return os.path.getctime(path)
+	if _IS_WINDOWS:
+		return stat_result.st_ctime
 	else:
-		stat = os.stat(path)
 		try:
-			return stat.st_birthtime
+			return stat_result.st_birthtime
 		except AttributeError:
 			# We're probably on Linux. No easy way to get creation dates here,
 			# so we'll settle for when its content was last modified.
-			return stat.st_mtime
+			return stat_result.st_mtime
+
+
+def get_creation_date(path):
+	"""
+	From: https://stackoverflow.com/questions/237079/how-to-get-file-creation-modification-date-times-in-python
+	Try to get the date that a file was created, falling back to when it was
+	last modified if that isn't possible.
+	See http://stackoverflow.com/a/39501288/1709587 for explanation.
+	"""
+	return get_creation_date_from_stat(os.stat(path))
 
 
 def get_modification_date(path):
@@ -1,8 +1,10 @@
 import os
 import os.path
+import stat as _stat
 from send2trash import send2trash
 import shutil
 import errno
+from .remove import remove_permanently
 
 
 def get_basename(path):
@@ -22,19 +24,46 @@ def get_absolute_path(path):
 
 
 def get_file_size_bytes(path):
-	if path_is_file(path=path):
-		return os.path.getsize(path)
+	# a single stat answers both if the path is a file and how big it is
+	try:
+		stat_result = os.stat(path)
+	except (OSError, ValueError):
+		raise ValueError(f'The path "{path}" does not exist!')
+	if _stat.S_ISREG(stat_result.st_mode):
+		return stat_result.st_size
 	else:
 		raise FileNotFoundError(f'The file "{path}" does not exist!')
 
 
+def get_size_and_unit(size_bytes, binary=True):
+	"""
+	:type size_bytes: int or float
+	:param bool binary: if True, a kilobyte is 1024 bytes, otherwise 1000
+	:return: the size and its unit, e.g., (1.5, 'KB')
+	:rtype: tuple
+	"""
+	main_unit = 'B' if binary else 'b'
+	base = 2**10 if binary else 1e3
+	if size_bytes <= 1e3:
+		return size_bytes, 'B'
+	elif size_bytes <= 1e6:
+		return size_bytes/base, 'K' + main_unit
+	elif size_bytes <= 1e9:
+		return size_bytes/base**2, 'M' + main_unit
+	else:
+		return size_bytes/base**3, 'G' + main_unit
+
+
 def path_exists(path):
 	return os.path.exists(path)
 
 
 def path_is_file(path):
-	if path_exists(path=path):
-		return os.path.isfile(path)
+	# most paths that are checked are files, which only need one stat
+	if os.path.isfile(path):
+		return True
+	elif path_exists(path=path):
+		return False
 	else:
 		raise ValueError(f'The path "{path}" does not exist!')
 
@@ -43,17 +72,54 @@ def path_is_directory(path):
 	return not path_is_file(path=path)
 
 
-def delete(path):
+DELETE_METHODS = ('trash', 'permanent')
+
+_delete_method = 'trash'
+
+
+def set_delete_method(method):
+	"""
+	sets how paths are deleted when no method is given to delete:
+	'trash' sends them to the trash and 'permanent' removes them for good, which is much faster for large trees
+	:type method: str
+	"""
+	global _delete_method
+	if method not in DELETE_METHODS:
+		raise ValueError(f'method "{method}" should be one of {DELETE_METHODS}')
+	_delete_method = method
+
+
+def get_delete_method():
+	"""
+	:rtype: str
+	"""
+	return _delete_method
+
+
+def delete(path, method=None, num_workers=None):
+	"""
+	:type path: str
+	:param str or NoneType method: 'trash' or 'permanent', None means the method set by set_delete_method
+	:param int or NoneType num_workers: number of threads removing a directory tree permanently
+	"""
+	method = method or _delete_method
+	if method not in DELETE_METHODS:
+		raise ValueError(f'method "{method}" should be one of {DELETE_METHODS}')
 
 	# path should exist
-	if path_exists(path=path):
-		send2trash(path)
-	else:
+	if not path_exists(path=path):
 		raise FileNotFoundError(f'The path "{path}" does not exist!')
 
-	# the path shouldn't exist after deletion
-	if path_exists(path=path):
-		raise FileExistsError(f'Failed to delete the path "{path}"')
+	if method == 'trash':
+		send2trash(path)
+
+		# the path shouldn't exist after deletion
+		if path_exists(path=path):
+			raise FileExistsError(f'Failed to delete the path "{path}"')
+
+	else:
+		# removing the tree raises if anything is left behind so there is no need to check again
+		remove_permanently(path=path, num_workers=num_workers)
 
 
 def delete_dir(path):
@@ -84,3 +150,84 @@ def list_directory(path):
 		return os.listdir(path=path)
 	else:
 		raise ValueError(f'The path "{path}" is not a directory!')
+
+
+def is_nameless(name):
+	"""
+	Path.list skips the entries whose name without the extension is empty, e.g., ".gitignore"
+	:type name: str
+	:rtype: bool
+	"""
+	return name.rsplit('.', 1)[0] == ''
+
+
+def iterate_directory(path):
+	"""
+	lists a directory with os.scandir so the type and stat information of each entry is fetched at most once;
+	the directory is kept open only while the entries are consumed
+	:type path: str
+	:rtype: collections.Iterable[os.DirEntry]
+	"""
+	if path_is_directory(path=path):
+		with os.scandir(path) as entries:
+			for entry in entries:
+				yield entry
+	else:
+		raise ValueError(f'The path "{path}" is not a directory!')
+
+
+def get_entry_type(entry):
+	"""
+	returns the same value as Path.type but uses the information os.scandir already has about the entry
+	:type entry: os.DirEntry
+	:rtype: str
+	"""
+	try:
+		if entry.is_file():
+			return 'file'
+		elif entry.is_dir():
+			return 'directory'
+	except OSError:
+		pass
+
+	# broken symlinks and special files fall back to the regular checks
+	if path_exists(path=entry.path):
+		return 'directory'
+	else:
+		return 'nonexistent path'
+
+
+def read_last_lines(path, num_lines, encoding='utf8', block_size=2 ** 16):
+	"""
+	reads blocks backwards from the end of the file until enough lines are found, so only the end of the file is read;
+	the encoding should be ASCII-compatible (e.g., utf8 or latin-1) for the newlines to be found in the bytes
+	:type path: str
+	:type num_lines: int
+	:type encoding: str
+	:type block_size: int
+	:rtype: list[str]
+	"""
+	if num_lines <= 0:
+		return []
+
+	blocks = []
+	num_newlines = 0
+	with open(path, mode='rb') as file:
+		position = file.seek(0, os.SEEK_END)
+		# one more newline than the number of lines is needed to know where the first of them starts
+		while position > 0 and num_newlines <= num_lines:
+			read_size = min(block_size, position)
+			position -= read_size
+			file.seek(position)
+			block = file.read(read_size)
+			blocks.append(block)
+			num_newlines += block.count(b'\n')
+
+	data = b''.join(reversed(blocks))
+	if position > 0:
+		# the first line is incomplete and may start in the middle of a character
+		data = data[data.index(b'\n') + 1:]
+
+	# the same newline translation as reading in text mode
+	text = data.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+	return text.splitlines(keepends=True)[-num_lines:]
@@ -0,0 +1,14 @@
+import os
+
+
+def get_num_workers(num_workers=None):
+	"""
+	:param int or NoneType num_workers: None means the same default as concurrent.futures.ThreadPoolExecutor
+	:rtype: int
+	"""
+	if num_workers is None:
+		return min(32, (os.cpu_count() or 1) + 4)
+	elif num_workers < 1:
+		raise ValueError(f'num_workers should be at least 1 but it is {num_workers}')
+	else:
+		return int(num_workers)
@@ -32,21 +32,30 @@ def pickle(obj, path, method='pickle', mode='wb', echo=0):
 		print(f'Pickled a {type(obj)} at "{path}"')
 
 
-def unpickle(path, method='pickle', mode='rb', echo=0):
+def unpickle_file(file, method='pickle', echo=0, name=None):
+	"""
+	loads an object from a file object that is already open, e.g., a member of an archive
+	:param str or NoneType name: the name shown in messages
+	"""
 	echo = max(0, echo)
-	with open(file=path, mode=mode) as input_file:
-		try:
-			if method == 'dill':
-				obj = _dill.load(file=input_file)
-			else:
-				obj = _pickle.load(file=input_file)
-		except Exception as e:
-			print(f'Error in unpickling "{path}" using the {method} method!')
-			raise e
+	name = name or getattr(file, 'name', None)
+	try:
+		if method == 'dill':
+			obj = _dill.load(file=file)
+		else:
+			obj = _pickle.load(file=file)
+	except Exception as e:
+		print(f'Error in unpickling "{name}" using the {method} method!')
+		raise e
 
 	if echo:
-		print(f'Unpickled a {type(obj)} from "{path}"')
+		print(f'Unpickled a {type(obj)} from "{name}"')
 	if isinstance(obj, dict):
 		if '__immutable__' in obj:
 			return make_immutable(obj['__immutable__'])
 	return obj
+
+
+def unpickle(path, method='pickle', mode='rb', echo=0):
+	with open(file=path, mode=mode) as input_file:
+		return unpickle_file(file=input_file, method=method, echo=echo, name=path)
@@ -0,0 +1,68 @@
+from .parallel import get_num_workers
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# number of files one task of the thread pool unlinks, so a directory with many files is removed by many threads
+_CHUNK_SIZE = 256
+
+
+def _scan_directory(path):
+	"""
+	:type path: str
+	:return: the subdirectories and everything else in a directory
+	:rtype: tuple[list[str], list[str]]
+	"""
+	subdirectories = []
+	files = []
+	with os.scandir(path) as entries:
+		for entry in entries:
+			# symbolic links are removed without following them
+			if entry.is_dir(follow_symlinks=False):
+				subdirectories.append(entry.path)
+			else:
+				files.append(entry.path)
+	return subdirectories, files
+
+
+def _unlink_files(paths):
+	"""
+	:type paths: list[str]
+	"""
+	for path in paths:
+		os.unlink(path)
+
+
+def remove_permanently(path, num_workers=None):
+	"""
+	removes a file or a whole directory tree without sending it to the trash: each level of the tree is scanned
+	on a thread pool and its files are unlinked in chunks on the same pool, then the empty directories are removed
+	from the deepest level up
+	:type path: str
+	:param int or NoneType num_workers: number of threads removing files and directories
+	"""
+	if os.path.islink(path) or not os.path.isdir(path):
+		os.unlink(path)
+		return
+
+	num_workers = get_num_workers(num_workers)
+	levels = [[path]]
+	with ThreadPoolExecutor(max_workers=num_workers) as executor:
+		# only a few chunks wait for a thread so the paths of a huge directory are not all queued at once
+		pending = deque()
+		while levels[-1]:
+			next_level = []
+			for subdirectories, files in executor.map(_scan_directory, levels[-1]):
+				next_level.extend(subdirectories)
+				for index in range(0, len(files), _CHUNK_SIZE):
+					pending.append(executor.submit(_unlink_files, files[index:index + _CHUNK_SIZE]))
+					if len(pending) >= num_workers * 2:
+						pending.popleft().result()
+			levels.append(next_level)
+		while pending:
+			pending.popleft().result()
+
+		for level in reversed(levels):
+			for _ in executor.map(os.rmdir, level):
+				pass
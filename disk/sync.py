@@ -0,0 +1,454 @@
+from .archive import _is_under
+from .copy_function import copy_file
+from .copy_function import CopyReport
+from .individual_functions import delete
+from .individual_functions import make_dir
+from .parallel import get_num_workers
+from .content_hash import get_content_hash
+from .exceptions import DiskError
+from .exceptions import PathDoesNotExistError
+from filecmp import cmp as _compare_files
+import os
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from chronometry.progress import ProgressBar
+
+
+COMPARISON_METHODS = ('content', 'stat', 'hash')
+
+
+def compare_files(source, destination, source_stat, destination_stat, method='content', manifest=None, relative_path=None):
+	"""
+	decides if a destination file is already the same as its source
+	:type source: str
+	:type destination: str
+	:type source_stat: os.stat_result
+	:type destination_stat: os.stat_result
+	:param str method: 'content' compares the bytes unless the stat signatures match (filecmp.cmp),
+	'stat' only compares size and modification time, 'hash' compares the sizes and then the content digests
+	:param SyncManifest or NoneType manifest: file pairs that did not change since the last sync are not compared again
+	:param str or NoneType relative_path: the key of the file pair in the manifest
+	:return: whether the files are the same and, with the hash method, the content digest
+	:rtype: tuple[bool, str or NoneType]
+	"""
+	if method not in COMPARISON_METHODS:
+		raise ValueError(f'method "{method}" should be one of {COMPARISON_METHODS}')
+
+	if manifest is not None and manifest.is_unchanged(
+		relative_path=relative_path, source_stat=source_stat, destination_stat=destination_stat
+	):
+		return True, manifest.get_digest(relative_path=relative_path, stat_result=source_stat, source=True)
+
+	if source_stat.st_size != destination_stat.st_size:
+		return False, None
+
+	if method == 'content':
+		return _compare_files(source, destination), None
+
+	elif method == 'stat':
+		return source_stat.st_mtime_ns == destination_stat.st_mtime_ns, None
+
+	else:
+		source_digest = None
+		destination_digest = None
+		if manifest is not None:
+			source_digest = manifest.get_digest(relative_path=relative_path, stat_result=source_stat, source=True)
+			destination_digest = manifest.get_digest(
+				relative_path=relative_path, stat_result=destination_stat, source=False
+			)
+		source_digest = source_digest or get_content_hash(path=source)
+		destination_digest = destination_digest or get_content_hash(path=destination)
+		return source_digest == destination_digest, source_digest
+
+
+class SyncOperation:
+	DELETE = 'delete'
+	MAKE_DIRECTORY = 'make_directory'
+	COPY = 'copy'
+
+	def __init__(self, kind, destination, relative_path, source=None, size_bytes=0, source_stat=None, digest=None):
+		"""
+		:param str kind: one of 'delete', 'make_directory' or 'copy'
+		:param str destination: the path that is deleted, made or copied to
+		:param str relative_path: the path relative to the directories being synced
+		:param str or NoneType source: the file that is copied
+		:param int size_bytes: number of bytes that are copied
+		:param os.stat_result or NoneType source_stat: stat of the source when the plan was made
+		:param str or NoneType digest: content digest of the source if it is known
+		"""
+		self._kind = kind
+		self._destination = destination
+		self._relative_path = relative_path
+		self._source = source
+		self._size_bytes = size_bytes
+		self._source_stat = source_stat
+		self._digest = digest
+
+	def __repr__(self):
+		if self._kind == self.COPY:
+			return f'<SyncOperation:copy "{self._source}" to "{self._destination}" - {self._size_bytes} bytes>'
+		else:
+			return f'<SyncOperation:{self._kind} "{self._destination}">'
+
+	def __str__(self):
+		return repr(self)
+
+	@property
+	def kind(self):
+		"""
+		:rtype: str
+		"""
+		return self._kind
+
+	@property
+	def destination(self):
+		"""
+		:rtype: str
+		"""
+		return self._destination
+
+	@property
+	def relative_path(self):
+		"""
+		:rtype: str
+		"""
+		return self._relative_path
+
+	@property
+	def source(self):
+		"""
+		:rtype: str or NoneType
+		"""
+		return self._source
+
+	@property
+	def size_bytes(self):
+		"""
+		:rtype: int
+		"""
+		return self._size_bytes
+
+	@property
+	def source_stat(self):
+		"""
+		:return: the stat of the source when the plan was made
+		:rtype: os.stat_result or NoneType
+		"""
+		return self._source_stat
+
+	@property
+	def digest(self):
+		"""
+		:return: the content digest of the source if it is known
+		:rtype: str or NoneType
+		"""
+		return self._digest
+
+
+class SyncPlan:
+	def __init__(self, source, destination, manifest=None):
+		"""
+		:type source: str
+		:type destination: str
+		:type manifest: SyncManifest or NoneType
+		"""
+		self._source = source
+		self._destination = destination
+		self._manifest = manifest
+		self._operations = []
+		# file pairs found to be the same, they are recorded in the manifest when the plan is executed
+		self._unchanged = []
+
+	def __repr__(self):
+		return (
+			f'<SyncPlan:"{self._destination}" mimicking "{self._source}" - {len(self.deletions)} deletions, '
+			f'{len(self.new_directories)} new directories, {len(self.copies)} copies ({self.size_bytes} bytes)>'
+		)
+
+	def __str__(self):
+		return repr(self)
+
+	def __len__(self):
+		return len(self._operations)
+
+	def __iter__(self):
+		return iter(self._operations)
+
+	def _add(self, operation):
+		"""
+		:type operation: SyncOperation
+		"""
+		self._operations.append(operation)
+
+	def _add_unchanged(self, relative_path, source_stat, destination_stat, digest):
+		"""
+		:type relative_path: str
+		:type source_stat: os.stat_result
+		:type destination_stat: os.stat_result
+		:type digest: str or NoneType
+		"""
+		self._unchanged.append((relative_path, source_stat, destination_stat, digest))
+
+	@property
+	def operations(self):
+		"""
+		:rtype: list[SyncOperation]
+		"""
+		return list(self._operations)
+
+	@property
+	def deletions(self):
+		"""
+		:rtype: list[SyncOperation]
+		"""
+		return [x for x in self._operations if x.kind == SyncOperation.DELETE]
+
+	@property
+	def new_directories(self):
+		"""
+		:rtype: list[SyncOperation]
+		"""
+		return [x for x in self._operations if x.kind == SyncOperation.MAKE_DIRECTORY]
+
+	@property
+	def copies(self):
+		"""
+		:rtype: list[SyncOperation]
+		"""
+		return [x for x in self._operations if x.kind == SyncOperation.COPY]
+
+	@property
+	def size_bytes(self):
+		"""
+		:return: number of bytes the plan copies
+		:rtype: int
+		"""
+		return sum(x.size_bytes for x in self._operations if x.kind == SyncOperation.COPY)
+
+	def is_empty(self):
+		"""
+		:rtype: bool
+		"""
+		return len(self._operations) == 0
+
+	def execute(self, num_workers=None, delete_method=None, echo=1):
+		"""
+		applies the plan: deletions first, then the new directories in order, then the copies on a thread pool;
+		the manifest, if any, is only updated here, so a plan that is not executed leaves it as it was
+		:param int or NoneType num_workers: maximum number of deletions or copies running at the same time
+		:param str or NoneType delete_method: 'trash' or 'permanent', None means the method set by set_delete_method
+		:type echo: int or bool
+		:rtype: CopyReport
+		"""
+		echo = max(0, echo)
+		start = perf_counter()
+		deletions = self.deletions
+		new_directories = self.new_directories
+		copies = self.copies
+
+		if self._manifest is not None:
+			for relative_path, source_stat, destination_stat, digest in self._unchanged:
+				self._manifest.set(
+					relative_path=relative_path, source_stat=source_stat, destination_stat=destination_stat,
+					digest=digest
+				)
+
+		def delete_operation(operation):
+			delete(path=operation.destination, method=delete_method, num_workers=1)
+
+		with ThreadPoolExecutor(max_workers=get_num_workers(num_workers)) as executor:
+			for operation in deletions:
+				if echo:
+					print(f'Deleting "{operation.destination}"')
+			for _ in executor.map(delete_operation, deletions):
+				pass
+			if self._manifest is not None:
+				for operation in deletions:
+					self._manifest.remove(relative_path=operation.relative_path)
+
+			for operation in new_directories:
+				if echo:
+					print(f'Making directory "{operation.destination}"')
+				make_dir(path=operation.destination)
+
+			progress_bar = ProgressBar(echo=echo, total=len(copies))
+			futures = {
+				executor.submit(copy_file, source=operation.source, destination=operation.destination): operation
+				for operation in copies
+			}
+			amount = 0
+			size_bytes = 0
+			try:
+				for future in as_completed(futures):
+					size_bytes += future.result()
+					operation = futures[future]
+					if self._manifest is not None:
+						self._manifest.set(
+							relative_path=operation.relative_path, source_stat=operation.source_stat,
+							destination_stat=os.stat(operation.destination), digest=operation.digest
+						)
+					amount += 1
+					progress_bar.show(amount=amount, text=f'"{operation.relative_path}" copied')
+			except BaseException as error:
+				for future in futures:
+					future.cancel()
+				raise error
+
+		if self._manifest is not None:
+			self._manifest.save()
+
+		report = CopyReport(
+			source=self._source, destination=self._destination, num_files=len(copies),
+			num_directories=len(new_directories), size_bytes=size_bytes, seconds=perf_counter() - start
+		)
+		progress_bar.show(amount=amount, text=f'{report}')
+		return report
+
+
+def _plan_new_directory(plan, destination, source, relative_directory, ignore_function):
+	"""
+	plans copying everything in source to destination, which does not exist yet
+	:type plan: SyncPlan
+	:type destination: Path
+	:type source: Path
+	:type relative_directory: str
+	:type ignore_function: callable
+	"""
+	for source_child in source.list():
+		if ignore_function(source_child):
+			continue
+		name = source_child.name_and_extension
+		destination_child = destination / name
+		if ignore_function(destination_child):
+			continue
+
+		relative_path = os.path.join(relative_directory, name)
+		if source_child.is_file():
+			stat = source_child.stat()
+			plan._add(SyncOperation(
+				kind=SyncOperation.COPY, destination=destination_child.path, relative_path=relative_path,
+				source=source_child.path, size_bytes=stat.size_bytes, source_stat=stat.stat_result
+			))
+		else:
+			plan._add(SyncOperation(
+				kind=SyncOperation.MAKE_DIRECTORY, destination=destination_child.path, relative_path=relative_path
+			))
+			_plan_new_directory(
+				plan=plan, destination=destination_child, source=source_child, relative_directory=relative_path,
+				ignore_function=ignore_function
+			)
+
+
+def _plan_directory(plan, destination, source, relative_directory, ignore_function, method, manifest):
+	"""
+	plans the changes that make the existing directory destination the same as source
+	:type plan: SyncPlan
+	:type destination: Path
+	:type source: Path
+	:type relative_directory: str
+	:type ignore_function: callable
+	:type method: str
+	:type manifest: SyncManifest or NoneType
+	"""
+	destination_children = {x.name_and_extension: x for x in destination.list()}
+	source_children = {x.name_and_extension: x for x in source.list()}
+
+	for name, destination_child in destination_children.items():
+		if ignore_function(destination_child):
+			continue
+		source_child = source_children.get(name)
+		if source_child is None or source_child.is_file() != destination_child.is_file():
+			plan._add(SyncOperation(
+				kind=SyncOperation.DELETE, destination=destination_child.path,
+				relative_path=os.path.join(relative_directory, name)
+			))
+
+	for name, source_child in source_children.items():
+		if ignore_function(source_child):
+			continue
+		destination_child = destination_children.get(name)
+		if destination_child is None:
+			destination_child = destination / name
+		if ignore_function(destination_child):
+			continue
+
+		relative_path = os.path.join(relative_directory, name)
+		is_new = name not in destination_children or destination_child.is_file() != source_child.is_file()
+
+		if source_child.is_file():
+			source_stat = source_child.stat().stat_result
+			digest = None
+			if not is_new:
+				is_the_same, digest = compare_files(
+					source=source_child.path, destination=destination_child.path,
+					source_stat=source_stat, destination_stat=destination_child.stat().stat_result,
+					method=method, manifest=manifest, relative_path=relative_path
+				)
+				if is_the_same:
+					plan._add_unchanged(
+						relative_path=relative_path, source_stat=source_stat,
+						destination_stat=destination_child.stat().stat_result, digest=digest
+					)
+					continue
+
+			plan._add(SyncOperation(
+				kind=SyncOperation.COPY, destination=destination_child.path, relative_path=relative_path,
+				source=source_child.path, size_bytes=source_stat.st_size, source_stat=source_stat, digest=digest
+			))
+
+		elif is_new:
+			plan._add(SyncOperation(
+				kind=SyncOperation.MAKE_DIRECTORY, destination=destination_child.path, relative_path=relative_path
+			))
+			_plan_new_directory(
+				plan=plan, destination=destination_child, source=source_child, relative_directory=relative_path,
+				ignore_function=ignore_function
+			)
+
+		else:
+			_plan_directory(
+				plan=plan, destination=destination_child, source=source_child, relative_directory=relative_path,
+				ignore_function=ignore_function, method=method, manifest=manifest
+			)
+
+
+def plan_sync(destination, source, ignore_function=None, method='content', manifest=None):
+	"""
+	compares two directory trees and plans the deletions, new directories and copies
+	that make destination the same as source, without changing anything
+	:type destination: Path
+	:type source: Path
+	:type ignore_function: callable or NoneType
+	:type method: str
+	:type manifest: SyncManifest or NoneType
+	:rtype: SyncPlan
+	"""
+	if method not in COMPARISON_METHODS:
+		raise ValueError(f'method "{method}" should be one of {COMPARISON_METHODS}')
+	if not source.exists():
+		raise PathDoesNotExistError(source)
+	if source.is_file():
+		raise NotADirectoryError(source)
+	# a sibling whose name starts with the same characters, e.g., /x/foobar next to /x/foo, is neither
+	if _is_under(path=destination.absolute_path, directory=source.absolute_path):
+		raise DiskError(f'"{destination.path}" is inside "{source.path}"!')
+	if _is_under(path=source.absolute_path, directory=destination.absolute_path):
+		raise DiskError(f'"{destination.path}" contains "{source.path}"!')
+
+	if ignore_function is None:
+		def ignore_function(x):
+			return False
+
+	plan = SyncPlan(source=source.path, destination=destination.path, manifest=manifest)
+	if destination.exists():
+		_plan_directory(
+			plan=plan, destination=destination, source=source, relative_directory='',
+			ignore_function=ignore_function, method=method, manifest=manifest
+		)
+	else:
+		plan._add(SyncOperation(kind=SyncOperation.MAKE_DIRECTORY, destination=destination.path, relative_path=''))
+		_plan_new_directory(
+			plan=plan, destination=destination, source=source, relative_directory='', ignore_function=ignore_function
+		)
+	return plan
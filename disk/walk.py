@@ -0,0 +1,84 @@
+def _get_children(path, sort):
+	"""
+	:type path: Path
+	:type sort: bool
+	:rtype: collections.Iterator[Path]
+	"""
+	if sort:
+		return iter(path.list())
+	else:
+		return path._iterate_children()
+
+
+def walk(
+		path, max_depth=None, include=None, exclude=None, sort=True, files=True, directories=True,
+		follow_symlinks=False, on_error=None
+):
+	"""
+	yields the paths under a directory top-down, one directory level is open at a time for each depth;
+	the Paths that are yielded carry their os.DirEntry so their type is known without another stat
+	:type path: Path
+	:param int or NoneType max_depth: 1 means only the children, None means no limit
+	:param callable or NoneType include: only paths for which include(path) is True are yielded
+	:param callable or NoneType exclude: paths for which exclude(path) is True are skipped with their subtrees
+	:param bool sort: if True, the children of each directory are yielded in the same order as Path.list
+	:param bool files: if False, files are not yielded
+	:param bool directories: if False, directories are not yielded but are still walked into
+	:param bool follow_symlinks: if True, symbolic links to directories are walked into
+	:param callable or NoneType on_error: called with the OSError of a directory that cannot be listed
+	:rtype: collections.Iterable[Path]
+	"""
+	if max_depth is not None and max_depth < 1:
+		return
+
+	stack = [(_get_children(path=path, sort=sort), 1)]
+	try:
+		while stack:
+			children, depth = stack[-1]
+			try:
+				child = next(children, None)
+			except OSError as error:
+				stack.pop()
+				if on_error is None:
+					raise error
+				on_error(error)
+				continue
+
+			if child is None:
+				stack.pop()
+				continue
+
+			if exclude is not None and exclude(child):
+				continue
+
+			is_directory = child.type == 'directory'
+			if (directories if is_directory else files) and (include is None or include(child)):
+				yield child
+
+			if max_depth is not None and depth >= max_depth:
+				continue
+
+			try:
+				walk_into = child._entry.is_dir(follow_symlinks=follow_symlinks)
+			except OSError:
+				walk_into = False
+
+			if walk_into:
+				if sort:
+					try:
+						grandchildren = _get_children(path=child, sort=True)
+					except OSError as error:
+						if on_error is None:
+							raise error
+						on_error(error)
+						continue
+				else:
+					grandchildren = _get_children(path=child, sort=False)
+				stack.append((grandchildren, depth + 1))
+
+	finally:
+		# close the scandir iterators of the directories that were not finished
+		for children, _ in stack:
+			close = getattr(children, 'close', None)
+			if close is not None:
+				close()
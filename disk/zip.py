@@ -1,34 +1,592 @@
+from .parallel import get_num_workers
+import io
 import os
-from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+import shutil
+import sys
+import tempfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from threading import Lock
+from threading import local as threading_local
+import struct
+from zipfile import ZipFile, ZipInfo, BadZipFile, ZIP_DEFLATED, ZIP_STORED, ZIP64_LIMIT
 from chronometry.progress import ProgressBar
 
 
-def zip_directory(path, zip_path, compression=ZIP_DEFLATED, echo=0):
-	echo = max(0, echo)
-	progress_bar = ProgressBar(echo=echo, total=None)
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+_DATA_DESCRIPTOR_FLAG = 0x08
+_COPY_CHUNK_SIZE = 2 ** 20
+
+
+# compressed members up to this size are handed back in memory, larger ones are spooled to a temporary file
+_SPOOL_SIZE = 2 ** 22
+
+
+# the CPython versions whose ZipFile internals _write_member was checked against, from 3.6 to 3.13
+_RAW_MEMBER_VERSIONS = ((3, 6), (3, 13))
+
+
+class _Spool:
+	"""
+	keeps data in memory until it outgrows _SPOOL_SIZE and in a temporary file after that;
+	unlike tempfile.SpooledTemporaryFile, what it holds can be sent back from a process pool
+	"""
+	def __init__(self):
+		self._chunks = []
+		self._size = 0
+		self._file = None
+		self._path = None
+
+	def write(self, data):
+		if not data:
+			return
+		if self._file is None and self._size + len(data) > _SPOOL_SIZE:
+			descriptor, self._path = tempfile.mkstemp(suffix='.zip_member')
+			self._file = os.fdopen(descriptor, 'wb')
+			self._file.writelines(self._chunks)
+			self._chunks = []
+		if self._file is None:
+			self._chunks.append(data)
+		else:
+			self._file.write(data)
+		self._size += len(data)
+
+	def close(self):
+		"""
+		:return: the size and either the data or the path of the temporary file
+		:rtype: tuple[int, bytes or str]
+		"""
+		if self._file is None:
+			return self._size, b''.join(self._chunks)
+		self._file.close()
+		return self._size, self._path
+
+	def discard(self):
+		if self._file is not None:
+			self._file.close()
+			os.remove(self._path)
+
+
+def _discard_spooled(data):
+	"""
+	:param bytes or str data: compressed data or the path of a temporary file returned by _compress
+	"""
+	if isinstance(data, str) and os.path.exists(data):
+		os.remove(data)
+
+
+def _compress(path, compression, compression_level):
+	"""
+	reads and compresses a file in chunks the way ZipFile would, zlib releases the GIL so threads compress in parallel
+	:type path: str
+	:type compression: int
+	:type compression_level: int or NoneType
+	:return: the crc, the size, the compressed size and either the compressed data or the path it is spooled to
+	:rtype: tuple[int, int, int, bytes or str]
+	"""
+	if compression == ZIP_DEFLATED:
+		compressor = zlib.compressobj(
+			zlib.Z_DEFAULT_COMPRESSION if compression_level is None else compression_level, zlib.DEFLATED, -15
+		)
+	else:
+		compressor = None
+
+	crc = 0
+	file_size = 0
+	spool = _Spool()
+	try:
+		with open(path, 'rb') as file:
+			for chunk in iter(lambda: file.read(_COPY_CHUNK_SIZE), b''):
+				crc = zlib.crc32(chunk, crc)
+				file_size += len(chunk)
+				spool.write(chunk if compressor is None else compressor.compress(chunk))
+		if compressor is not None:
+			spool.write(compressor.flush())
+		return (crc, file_size) + spool.close()
+	except BaseException:
+		spool.discard()
+		raise
+
+
+def _write_member(zip_file, zip_info, crc, file_size, compress_size, write_data):
+	"""
+	adds a member whose data is already compressed; this is what ZipFile.write does after compressing
+	:type zip_file: ZipFile
+	:type zip_info: ZipInfo
+	:type crc: int
+	:type file_size: int
+	:type compress_size: int
+	:param callable write_data: writes the compressed data to the file object it is given
+	"""
+	zip_info.CRC = crc
+	zip_info.file_size = file_size
+	zip_info.compress_size = compress_size
+	zip64 = file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT
+	with zip_file._lock:
+		zip_file._writecheck(zip_info)
+		zip_file.fp.seek(zip_file.start_dir)
+		zip_info.header_offset = zip_file.fp.tell()
+		zip_file._didModify = True
+		zip_file.fp.write(zip_info.FileHeader(zip64))
+		write_data(zip_file.fp)
+		zip_file.start_dir = zip_file.fp.tell()
+		zip_file.filelist.append(zip_info)
+		zip_file.NameToInfo[zip_info.filename] = zip_info
+
+
+def _write_compressed(zip_file, zip_info, crc, file_size, compress_size, data):
+	"""
+	:type zip_file: ZipFile
+	:type zip_info: ZipInfo
+	:type crc: int
+	:type file_size: int
+	:type compress_size: int
+	:param bytes or str data: the compressed data or the path of the temporary file it is spooled to
+	"""
+	zip_info.flag_bits = 0x00
+
+	def write_data(file):
+		if isinstance(data, bytes):
+			file.write(data)
+		else:
+			with open(data, 'rb') as spooled:
+				shutil.copyfileobj(spooled, file, _COPY_CHUNK_SIZE)
+
+	_write_member(
+		zip_file=zip_file, zip_info=zip_info, crc=crc, file_size=file_size, compress_size=compress_size,
+		write_data=write_data
+	)
+
+
+def _recompress_member(source, info, zip_file):
+	"""
+	copies a member of another archive through the public ZipFile interface, it is decompressed and compressed again
+	:param file source: the other archive opened in binary mode
+	:type info: ZipInfo
+	:type zip_file: ZipFile
+	"""
+	zip_info = ZipInfo(filename=info.filename, date_time=info.date_time)
+	zip_info.compress_type = zip_file.compression
+	zip_info.external_attr = info.external_attr
+	zip_info.comment = info.comment
+	zip_info.file_size = info.file_size
+	with ZipFile(file=source, mode='r') as source_zip_file:
+		with source_zip_file.open(info, mode='r') as source_member:
+			with zip_file.open(zip_info, mode='w', force_zip64=info.file_size > ZIP64_LIMIT) as member:
+				shutil.copyfileobj(source_member, member, _COPY_CHUNK_SIZE)
+
+
+def _copy_raw_member(source, info, zip_file):
+	"""
+	copies a member of another archive without decompressing it
+	:param file source: the other archive opened in binary mode
+	:type info: ZipInfo
+	:type zip_file: ZipFile
+	"""
+	source.seek(info.header_offset)
+	header = source.read(_LOCAL_HEADER_SIZE)
+	if header[:4] != _LOCAL_HEADER_SIGNATURE:
+		raise BadZipFile(f'bad local header for "{info.filename}"')
+	name_length, extra_length = struct.unpack('<HH', header[26:30])
+	source.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+
+	zip_info = ZipInfo(filename=info.filename, date_time=info.date_time)
+	zip_info.compress_type = info.compress_type
+	zip_info.external_attr = info.external_attr
+	zip_info.create_system = info.create_system
+	zip_info.comment = info.comment
+	# the sizes are known and written in the local header so a data descriptor is not needed
+	zip_info.flag_bits = info.flag_bits & ~_DATA_DESCRIPTOR_FLAG
+
+	def write_data(file):
+		remaining = info.compress_size
+		while remaining > 0:
+			chunk = source.read(min(remaining, _COPY_CHUNK_SIZE))
+			if not chunk:
+				raise BadZipFile(f'"{info.filename}" is truncated')
+			file.write(chunk)
+			remaining -= len(chunk)
+
+	_write_member(
+		zip_file=zip_file, zip_info=zip_info, crc=info.CRC, file_size=info.file_size,
+		compress_size=info.compress_size, write_data=write_data
+	)
+
+
+def _supports_raw_members():
+	"""
+	writing a member whose data is already compressed uses ZipFile internals, so it is only done on the versions
+	they were checked on and after a few members written that way are read back; otherwise files are compressed
+	by ZipFile.write one at a time and members are copied through ZipFile.open
+	:rtype: bool
+	"""
+	if sys.implementation.name != 'cpython':
+		return False
+	oldest, newest = _RAW_MEMBER_VERSIONS
+	if not oldest <= sys.version_info[:2] <= newest:
+		return False
+
+	data = b'raw member ' * 100
+	try:
+		source = io.BytesIO()
+		with ZipFile(file=source, mode='w') as zip_file:
+			for compression in (ZIP_STORED, ZIP_DEFLATED):
+				compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+				compressed = data if compression == ZIP_STORED else compressor.compress(data) + compressor.flush()
+				zip_info = ZipInfo(filename=f'{compression}.txt')
+				zip_info.compress_type = compression
+				_write_compressed(
+					zip_file=zip_file, zip_info=zip_info, crc=zlib.crc32(data), file_size=len(data),
+					compress_size=len(compressed), data=compressed
+				)
+		copy = io.BytesIO()
+		with ZipFile(file=source, mode='r') as source_zip_file:
+			with ZipFile(file=copy, mode='w') as zip_file:
+				for info in source_zip_file.infolist():
+					_copy_raw_member(source=source, info=info, zip_file=zip_file)
+		with ZipFile(file=copy, mode='r') as zip_file:
+			return zip_file.testzip() is None and all(zip_file.read(x) == data for x in zip_file.namelist())
+	except Exception:
+		return False
+
+
+_WRITES_RAW_MEMBERS = _supports_raw_members()
+
+
+def _copy_member(source, info, zip_file):
+	"""
+	copies a member of another archive, without decompressing it where members can be written as they are
+	:param file source: the other archive opened in binary mode
+	:type info: ZipInfo
+	:type zip_file: ZipFile
+	"""
+	if _WRITES_RAW_MEMBERS:
+		_copy_raw_member(source=source, info=info, zip_file=zip_file)
+	else:
+		_recompress_member(source=source, info=info, zip_file=zip_file)
+
+
+def _get_files(path):
+	"""
+	:type path: str
+	:return: every file under the directory in a deterministic order
+	:rtype: list[str]
+	"""
+	result = []
+	for root, dirs, files in os.walk(path):
+		dirs.sort()
+		for file in sorted(files):
+			result.append(os.path.join(root, file))
+	return result
+
 
+def _write_members(
+		zip_file, tasks, compression, compression_level, num_workers, use_processes, source=None, on_written=None
+):
+	"""
+	writes members in the order of the tasks; files are compressed on a pool and members of another archive
+	are copied as they are
+	:type zip_file: ZipFile
+	:param list[tuple] tasks: (file, None) to compress a file or (None, ZipInfo) to copy a member of source
+	:param file or NoneType source: the other archive opened in binary mode
+	:param callable or NoneType on_written: called with the name of every member that is written
+	"""
+	if compression not in (ZIP_DEFLATED, ZIP_STORED) or not _WRITES_RAW_MEMBERS:
+		# bzip2 and lzma are left to ZipFile, compresslevel is only known to ZipFile.write from Python 3.7
+		level_arguments = {} if compression_level is None else {'compresslevel': compression_level}
+		for file, info in tasks:
+			if info is None:
+				zip_file.write(file, **level_arguments)
+			else:
+				_copy_member(source=source, info=info, zip_file=zip_file)
+			if on_written is not None:
+				on_written(file or info.filename)
+		return
+
+	num_workers = get_num_workers(num_workers)
+	pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+	with pool_class(max_workers=num_workers) as executor:
+		def write(file, info, future):
+			if info is None:
+				crc, file_size, compress_size, data = future.result()
+				try:
+					zip_info = ZipInfo.from_file(file)
+					zip_info.compress_type = compression
+					_write_compressed(
+						zip_file=zip_file, zip_info=zip_info, crc=crc, file_size=file_size,
+						compress_size=compress_size, data=data
+					)
+				finally:
+					_discard_spooled(data)
+			else:
+				_copy_member(source=source, info=info, zip_file=zip_file)
+			if on_written is not None:
+				on_written(file or info.filename)
+
+		# only a few compressed files are kept in memory while they wait for their turn to be written
+		pending = deque()
+		try:
+			for file, info in tasks:
+				future = None
+				if info is None:
+					future = executor.submit(
+						_compress, path=file, compression=compression, compression_level=compression_level
+					)
+				pending.append((file, info, future))
+				if len(pending) >= num_workers * 2:
+					write(*pending.popleft())
+			while pending:
+				write(*pending.popleft())
+		finally:
+			# after an error, the files spooled for members that were not written are removed
+			for _, _, future in pending:
+				if future is not None and not future.cancel() and future.exception() is None:
+					_discard_spooled(future.result()[3])
+
+
+def zip_directory(
+		path, zip_path, compression=ZIP_DEFLATED, echo=0, num_workers=None, compression_level=None,
+		use_processes=False
+):
+	"""
+	zips a directory, the files are compressed on a pool and written to the archive in sorted order
+	so the same tree always produces the same archive
+	:type path: str
+	:type zip_path: str
+	:type compression: int
+	:param int or NoneType num_workers: number of threads or processes compressing files
+	:param int or NoneType compression_level: 0 to 9 for deflate, None for the zlib default
+	:param bool use_processes: if True, files are compressed on a process pool instead of a thread pool
+	:rtype: str
+	"""
+	echo = max(0, echo)
 	compression = compression or ZIP_STORED
+	files = _get_files(path=path)
+	progress_bar = ProgressBar(echo=echo, total=len(files))
 	amount = 0
+
+	def on_written(name):
+		nonlocal amount
+		progress_bar.show(amount=amount, text=f'"{os.path.basename(name)}" zipped into {zip_path}')
+		amount += 1
+
 	with ZipFile(file=zip_path, mode='w', compression=compression) as zip_file:
-		for root, dirs, files in os.walk(path):
-			for file in files:
-				zip_file.write(os.path.join(root, file))
-				progress_bar.show(amount=amount, text=f'"{file}" zipped into {zip_path}')
-				amount += 1
+		_write_members(
+			zip_file=zip_file, tasks=[(file, None) for file in files], compression=compression,
+			compression_level=compression_level, num_workers=num_workers, use_processes=use_processes,
+			on_written=on_written
+		)
+
 	progress_bar.show(amount=amount, text=f'{zip_path} complete!')
 	return zip_path
 
 
-def zip_file(path, zip_path, compression=ZIP_DEFLATED, echo=0):
+def _get_dos_time(date_time):
+	"""
+	zip files keep modification times in two second steps
+	:type date_time: tuple
+	:rtype: tuple
+	"""
+	return tuple(date_time[:5]) + (date_time[5] // 2,)
+
+
+def _get_crc(path):
+	"""
+	:type path: str
+	:rtype: int
+	"""
+	crc = 0
+	with open(path, 'rb') as file:
+		for chunk in iter(lambda: file.read(_COPY_CHUNK_SIZE), b''):
+			crc = zlib.crc32(chunk, crc)
+	return crc
+
+
+def update_zip(
+		path, zip_path, compression=ZIP_DEFLATED, remove_deleted=False, check_crc=False, echo=0, num_workers=None,
+		compression_level=None, use_processes=False
+):
+	"""
+	brings an archive made by zip_directory up to date with the directory: a member whose size and modification
+	time match its file is kept without being compressed again, other files are compressed on a pool;
+	if files were only added they are appended, otherwise the archive is rewritten next to the old one,
+	with unchanged members copied as they are, and replaces it
+	:type path: str
+	:type zip_path: str
+	:type compression: int
+	:param bool remove_deleted: if True, members whose files no longer exist are removed
+	:param bool check_crc: if True, the CRC of a file is also compared, which reads every file
+	:param int or NoneType num_workers: number of threads or processes compressing files
+	:param int or NoneType compression_level: 0 to 9 for deflate, None for the zlib default
+	:param bool use_processes: if True, files are compressed on a process pool instead of a thread pool
+	:rtype: str
+	"""
+	if not os.path.exists(zip_path):
+		return zip_directory(
+			path=path, zip_path=zip_path, compression=compression, echo=echo, num_workers=num_workers,
+			compression_level=compression_level, use_processes=use_processes
+		)
+
+	echo = max(0, echo)
 	compression = compression or ZIP_STORED
-	with ZipFile(file=zip_path, mode='w', compression=compression) as zip_file:
+	with ZipFile(file=zip_path, mode='r') as zip_file:
+		old_infos = {info.filename: info for info in zip_file.infolist()}
+
+	# the member name of a file is derived the same way ZipFile.write derives it
+	members = [(file, ZipInfo.from_file(file)) for file in _get_files(path=path)]
+	candidates = []
+	for file, file_info in members:
+		info = old_infos.get(file_info.filename)
+		if info is None or info.file_size != file_info.file_size:
+			continue
+		if _get_dos_time(info.date_time) == _get_dos_time(file_info.date_time):
+			candidates.append((file, info))
+	if check_crc:
+		with ThreadPoolExecutor(max_workers=get_num_workers(num_workers)) as executor:
+			crcs = list(executor.map(_get_crc, [file for file, _ in candidates]))
+		candidates = [(file, info) for (file, info), crc in zip(candidates, crcs) if crc == info.CRC]
+
+	unchanged = {info.filename: info for _, info in candidates}
+	names = {file_info.filename for _, file_info in members}
+	new_files = [file for file, file_info in members if file_info.filename not in old_infos]
+	num_changed = len(names) - len(unchanged) - len(new_files)
+	deleted = [info for name, info in old_infos.items() if name not in names]
+
+	progress_bar = ProgressBar(echo=echo, total=None)
+	amount = 0
+
+	def on_written(name):
+		nonlocal amount
+		progress_bar.show(amount=amount, text=f'"{os.path.basename(name)}" written to {zip_path}')
+		amount += 1
+
+	if num_changed == 0 and (len(deleted) == 0 or not remove_deleted):
+		if len(new_files) > 0:
+			with ZipFile(file=zip_path, mode='a', compression=compression) as zip_file:
+				_write_members(
+					zip_file=zip_file, tasks=[(file, None) for file in new_files], compression=compression,
+					compression_level=compression_level, num_workers=num_workers, use_processes=use_processes,
+					on_written=on_written
+				)
+
+	else:
+		tasks = []
+		for file, file_info in members:
+			info = unchanged.get(file_info.filename)
+			tasks.append((file, None) if info is None else (None, info))
+		if not remove_deleted:
+			tasks += [(None, info) for info in deleted]
+
+		# a unique name in the same directory, so os.replace is atomic and two updates never share a file
+		temporary = tempfile.NamedTemporaryFile(
+			dir=os.path.dirname(os.path.abspath(zip_path)), prefix=f'.{os.path.basename(zip_path)}.', suffix='.tmp',
+			delete=False
+		)
+		try:
+			with temporary:
+				with open(zip_path, 'rb') as source:
+					with ZipFile(file=temporary, mode='w', compression=compression) as zip_file:
+						_write_members(
+							zip_file=zip_file, tasks=tasks, compression=compression,
+							compression_level=compression_level, num_workers=num_workers, use_processes=use_processes,
+							source=source, on_written=on_written
+						)
+			# the temporary file is only readable by its owner, the archive keeps its own permissions
+			shutil.copymode(zip_path, temporary.name)
+			os.replace(temporary.name, zip_path)
+		finally:
+			if os.path.exists(temporary.name):
+				os.remove(temporary.name)
+
+	if echo:
+		num_removed = len(deleted) if remove_deleted else 0
+		print(
+			f'{zip_path} updated: {len(new_files)} added, {num_changed} changed, {num_removed} removed, '
+			f'{len(unchanged)} unchanged'
+		)
+	return zip_path
+
+
+def zip_file(path, zip_path, compression=ZIP_DEFLATED, echo=0, compression_level=None):
+	compression = compression or ZIP_STORED
+	# compresslevel is only known to ZipFile from Python 3.7
+	level_arguments = {} if compression_level is None else {'compresslevel': compression_level}
+	with ZipFile(file=zip_path, mode='w', compression=compression, **level_arguments) as zip_file:
 		zip_file.write(path)
 	if echo:
 		print(f'"{path}" zipped as "{zip_path}"')
 	return zip_path
 
 
-def unzip(path, unzip_path):
+def _get_members(zip_file, members):
+	"""
+	:type zip_file: ZipFile
+	:param list[str] or callable or NoneType members: names, a function that takes a name and returns a bool, or None
+	:rtype: list[ZipInfo]
+	"""
+	if members is None:
+		return zip_file.infolist()
+	elif callable(members):
+		return [member for member in zip_file.infolist() if members(member.filename)]
+	else:
+		return [zip_file.getinfo(name) for name in members]
+
+
+def unzip(path, unzip_path, num_workers=None, members=None, echo=0):
+	"""
+	extracts an archive on a thread pool, every thread reads the archive through a handle of its own
+	:type path: str
+	:type unzip_path: str
+	:param int or NoneType num_workers: number of threads decompressing members
+	:param list[str] or callable or NoneType members: only these members are extracted, either a list of names or
+	a function that takes a name and returns True for the members to extract
+	:rtype: str
+	"""
+	echo = max(0, echo)
 	with ZipFile(file=path, mode='r') as zip_file:
-		zip_file.extractall(path=unzip_path)
+		infos = _get_members(zip_file=zip_file, members=members)
+
+	# parent directories are made up front so threads do not race to make them;
+	# empty, "." and ".." parts are dropped the way ZipFile.extract drops them
+	directories = set()
+	for info in infos:
+		parts = [part for part in info.filename.split('/') if part not in ('', os.curdir, os.pardir)]
+		member_path = os.path.join(unzip_path, *parts)
+		directories.add(member_path if info.is_dir() else os.path.dirname(member_path))
+	for directory in sorted(directories):
+		os.makedirs(directory, exist_ok=True)
+
+	num_workers = get_num_workers(num_workers)
+	chunk_size = max(1, len(infos) // (num_workers * 4))
+	chunks = [infos[index:index + chunk_size] for index in range(0, len(infos), chunk_size)]
+	handles = []
+	handles_lock = Lock()
+	local = threading_local()
+
+	def extract_chunk(chunk):
+		handle = getattr(local, 'zip_file', None)
+		if handle is None:
+			handle = ZipFile(file=path, mode='r')
+			local.zip_file = handle
+			with handles_lock:
+				handles.append(handle)
+		for info in chunk:
+			handle.extract(member=info, path=unzip_path)
+		return len(chunk)
+
+	progress_bar = ProgressBar(echo=echo, total=len(infos))
+	amount = 0
+	try:
+		with ThreadPoolExecutor(max_workers=num_workers) as executor:
+			for future in as_completed([executor.submit(extract_chunk, chunk) for chunk in chunks]):
+				amount += future.result()
+				progress_bar.show(amount=amount, text=f'{amount} members extracted from {path}')
+	finally:
+		for handle in handles:
+			handle.close()
+	progress_bar.show(amount=amount, text=f'{path} extracted!')
 	return unzip_path
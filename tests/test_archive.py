@@ -0,0 +1,187 @@
+import io
+import os
+import sys
+import tarfile
+
+import pytest
+
+from disk import archive
+from disk import extract_archive
+from disk import Path
+from disk.exceptions import UnsafeArchiveError
+
+from .test_zip import make_tree
+
+# disk.archive is the function, the module is looked up by name
+archive_module = sys.modules['disk.archive']
+
+CODEC_NAMES = sorted(archive_module.CODECS)
+
+
+def read_tree(root):
+	result = {}
+	for directory, _, files in os.walk(root):
+		for name in files:
+			path = os.path.join(directory, name)
+			with open(path, 'rb') as file:
+				result[os.path.relpath(path, root).replace(os.sep, '/')] = file.read()
+	return result
+
+
+def get_codec(name):
+	codec = archive_module.CODECS[name]
+	if not codec.is_available:
+		pytest.skip(f'{name} is not installed')
+	return codec
+
+
+def make_tar(members):
+	"""
+	:param list[tuple[tarfile.TarInfo, bytes or NoneType]] members:
+	:rtype: io.BytesIO
+	"""
+	file = io.BytesIO()
+	with tarfile.open(fileobj=file, mode='w') as tar_file:
+		for tar_info, data in members:
+			if data is None:
+				tar_file.addfile(tar_info)
+			else:
+				tar_info.size = len(data)
+				tar_file.addfile(tar_info, io.BytesIO(data))
+	file.seek(0)
+	return file
+
+
+def make_info(name, type=tarfile.REGTYPE, linkname=''):
+	tar_info = tarfile.TarInfo(name)
+	tar_info.type = type
+	tar_info.linkname = linkname
+	tar_info.mode = 0o755 if type == tarfile.DIRTYPE else 0o644
+	return tar_info
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	make_tree('tree')
+	return read_tree('tree')
+
+
+@pytest.mark.parametrize('name', CODEC_NAMES)
+def test_archive_round_trip(tree, name):
+	codec = get_codec(name)
+	archive_path = f'tree{codec.extension}'
+	archive(path='tree', archive_path=archive_path, compression=name)
+	if codec.magic is not None:
+		with open(archive_path, 'rb') as file:
+			assert file.read(len(codec.magic)) == codec.magic
+
+	extract_archive(archive_path=archive_path, unzip_path='out')
+	assert read_tree(os.path.join('out', 'tree')) == tree
+
+
+@pytest.mark.parametrize('name', CODEC_NAMES)
+def test_archive_streams_through_file_objects(tree, name):
+	get_codec(name)
+	file = io.BytesIO()
+	assert archive(path='tree', archive_path=file, compression=name) is file
+	assert not file.closed
+
+	file.seek(0)
+	assert archive_module.detect_codec(file).name == name
+	assert file.tell() == 0
+	extract_archive(archive_path=file, unzip_path='out')
+	assert read_tree(os.path.join('out', 'tree')) == tree
+
+
+def test_archive_is_deterministic(tree):
+	archive(path='tree', archive_path='tree.tar.gz', compression='gz')
+	with open('tree.tar.gz', 'rb') as file:
+		first = file.read()
+	archive(path='tree', archive_path='tree.tar.gz', compression='gz')
+	with open('tree.tar.gz', 'rb') as file:
+		assert file.read() == first
+
+
+def test_extract_archive_selects_members(tree):
+	archive(path='tree', archive_path='tree.tar', compression='tar')
+
+	extract_archive(archive_path='tree.tar', unzip_path='listed', members=['tree/b', 'tree/b/c.bin'])
+	assert read_tree(os.path.join('listed', 'tree')) == {'b/c.bin': tree['b/c.bin']}
+
+	extract_archive(archive_path='tree.tar', unzip_path='selected', members=lambda name: name.endswith('.txt'))
+	expected = {name: data for name, data in tree.items() if name.endswith('.txt')}
+	assert read_tree(os.path.join('selected', 'tree')) == expected
+
+
+def test_extract_archive_preserves_directory_times(tree):
+	os.utime(os.path.join('tree', 'b'), (1000000000, 1000000000))
+	archive(path='tree', archive_path='tree.tar.gz', compression='gz')
+	extract_archive(archive_path='tree.tar.gz', unzip_path='out')
+	assert os.stat(os.path.join('out', 'tree', 'b')).st_mtime == 1000000000
+
+
+def test_extract_archive_needs_a_codec_for_unseekable_streams(tmp_path):
+	class Unseekable(io.BytesIO):
+		def seekable(self):
+			return False
+
+	with pytest.raises(ValueError):
+		extract_archive(archive_path=Unseekable(make_tar([]).read()), unzip_path=str(tmp_path))
+
+
+@pytest.mark.parametrize('member', [
+	(make_info('../evil.txt'), b'evil'),
+	(make_info('/absolute.txt'), b'evil'),
+	(make_info('link', type=tarfile.SYMTYPE, linkname='../outside'), None),
+	(make_info('hard', type=tarfile.LNKTYPE, linkname='../outside'), None),
+	(make_info('fifo', type=tarfile.FIFOTYPE), None)
+])
+def test_extract_archive_rejects_unsafe_members(tmp_path, member):
+	out = tmp_path / 'out'
+	with pytest.raises(UnsafeArchiveError):
+		extract_archive(archive_path=make_tar([member]), unzip_path=str(out), compression='tar')
+	assert not (tmp_path / 'evil.txt').exists()
+	assert not (tmp_path / 'absolute.txt').exists()
+
+
+def test_extract_archive_rejects_writing_through_a_symlink(tmp_path):
+	file = make_tar([
+		(make_info('link', type=tarfile.SYMTYPE, linkname='.'), None),
+		(make_info('link/../../evil.txt'), b'evil')
+	])
+	with pytest.raises(UnsafeArchiveError):
+		extract_archive(archive_path=file, unzip_path=str(tmp_path / 'out'), compression='tar')
+	assert not (tmp_path / 'evil.txt').exists()
+
+
+def test_extract_archive_skips_hard_links_to_unextracted_members(tmp_path):
+	file = make_tar([
+		(make_info('target.txt'), b'target'),
+		(make_info('hard.txt', type=tarfile.LNKTYPE, linkname='target.txt'), None)
+	])
+	out = tmp_path / 'out'
+	with pytest.warns(UserWarning):
+		extract_archive(archive_path=file, unzip_path=str(out), compression='tar', members=['hard.txt'])
+	assert not (out / 'hard.txt').exists()
+
+	file.seek(0)
+	extract_archive(archive_path=file, unzip_path=str(out), compression='tar')
+	assert (out / 'hard.txt').read_bytes() == b'target'
+
+
+def test_path_archive_and_unzip(tree):
+	archive_path = Path('tree').archive(compression='gz')
+	assert archive_path == Path('tree.tar.gz')
+	assert os.path.isdir('tree')
+
+	result = archive_path.unzip(unzip_path='out')
+	assert result == Path(os.path.join('out', 'tree'))
+	assert read_tree(result.path) == tree
+
+
+def test_path_unzip_warns_that_tar_archives_use_one_thread(tree):
+	archive_path = Path('tree').archive(compression='gz')
+	with pytest.warns(UserWarning, match='num_workers is ignored'):
+		result = archive_path.unzip(unzip_path='out', num_workers=4)
+	assert read_tree(result.path) == tree
@@ -0,0 +1,171 @@
+import gc
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from disk import ArchivedHardFolder
+from disk import ArchivePath
+from disk import Cache
+from disk import HardFolder
+from disk.exceptions import ReadOnlyError
+
+calls = []
+
+
+def square(x):
+	calls.append(x)
+	return x * x
+
+
+# folders save their keys when the interpreter exits, so they are given absolute paths that stay in tmp_path
+@pytest.fixture
+def cache_zip(tmp_path):
+	cache = Cache(path=str(tmp_path / 'cache'))
+	cached_square = cache.make_cached(function=square, id='square')
+	assert [cached_square(x) for x in range(3)] == [0, 1, 4]
+	cache.zip(zip_path=str(tmp_path / 'cache.zip'))
+	calls.clear()
+	return str(tmp_path / 'cache.zip')
+
+
+def test_archived_cache_reads_items(cache_zip):
+	cache = Cache.from_zip(path=cache_zip, extract=False)
+	assert cache.is_read_only
+	assert isinstance(cache.hard_folder, ArchivedHardFolder)
+
+	cached_square = cache.make_cached(function=square, id='square')
+	assert [cached_square(x) for x in range(3)] == [0, 1, 4]
+	assert calls == []
+
+
+def test_archived_cache_computes_missing_items_without_storing_them(cache_zip):
+	cache = Cache.from_zip(path=cache_zip, extract=False)
+	cached_square = cache.make_cached(function=square, id='square')
+	assert cached_square(5) == 25
+	assert cached_square(5) == 25
+	assert calls == [5, 5]
+	assert len(cache.keys()) == 3
+
+
+def test_archived_cache_is_read_only(cache_zip):
+	cache = Cache.from_zip(path=cache_zip, extract=False)
+	with pytest.raises(ReadOnlyError):
+		cache['new'] = 1
+	key = next(iter(cache.keys()))
+	with pytest.raises(ReadOnlyError):
+		del cache[key]
+	with pytest.raises(ReadOnlyError):
+		cache.zip(zip_path='again.zip')
+
+
+def test_archived_cache_hides_its_children(cache_zip):
+	cache = Cache.from_zip(path=cache_zip, extract=False)
+	assert cache.children == {}
+	assert Cache._CHILDREN_KEY_ not in cache
+	assert Cache._CHILDREN_KEY_ not in cache.keys()
+	assert len(cache.keys()) == 3
+
+
+def test_extracted_cache_is_writable(cache_zip, tmp_path):
+	cache = Cache.from_zip(path=cache_zip, unzip_path=str(tmp_path / 'out'))
+	assert not cache.is_read_only
+	assert Cache._CHILDREN_KEY_ not in cache
+	cached_square = cache.make_cached(function=square, id='square')
+	assert cached_square(2) == 4
+	assert cached_square(6) == 36
+	assert calls == [6]
+	assert len(cache.keys()) == 4
+
+
+@pytest.fixture
+def folder_zip(tmp_path):
+	folder = HardFolder(path=str(tmp_path / 'folder'))
+	folder['text'] = 'text' * 1000
+	folder['numbers'] = list(range(100))
+	folder.zip(zip_path=str(tmp_path / 'folder.zip'))
+	return str(tmp_path / 'folder.zip')
+
+
+def test_archived_hard_folder(folder_zip):
+	folder = HardFolder.from_zip(path=folder_zip, extract=False)
+	assert isinstance(folder, ArchivedHardFolder)
+	assert folder['numbers'] == list(range(100))
+	assert 'text' in folder
+	assert 'missing' not in folder
+	with pytest.raises(KeyError):
+		folder['missing']
+	assert sorted(folder.keys()) == ['numbers', 'text']
+
+	size, unit = folder.get_size('text')
+	assert unit == 'KB' and size > 3.9
+	assert len(list(folder.metadata)) == 2
+
+	with pytest.raises(ReadOnlyError):
+		folder['text'] = 'changed'
+
+
+def test_archive_path(folder_zip, tmp_path):
+	# members are named after the zipped path
+	name = str(tmp_path / 'folder').lstrip('/')
+	root = ArchivePath(zip_path=folder_zip)
+	assert root.is_directory()
+	assert [x.name_and_extension for x in root.list()] == [name.split('/')[0]]
+
+	folder = root / name
+	assert [x.name_and_extension for x in folder.parent_directory.list()] == ['folder']
+	assert folder.directories == []
+	keys_path = folder / 'keys.pickle'
+	assert keys_path.is_file() and keys_path.exists()
+	assert keys_path.size_bytes == len(keys_path.read_bytes())
+	assert sorted(keys_path.load().values()) == ['numbers', 'text']
+	assert not (folder / 'missing').exists()
+	with pytest.raises(FileNotFoundError):
+		(folder / 'missing').read_bytes()
+	with pytest.raises(ReadOnlyError):
+		keys_path.save(obj={})
+
+
+@pytest.fixture
+def cache_with_children_zip(tmp_path):
+	cache = Cache(path=str(tmp_path / 'cache'))
+	cached_square = cache.make_cached(function=square, id='square', sub_directory='sub')
+	nested_square = cache.make_cached(function=square, id='square', sub_directory='sub/nested')
+	assert cached_square(2) == 4
+	assert nested_square(3) == 9
+	cache.zip(zip_path=str(tmp_path / 'cache.zip'))
+	# the caches save their keys when they are collected, then the folder is removed so anything written back shows
+	del cache, cached_square, nested_square
+	gc.collect()
+	shutil.rmtree(str(tmp_path / 'cache'))
+	calls.clear()
+	return str(tmp_path / 'cache.zip')
+
+
+def test_archived_cache_reads_sub_directories(cache_with_children_zip, tmp_path):
+	cache = Cache.from_zip(path=cache_with_children_zip, extract=False)
+	assert all(child.is_read_only for child in cache.children.values())
+
+	assert cache.make_cached(function=square, id='square', sub_directory='sub')(2) == 4
+	assert cache.make_cached(function=square, id='square', sub_directory='sub/nested')(3) == 9
+	assert calls == []
+	assert not (tmp_path / 'cache').exists()
+
+
+def test_archived_cache_writes_nothing_at_exit(cache_with_children_zip, tmp_path):
+	script = (
+		'import sys\n'
+		'from disk import Cache\n'
+		'cache = Cache.from_zip(path=sys.argv[1], extract=False)\n'
+		'assert len(cache.children) == 1\n'
+	)
+	environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+	completed = subprocess.run(
+		[sys.executable, '-c', script, cache_with_children_zip], env=environment, stdout=subprocess.PIPE,
+		stderr=subprocess.PIPE
+	)
+	assert completed.returncode == 0, completed.stderr
+	assert completed.stderr == b''
+	assert not (tmp_path / 'cache').exists()
@@ -0,0 +1,153 @@
+import asyncio
+import importlib
+import os
+import time
+
+import pytest
+
+from disk import AsyncPath
+from disk import Path
+
+from .test_zip import make_tree
+
+async_module = importlib.import_module('disk.AsyncPath')
+
+
+@pytest.fixture(autouse=True)
+def executor(monkeypatch):
+	"""
+	each test gets its own shared thread pool, which is shut down after it
+	"""
+	monkeypatch.setattr(async_module, '_executor', None)
+	yield
+	if async_module._executor is not None:
+		async_module._executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	make_tree('tree')
+	return AsyncPath('tree')
+
+
+def relative(paths, root='tree'):
+	return [os.path.relpath(x.path.path, root).replace(os.sep, '/') for x in paths]
+
+
+async def collect(iterable):
+	return [x async for x in iterable]
+
+
+def test_walk(tree):
+	expected = [x.get_relative_path(directory=Path('tree')).replace(os.sep, '/') for x in Path('tree').walk()]
+	# a batch smaller than the tree makes the walk go back to the pool several times
+	assert relative(asyncio.run(collect(tree.walk(batch_size=2)))) == expected
+	assert relative(asyncio.run(collect(tree.walk()))) == expected
+
+	files = asyncio.run(collect(tree.iter_files(batch_size=3)))
+	assert relative(files) == [x for x in expected if os.path.isfile(os.path.join('tree', x))]
+	assert all(isinstance(x, AsyncPath) for x in files)
+
+
+def test_walk_filters(tree):
+	walked = asyncio.run(collect(tree.walk(max_depth=1, directories=False)))
+	assert relative(walked) == ['a.txt']
+	walked = asyncio.run(collect(tree.walk(include=lambda x: x.extension == 'txt', exclude=lambda x: x.name == 'f')))
+	assert relative(walked) == ['b/d/e.txt', 'a.txt']
+
+
+def test_walk_stopped_early(tree):
+	async def first_two():
+		walker = tree.walk(batch_size=1)
+		result = []
+		async for path in walker:
+			result.append(path)
+			if len(result) == 2:
+				break
+		await walker.aclose()
+		return result
+
+	assert len(asyncio.run(first_two())) == 2
+
+
+def test_cancelled_walk_waits_for_its_batch(tree, monkeypatch):
+	get_batch = async_module._get_batch
+	finished = []
+
+	def slow_get_batch(iterator, size):
+		time.sleep(0.2)
+		result = get_batch(iterator=iterator, size=size)
+		finished.append(len(result))
+		return result
+
+	monkeypatch.setattr(async_module, '_get_batch', slow_get_batch)
+
+	async def cancel_walk():
+		task = asyncio.ensure_future(collect(tree.walk(batch_size=1)))
+		await asyncio.sleep(0.05)
+		task.cancel()
+		with pytest.raises(asyncio.CancelledError):
+			await task
+		# the batch that was being read when the walk was cancelled is finished, not abandoned on the pool
+		return list(finished)
+
+	assert asyncio.run(cancel_walk()) == [1]
+
+
+def test_read_and_write(tmp_path):
+	async def read_and_write():
+		directory = await AsyncPath(str(tmp_path)).make_directory(name='data')
+		path = directory / 'lines.txt'
+		await path.write('first\n')
+		await path.write_lines(['second\n', 'third\n'], append=True)
+		assert await path.exists()
+		assert await path.is_file()
+		assert (await path.stat()).size_bytes == len('first\nsecond\nthird\n')
+		assert await path.get_size_bytes() == len('first\nsecond\nthird\n')
+
+		saved = await (directory / 'object').save(obj={'a': 1})
+		loaded = await AsyncPath(saved).load()
+		return (
+			await path.read_lines(), await path.read_bytes(), loaded,
+			[x.name_and_extension for x in await directory.list()]
+		)
+
+	lines, data, loaded, names = asyncio.run(read_and_write())
+	assert lines == ['first\n', 'second\n', 'third\n']
+	assert data == b'first\nsecond\nthird\n'
+	assert loaded == {'a': 1}
+	assert sorted(names) == ['lines.txt', 'object.pickle']
+
+
+def test_copy_and_delete(tree):
+	async def copy_and_delete():
+		copy = await tree.copy(new_path=AsyncPath('copy'))
+		assert isinstance(copy, AsyncPath)
+		await copy.delete(method='permanent')
+		return await copy.exists()
+
+	assert asyncio.run(copy_and_delete()) is False
+	assert os.path.isdir('tree')
+
+
+def test_set_executor_size(tmp_path):
+	async_module.set_executor_size(2)
+	executor = async_module.get_executor()
+	assert executor._max_workers == 2
+	assert async_module.get_executor() is executor
+
+	async def read_concurrently():
+		path = Path(str(tmp_path / 'file.txt'))
+		path.write('shared')
+		return await asyncio.gather(*[path.aio.read_bytes() for _ in range(10)])
+
+	assert asyncio.run(read_concurrently()) == [b'shared'] * 10
+	assert len(executor._threads) <= 2
+
+	async_module.set_executor_size(3)
+	assert async_module.get_executor() is not executor
+	assert async_module.get_executor()._max_workers == 3
+	# the old pool is shut down, its threads end once their work is done
+	with pytest.raises(RuntimeError):
+		executor.submit(int)
@@ -0,0 +1,129 @@
+import errno
+import importlib
+import os
+
+import pytest
+
+from disk import copy_directory
+from disk import copy_file
+from disk import CopyReport
+from disk import Path
+
+from .test_archive import read_tree
+from .test_zip import make_tree
+
+copy_module = importlib.import_module('disk.copy_function')
+
+DATA = os.urandom(100000)
+
+
+@pytest.fixture
+def source(tmp_path):
+	path = tmp_path / 'source.bin'
+	path.write_bytes(DATA)
+	os.utime(str(path), (1000000000, 1000000000))
+	return str(path)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+	"""
+	records which kernel copy functions were called, small chunks make each of them loop
+	"""
+	result = []
+	monkeypatch.setattr(copy_module, '_CHUNK_SIZE', 4096)
+	for name in ('copy_file_range', 'sendfile'):
+		function = getattr(os, name, None)
+		if function is None:
+			continue
+
+		def record(*args, _name=name, _function=function):
+			result.append(_name)
+			return _function(*args)
+
+		monkeypatch.setattr(os, name, record)
+	return result
+
+
+def unsupported(error_number):
+	def function(*args):
+		raise OSError(error_number, os.strerror(error_number))
+	return function
+
+
+def check_copy(source, destination):
+	assert copy_file(source=source, destination=destination) == len(DATA)
+	with open(destination, 'rb') as file:
+		assert file.read() == DATA
+	assert os.stat(destination).st_mtime == 1000000000
+
+
+@pytest.mark.skipif(not hasattr(os, 'copy_file_range'), reason='os.copy_file_range is missing')
+def test_copy_file_in_the_kernel(source, tmp_path, calls):
+	check_copy(source, str(tmp_path / 'destination.bin'))
+	assert set(calls) <= {'copy_file_range', 'sendfile'}
+	assert len(calls) > 1
+
+
+@pytest.mark.skipif(not hasattr(os, 'sendfile'), reason='os.sendfile is missing')
+@pytest.mark.parametrize('error_number', [errno.ENOSYS, errno.EXDEV])
+def test_copy_file_falls_back_to_sendfile(source, tmp_path, calls, monkeypatch, error_number):
+	monkeypatch.setattr(os, 'copy_file_range', unsupported(error_number), raising=False)
+	check_copy(source, str(tmp_path / 'destination.bin'))
+	assert calls[0] == 'sendfile' and set(calls) == {'sendfile'}
+
+
+@pytest.mark.parametrize('error_number', [errno.ENOSYS, errno.EXDEV])
+def test_copy_file_falls_back_to_reading(source, tmp_path, calls, monkeypatch, error_number):
+	monkeypatch.setattr(os, 'copy_file_range', unsupported(error_number), raising=False)
+	monkeypatch.setattr(os, 'sendfile', unsupported(error_number), raising=False)
+	check_copy(source, str(tmp_path / 'destination.bin'))
+	assert calls == []
+
+
+def test_copy_file_without_kernel_functions(source, tmp_path, monkeypatch):
+	monkeypatch.delattr(os, 'copy_file_range', raising=False)
+	monkeypatch.delattr(os, 'sendfile', raising=False)
+	check_copy(source, str(tmp_path / 'destination.bin'))
+
+
+@pytest.mark.skipif(not hasattr(os, 'sendfile'), reason='os.sendfile is missing')
+def test_copy_file_falls_back_when_nothing_is_copied(source, tmp_path, calls, monkeypatch):
+	# files in procfs and sysfs report no data to copy_file_range
+	monkeypatch.setattr(os, 'copy_file_range', lambda *args: 0, raising=False)
+	check_copy(source, str(tmp_path / 'destination.bin'))
+	assert 'sendfile' in calls
+
+
+def test_copy_file_raises_other_errors(source, tmp_path, monkeypatch):
+	monkeypatch.setattr(os, 'copy_file_range', unsupported(errno.EIO), raising=False)
+	with pytest.raises(OSError) as error:
+		copy_file(source=source, destination=str(tmp_path / 'destination.bin'))
+	assert error.value.errno == errno.EIO
+
+
+def test_copy_empty_file(tmp_path, calls):
+	(tmp_path / 'empty').write_bytes(b'')
+	assert copy_file(source=str(tmp_path / 'empty'), destination=str(tmp_path / 'copy')) == 0
+	assert (tmp_path / 'copy').read_bytes() == b''
+
+
+@pytest.mark.parametrize('num_workers', [1, 4])
+def test_copy_directory_report(tmp_path, monkeypatch, num_workers):
+	monkeypatch.chdir(tmp_path)
+	files = make_tree('tree')
+	report = copy_directory(path='tree', new_path='copy', num_workers=num_workers)
+
+	assert isinstance(report, CopyReport)
+	assert read_tree('copy') == read_tree('tree')
+	assert report.num_files == len(files)
+	assert report.num_directories == 3
+	assert report.size_bytes == sum(len(data) for data in files.values())
+	assert report.bytes_per_second > 0
+
+
+def test_path_copy(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	make_tree('tree')
+	Path('tree').copy(new_path='copy')
+	assert read_tree('copy') == read_tree('tree')
@@ -0,0 +1,125 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from disk import DirectoryIndex
+from disk import Path
+
+
+def write(path, data=b'data'):
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, 'wb') as file:
+		file.write(data)
+
+
+def names(paths):
+	return sorted(os.path.relpath(x.path, 'root').replace(os.sep, '/') for x in paths)
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+	write('root/report.csv', b'x' * 100)
+	write('root/a/foo/one.csv', b'x' * 10)
+	write('root/a/foo/two.pickle', b'x' * 20)
+	write('root/a/foobar/three.csv', b'x' * 30)
+	write('root/a/foo.txt', b'x' * 40)
+	return 'root'
+
+
+@pytest.fixture
+def index(root):
+	with DirectoryIndex(root=root).update() as result:
+		yield result
+
+
+def test_build(index, tmp_path):
+	assert index.path.startswith(str(tmp_path / 'cache' / 'disk' / 'indexes'))
+	assert index.count() == 5
+	assert index.count(files=False, directories=True) == 3
+	assert names(index.query(extension='csv')) == ['a/foo/one.csv', 'a/foobar/three.csv', 'report.csv']
+	assert names(index.query(extension=['.pickle', 'txt'])) == ['a/foo.txt', 'a/foo/two.pickle']
+	assert names(index.query(name='t*')) == ['a/foo/two.pickle', 'a/foobar/three.csv']
+	assert names(index.query(min_size_bytes=30, max_size_bytes=40)) == ['a/foo.txt', 'a/foobar/three.csv']
+	assert index.get_size_bytes() == 200
+	assert all(isinstance(x, Path) for x in index.query())
+
+
+def test_query_by_age(index, root):
+	os.utime(os.path.join(root, 'report.csv'), (time.time() - 3600, time.time() - 3600))
+	index.update(full=True)
+	assert names(index.query(min_age=60)) == ['report.csv']
+	assert 'report.csv' not in names(index.query(max_age=60))
+	assert names(index.query(modified_before=time.time() - 60)) == ['report.csv']
+
+
+def test_subtree_boundary(index, root):
+	foo = os.path.join(root, 'a', 'foo')
+	assert names(index.query(directory=foo)) == ['a/foo/one.csv', 'a/foo/two.pickle']
+	assert index.count(directory=foo) == 2
+	assert index.get_size_bytes(directory=Path(foo)) == 30
+	assert names(index.query(directory=os.path.join(root, 'a', 'foobar'))) == ['a/foobar/three.csv']
+	assert index.count(directory=root) == 5
+
+
+def test_refresh_after_add_modify_and_delete(index, root):
+	write(os.path.join(root, 'a', 'foo', 'new.csv'), b'x' * 5)
+	# a file replaced by another one changes the time of its directory
+	write(os.path.join(root, 'replacement'), b'x' * 1000)
+	os.replace(os.path.join(root, 'replacement'), os.path.join(root, 'report.csv'))
+	os.remove(os.path.join(root, 'a', 'foobar', 'three.csv'))
+	index.update()
+
+	assert names(index.query(extension='csv')) == ['a/foo/new.csv', 'a/foo/one.csv', 'report.csv']
+	assert names(index.query(min_size_bytes=1000)) == ['report.csv']
+
+
+def test_refresh_of_files_rewritten_in_place(index, root):
+	with open(os.path.join(root, 'a', 'foo.txt'), 'ab') as file:
+		file.write(b'x' * 60)
+	index.update(full=True)
+	assert names(index.query(min_size_bytes=100)) == ['a/foo.txt', 'report.csv']
+
+
+def test_refresh_after_a_directory_is_removed(index, root):
+	for name in ('one.csv', 'two.pickle'):
+		os.remove(os.path.join(root, 'a', 'foo', name))
+	os.rmdir(os.path.join(root, 'a', 'foo'))
+	index.update()
+
+	assert names(index.query(directories=True)) == [
+		'a', 'a/foo.txt', 'a/foobar', 'a/foobar/three.csv', 'report.csv'
+	]
+
+
+def test_index_inside_the_root_is_left_out(root):
+	path = os.path.join(root, 'index.sqlite')
+	with DirectoryIndex(root=root, path=path).update() as index:
+		assert index.count() == 5
+		index.update()
+		assert 'index.sqlite' not in names(index.query())
+
+
+def test_index_is_reopened(index, root):
+	index.close()
+	with DirectoryIndex(root=root) as reopened:
+		assert reopened.count() == 5
+		reopened.update()
+		assert reopened.count() == 5
+
+
+def test_index_is_shared_by_threads(index):
+	with ThreadPoolExecutor(max_workers=4) as executor:
+		counts = list(executor.map(lambda _: index.count(), range(20)))
+	assert counts == [5] * 20
+
+
+def test_path_build_index(root, tmp_path):
+	index = Path(root).build_index(path=str(tmp_path / 'tree.sqlite'))
+	assert index.count() == 5
+	index.close()
+	with pytest.raises(NotADirectoryError):
+		Path(os.path.join(root, 'report.csv')).build_index()
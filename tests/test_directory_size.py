@@ -0,0 +1,96 @@
+import importlib
+import os
+
+import pytest
+
+from disk import DirectorySizeCache
+from disk import Path
+
+from .test_zip import make_tree
+
+size_module = importlib.import_module('disk.directory_size')
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	files = make_tree('tree')
+	return sum(len(data) for data in files.values())
+
+
+@pytest.fixture
+def pools(monkeypatch):
+	"""
+	counts the thread pools that are started
+	"""
+	result = []
+	pool_class = size_module.ThreadPoolExecutor
+
+	def count(*args, **kwargs):
+		result.append(kwargs.get('max_workers'))
+		return pool_class(*args, **kwargs)
+
+	monkeypatch.setattr(size_module, 'ThreadPoolExecutor', count)
+	return result
+
+
+def test_small_trees_are_scanned_without_a_pool(tree, pools):
+	result = Path('tree').get_directory_size()
+	assert result.size_bytes == tree
+	assert result.num_files == 4
+	assert result.num_directories == 3
+	assert sorted(result.subdirectories) == ['b', 'f']
+	assert Path('tree').get_size_bytes() == tree
+	assert pools == []
+
+
+@pytest.mark.parametrize('num_workers', [None, 1, 4])
+def test_large_trees_and_num_workers(tree, pools, monkeypatch, num_workers):
+	# with a lower threshold, the few directories of the tree count as many
+	monkeypatch.setattr(size_module, '_SERIAL_DIRECTORIES', 1)
+	result = Path('tree').get_directory_size(num_workers=num_workers)
+	assert (result.size_bytes, result.num_files, result.num_directories) == (tree, 4, 3)
+	assert result.subdirectories['b'].subdirectories['d'].num_files == 1
+	assert len(pools) == (0 if num_workers == 1 else 1)
+
+
+def test_symbolic_links_are_followed_like_list(tree):
+	os.symlink(os.path.abspath(os.path.join('tree', 'b')), os.path.join('tree', 'f', 'link'))
+	f_size_bytes = sum(os.path.getsize(x.path) for x in Path(os.path.join('tree', 'f')).walk() if x.is_file())
+	assert Path(os.path.join('tree', 'f')).get_size_bytes() == f_size_bytes + 5000
+	assert Path('tree').get_size_bytes() == tree + 5000
+	assert Path('tree').get_directory_size(follow_symlinks=False).size_bytes == tree
+
+
+@pytest.mark.parametrize('num_workers', [None, 4])
+def test_symbolic_links_back_up_the_tree_are_left_out(tree, num_workers):
+	os.symlink(os.path.abspath('tree'), os.path.join('tree', 'b', 'd', 'loop'))
+	# two links that only make a loop together
+	os.symlink(os.path.abspath(os.path.join('tree', 'f')), os.path.join('tree', 'b', 'to_f'))
+	os.symlink(os.path.abspath(os.path.join('tree', 'b')), os.path.join('tree', 'f', 'to_b'))
+
+	result = Path('tree').get_directory_size(num_workers=num_workers)
+	# b is counted again under f and f under b, the links that lead back are not followed
+	assert result.size_bytes == 2 * tree - len(b'alpha' * 100)
+	assert 'loop' not in result.subdirectories['b'].subdirectories['d'].subdirectories
+
+
+def test_cache_and_errors(tree, monkeypatch):
+	cache = DirectorySizeCache()
+	Path('tree').get_directory_size(cache=cache)
+	assert len(cache) == 4
+
+	scan_directory = size_module._scan_directory
+
+	def fail_for_b(path, cache, follow_symlinks):
+		if os.path.basename(path) == 'b':
+			raise PermissionError(13, 'Permission denied', path)
+		return scan_directory(path=path, cache=cache, follow_symlinks=follow_symlinks)
+
+	monkeypatch.setattr(size_module, '_scan_directory', fail_for_b)
+	with pytest.raises(PermissionError):
+		Path('tree').get_directory_size()
+	errors = []
+	result = Path('tree').get_directory_size(on_error=errors.append)
+	assert len(errors) == 1
+	assert result.size_bytes == tree - 5000
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from disk import find_duplicates
+from disk import HashIndex
+from disk import Path
+
+
+def write(name, data):
+	os.makedirs(os.path.dirname(name) or '.', exist_ok=True)
+	with open(name, 'wb') as file:
+		file.write(data)
+
+
+def get_groups(groups):
+	return sorted(sorted(os.path.relpath(x.path) for x in group) for group in groups)
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	write('root/small_1.txt', b'small')
+	write('root/a/small_2.txt', b'small')
+	write('root/other.txt', b'SMALL')
+	write('root/empty_1.txt', b'')
+	write('root/empty_2.txt', b'')
+	# the same head and tail with a different middle, the partial hash cannot tell them apart
+	head, tail = b'h' * 100, b't' * 100
+	write('root/large_1.bin', head + b'x' * 1000 + tail)
+	write('root/b/large_2.bin', head + b'x' * 1000 + tail)
+	write('root/large_3.bin', head + b'y' * 1000 + tail)
+	return Path('root')
+
+
+@pytest.mark.parametrize('num_workers', [1, 4])
+def test_find_duplicates(directory, num_workers):
+	groups = directory.find_duplicates(partial_size_bytes=16, num_workers=num_workers)
+	assert get_groups(groups) == [
+		['root/a/small_2.txt', 'root/small_1.txt'],
+		['root/b/large_2.bin', 'root/large_1.bin']
+	]
+
+
+def test_find_duplicates_hashes_small_files_once(directory):
+	# with the default partial size every file here is read whole by the partial hash
+	assert len(list(directory.find_duplicates())) == 2
+
+
+def test_find_duplicates_min_size(directory):
+	groups = get_groups(directory.find_duplicates(partial_size_bytes=16, min_size_bytes=6))
+	assert groups == [['root/b/large_2.bin', 'root/large_1.bin']]
+
+	groups = get_groups(directory.find_duplicates(min_size_bytes=0))
+	assert ['root/empty_1.txt', 'root/empty_2.txt'] in groups
+
+
+def test_find_duplicates_skips_hard_links(directory):
+	os.link('root/other.txt', 'root/other_link.txt')
+	groups = get_groups(directory.find_duplicates())
+	assert not any('root/other.txt' in group for group in groups)
+
+
+def test_find_duplicates_across_directories(directory):
+	write('elsewhere/copy.txt', b'SMALL')
+	groups = get_groups(find_duplicates(directories=[directory, Path('elsewhere')]))
+	assert ['elsewhere/copy.txt', 'root/other.txt'] in groups
+
+
+def test_find_duplicates_with_an_index(directory):
+	index = HashIndex()
+	first = get_groups(directory.find_duplicates(partial_size_bytes=16, index=index))
+	assert len(index) == 3
+	assert get_groups(directory.find_duplicates(partial_size_bytes=16, index=index)) == first
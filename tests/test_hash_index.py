@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from disk import HashIndex
+from disk import Path
+from disk.fingerprint import DEFAULT_HASH_INDEX
+
+
+@pytest.fixture
+def files(tmp_path):
+	result = []
+	for index in range(5):
+		path = tmp_path / f'file_{index}.txt'
+		path.write_bytes(b'x' * index)
+		result.append(os.stat(str(path)))
+	return result
+
+
+def test_hash_index_get_and_set(files):
+	index = HashIndex()
+	index.set(stat_result=files[0], algorithm='sha256', digest='digest')
+	assert index.get(stat_result=files[0], algorithm='sha256') == 'digest'
+	assert index.get(stat_result=files[0], algorithm='md5') is None
+	assert index.get(stat_result=files[1], algorithm='sha256') is None
+
+
+def test_hash_index_forgets_the_least_recently_used(files):
+	index = HashIndex(max_size=3)
+	for stat_result in files[:3]:
+		index.set(stat_result=stat_result, algorithm='sha256', digest=str(stat_result.st_ino))
+	# reading the first one makes the second one the least recently used
+	assert index.get(stat_result=files[0], algorithm='sha256') is not None
+	index.set(stat_result=files[3], algorithm='sha256', digest='3')
+
+	assert len(index) == 3
+	assert index.get(stat_result=files[1], algorithm='sha256') is None
+	assert all(index.get(stat_result=x, algorithm='sha256') is not None for x in (files[0], files[2], files[3]))
+
+
+def test_hash_index_bound_applies_to_a_loaded_sidecar(files, tmp_path):
+	path = str(tmp_path / 'index.pickle')
+	index = HashIndex(path=path)
+	for stat_result in files:
+		index.set(stat_result=stat_result, algorithm='sha256', digest='digest')
+	index.close()
+
+	assert len(HashIndex(path=path)) == 5
+	assert len(HashIndex(path=path, max_size=2)) == 2
+
+
+def test_default_hash_index_is_bounded(tmp_path):
+	assert DEFAULT_HASH_INDEX.max_size is not None
+	(tmp_path / 'file.txt').write_bytes(b'content')
+	Path(str(tmp_path)).get_fingerprint()
+	assert len(DEFAULT_HASH_INDEX) <= DEFAULT_HASH_INDEX.max_size
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from disk import Path
+from disk import SyncManifest
+from disk.exceptions import DiskError
+
+from .test_archive import read_tree
+from .test_zip import make_tree
+
+
+@pytest.fixture
+def trees(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	make_tree('source')
+	make_tree('destination')
+	with open(os.path.join('destination', 'a.txt'), 'wb') as file:
+		file.write(b'stale')
+	with open(os.path.join('destination', 'extra.txt'), 'wb') as file:
+		file.write(b'not in source')
+	os.makedirs(os.path.join('destination', 'extra', 'nested'))
+	return Path('destination'), Path('source')
+
+
+def mimic(destination, source, **kwargs):
+	return destination.mimic(other=source, delete_method='permanent', echo=0, **kwargs)
+
+
+@pytest.mark.parametrize('method', ['content', 'stat', 'hash'])
+def test_mimic_makes_the_trees_the_same(trees, method):
+	destination, source = trees
+	mimic(destination, source, method=method, num_workers=3)
+	assert read_tree('destination') == read_tree('source')
+	assert not os.path.exists(os.path.join('destination', 'extra'))
+	assert destination.plan_mimic(other=source, method=method).is_empty()
+
+
+def test_mimic_into_a_new_directory(trees):
+	_, source = trees
+	mimic(Path('new'), source)
+	assert read_tree('new') == read_tree('source')
+
+
+def test_mimic_only_hash_reads_files_with_the_same_stat(trees):
+	destination, source = trees
+	# files that were already the same keep their own times unless they are copied
+	mimic(destination, source, method='stat')
+	source_path = os.path.join('source', 'a.txt')
+	destination_path = os.path.join('destination', 'a.txt')
+	stat_result = os.stat(destination_path)
+	with open(destination_path, 'wb') as file:
+		file.write(b'ALPHA' * 100)
+	os.utime(destination_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+	# like filecmp.cmp, the content method trusts matching size and modification time
+	assert destination.plan_mimic(other=source, method='stat').is_empty()
+	assert destination.plan_mimic(other=source, method='content').is_empty()
+	assert [x.source for x in destination.plan_mimic(other=source, method='hash').copies] == [source_path]
+
+
+def test_mimic_ignores_paths(trees):
+	destination, source = trees
+	mimic(destination, source, ignore_function=lambda x: x.name_and_extension == 'extra.txt')
+	assert os.path.exists(os.path.join('destination', 'extra.txt'))
+	assert not os.path.exists(os.path.join('destination', 'extra'))
+
+
+def test_mimic_refuses_nested_directories(trees):
+	_, source = trees
+	with pytest.raises(DiskError):
+		mimic(source / 'b', source)
+	with pytest.raises(DiskError):
+		mimic(Path('.'), source)
+
+
+@pytest.mark.parametrize('method', ['content', 'hash'])
+def test_mimic_manifest_skips_unchanged_files(trees, method):
+	destination, source = trees
+	mimic(destination, source, method=method, manifest='sync.manifest')
+	assert os.path.isfile('sync.manifest')
+
+	manifest = SyncManifest(path='sync.manifest')
+	assert len(manifest) == len(read_tree('source'))
+	assert destination.plan_mimic(other=source, method=method, manifest=manifest).is_empty()
+
+	with open(os.path.join('source', 'f', 'g.txt'), 'ab') as file:
+		file.write(b'more')
+	plan = destination.plan_mimic(other=source, method=method, manifest=manifest)
+	assert [x.relative_path for x in plan.copies] == [os.path.join('f', 'g.txt')]
+
+
+def test_mimic_manifest_inside_the_destination_is_kept(trees):
+	destination, source = trees
+	manifest_path = os.path.join('destination', 'sync.manifest')
+	mimic(destination, source, manifest=manifest_path)
+	assert os.path.isfile(manifest_path)
+	assert destination.plan_mimic(other=source, manifest=manifest_path).is_empty()
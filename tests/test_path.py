@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from disk import Path
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	os.makedirs(os.path.join('a', 'sub'))
+	return tmp_path
+
+
+def test_derived_attributes(directory):
+	path = Path(os.path.join('a', 'sub', 'file.txt'))
+	assert path.name_and_extension == 'file.txt'
+	assert path.name == 'file'
+	assert path.extension == 'txt'
+	assert path.parent_directory.path == os.path.join('a', 'sub') + os.sep
+	assert Path('file.txt').parent_directory.path == '.'
+	assert path.absolute_path == os.path.join(str(directory), 'a', 'sub', 'file.txt')
+
+
+def test_parent_directory_is_a_new_path_every_time(directory):
+	child = Path(os.path.join('a', 'sub'))
+	parent = child.parent_directory
+	assert parent is not child.parent_directory
+
+	parent.move_and_rename(new_path='c')
+	assert parent.path == os.path.join(str(directory), 'c')
+	# the child still has its own path, so its parent is still a
+	assert child.path == os.path.join('a', 'sub')
+	assert child.parent_directory.path == 'a' + os.sep
+
+
+def test_rename_changes_the_derived_attributes(directory):
+	path = Path(os.path.join('a', 'sub'))
+	assert path.parent_directory.name == 'a'
+	path.move(new_directory='b')
+	assert path.name == 'sub'
+	assert path.parent_directory.absolute_path == os.path.join(str(directory), 'b')
+	assert path.exists()
+
+
+def test_equality_does_not_touch_the_file_system(directory):
+	assert Path('missing.txt') == Path(os.path.join(str(directory), 'missing.txt'))
+	assert Path(os.path.join('a', '..', 'a', 'sub')) == Path(os.path.join('a', 'sub'))
+	assert Path('a') != Path('b')
+	assert Path('a') != 'a'
+	assert len({Path('a'), Path('./a'), Path(os.path.join(str(directory), 'a'))}) == 1
+
+
+def test_renaming_a_path_changes_its_hash(directory):
+	with open('x.txt', 'w') as file:
+		file.write('x')
+	path = Path('x.txt')
+	paths = {path}
+	path.rename('z.txt')
+	# documented on Path.__hash__: a Path is not renamed while it is kept in a set
+	assert path not in paths
+	assert Path('z.txt') == path
+
+
+@pytest.fixture
+def two_trees(directory):
+	for root in ('one', 'two'):
+		os.makedirs(os.path.join(root, 'shared'))
+		with open(os.path.join(root, 'shared', 'file.txt'), 'w') as file:
+			file.write(root)
+	os.makedirs(os.path.join('one', 'only_one'))
+	with open(os.path.join('two', 'only_two.txt'), 'w') as file:
+		file.write('two')
+	return Path('one'), Path('two')
+
+
+def test_tree_set_algebra(two_trees):
+	one, two = two_trees
+	assert one.difference(two) == {one / 'only_one'}
+	assert one.intersection(two) == {one / 'shared', one / 'shared' / 'file.txt'}
+	assert one.intersection(two, directories=False) == {one / 'shared' / 'file.txt'}
+	assert one.symmetric_difference(two) == {one / 'only_one', two / 'only_two.txt'}
+	assert all(isinstance(x, Path) for x in one.symmetric_difference(two))
+	assert (one / 'shared' / 'file.txt').get_relative_path(directory=one) == os.path.join('shared', 'file.txt')
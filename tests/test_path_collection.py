@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from disk import BatchResult
+from disk import Path
+from disk import PathCollection
+
+from .test_archive import read_tree
+from .test_zip import make_tree
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	return make_tree('tree')
+
+
+@pytest.fixture
+def collection(tree):
+	# a small chunk size spreads the paths over several threads
+	return PathCollection(paths=sorted(tree) + ['tree/missing.txt'], num_workers=3, chunk_size=2)
+
+
+def test_collection(collection):
+	assert len(collection) == 5
+	assert all(isinstance(x, Path) for x in collection)
+	assert isinstance(collection[1:3], PathCollection)
+	assert len(collection[1:3]) == 2
+	assert collection[0] == Path('tree/a.txt')
+
+
+def test_exists(collection):
+	result = collection.exists()
+	assert isinstance(result, BatchResult)
+	assert [exists for _, exists in result.results] == [True, True, True, True, False]
+	assert result.total == 4
+	assert result.is_successful()
+
+
+def test_stat_and_size(collection, tree):
+	result = collection.stat()
+	assert result.failed == [Path('tree/missing.txt')]
+	assert isinstance(result.errors[0][1], FileNotFoundError)
+	assert result.total == sum(len(data) for data in tree.values())
+	assert not result.is_successful()
+	with pytest.raises(FileNotFoundError):
+		result.raise_errors()
+
+	result = PathCollection(paths=['tree', 'tree/b', 'tree/a.txt']).get_size_bytes()
+	assert [size_bytes for _, size_bytes in result.results] == [
+		sum(len(data) for data in tree.values()), 5000, 500
+	]
+	assert result.total == sum(len(data) for data in tree.values()) + 5500
+
+
+def test_duplicate_paths_are_kept(tree):
+	result = PathCollection(paths=['tree/a.txt', 'tree/b/c.bin', 'tree/a.txt', './tree/a.txt']).get_size_bytes()
+	assert len(result) == 4
+	assert result.succeeded == [Path('tree/a.txt'), Path('tree/b/c.bin'), Path('tree/a.txt'), Path('tree/a.txt')]
+	assert result.total == 3 * 500 + 5000
+
+
+def test_total_of_results_that_are_not_numbers(tree):
+	result = PathCollection(paths=['tree/a.txt']).copy(new_directory='copy')
+	assert result.total is None
+	assert len(PathCollection(paths=[]).exists()) == 0
+	assert PathCollection(paths=[]).exists().total == 0
+
+
+def test_copy_move_and_delete(tree):
+	paths = ['tree/a.txt', 'tree/f']
+	copies = PathCollection(paths=paths).copy(new_directory='copy')
+	assert copies.is_successful()
+	assert [x.path for _, x in copies.results] == [os.path.join('copy', 'a.txt'), os.path.join('copy', 'f')]
+	assert read_tree('copy') == {'a.txt': tree['tree/a.txt'], 'f/g.txt': tree['tree/f/g.txt']}
+
+	moved = PathCollection(paths=['copy/a.txt', 'copy/missing.txt']).move(new_directory='moved')
+	assert moved.failed == [Path('copy/missing.txt')]
+	assert os.listdir('moved') == ['a.txt']
+	assert not os.path.exists(os.path.join('copy', 'a.txt'))
+
+	deleted = PathCollection(paths=['moved/a.txt', 'copy']).delete(method='permanent')
+	assert deleted.is_successful()
+	assert len(deleted) == 2
+	assert os.listdir('moved') == []
+	assert not os.path.exists('copy')
@@ -0,0 +1,109 @@
+import pytest
+
+from disk import Path
+from disk.individual_functions import read_last_lines
+
+
+@pytest.fixture
+def directory(tmp_path):
+	return Path(str(tmp_path))
+
+
+def write(path, data):
+	with open(path.path, 'wb') as file:
+		file.write(data)
+	return path
+
+
+def test_read_bytes(directory):
+	write(directory / 'data.bin', b'\x00\x01binary\r\n')
+	assert directory.read_bytes(name='data.bin') == b'\x00\x01binary\r\n'
+	assert (directory / 'data.bin').read_bytes() == b'\x00\x01binary\r\n'
+	with pytest.warns(UserWarning), pytest.raises(FileNotFoundError):
+		directory.read_bytes(name='missing.bin')
+
+
+def test_mmap(directory):
+	path = write(directory / 'data.bin', b'header:payload')
+	with path.mmap() as mapped:
+		assert mapped[:6] == b'header'
+		assert mapped.find(b':') == 6
+		with pytest.raises(TypeError):
+			mapped[0:1] = b'H'
+
+	with path.mmap(write=True) as mapped:
+		mapped[0:1] = b'H'
+	assert path.read_bytes() == b'Header:payload'
+
+
+def test_mmap_of_an_empty_file(directory):
+	path = write(directory / 'empty.bin', b'')
+	with pytest.warns(UserWarning), pytest.raises(ValueError):
+		path.mmap()
+	assert directory.memoryview(name='empty.bin').tobytes() == b''
+
+
+def test_memoryview(directory):
+	path = write(directory / 'data.bin', b'0123456789')
+	view = path.memoryview()
+	assert view.readonly
+	part = view[2:5]
+	assert bytes(part) == b'234'
+	del view
+	# a slice keeps the file mapped on its own
+	assert bytes(part) == b'234'
+	part.release()
+
+
+@pytest.mark.parametrize('block_size', [3, 2 ** 16])
+@pytest.mark.parametrize('data, n, expected', [
+	(b'one\ntwo\nthree\n', 2, ['two\n', 'three\n']),
+	# without a trailing newline, the last line is still a line
+	(b'one\ntwo\nthree', 2, ['two\n', 'three']),
+	(b'one\ntwo\nthree', 1, ['three']),
+	# more lines than the file has
+	(b'one\ntwo\n', 10, ['one\n', 'two\n']),
+	(b'one', 5, ['one']),
+	(b'', 3, []),
+	(b'\n\n', 1, ['\n']),
+	(b'one\r\ntwo\r\n', 1, ['two\n']),
+	('ünï\ncödé\n'.encode('utf8'), 1, ['cödé\n']),
+	(b'one\ntwo\n', 0, []),
+])
+def test_tail(directory, block_size, data, n, expected):
+	path = write(directory / 'lines.txt', data)
+	assert read_last_lines(path=path.path, num_lines=n, block_size=block_size) == expected
+	assert path.tail(n=n) == expected
+	if n > 0:
+		with open(path.path, encoding='utf8') as file:
+			assert file.readlines()[-n:] == expected
+
+
+def test_tail_of_a_missing_file(directory):
+	with pytest.warns(UserWarning), pytest.raises(FileNotFoundError):
+		directory.tail(name='missing.txt')
+
+
+@pytest.mark.parametrize('data', [b'', b'one', b'one\ntwo', b'one\ntwo\n', b'one\r\ntwo\r\n'])
+def test_iter_lines(directory, data):
+	path = write(directory / 'lines.txt', data)
+	# a buffer smaller than a line does not split it
+	assert list(path.iter_lines(buffer_size=2)) == path.read_lines()
+	assert list(directory.iter_lines(name='lines.txt')) == path.read_lines()
+
+
+def test_iter_lines_reads_lazily(directory):
+	path = write(directory / 'lines.txt', b'one\ntwo\n')
+	lines = path.iter_lines()
+	assert next(lines) == 'one\n'
+	lines.close()
+
+
+@pytest.mark.parametrize('size', [1, 3, 4, 100])
+def test_iter_chunks(directory, size):
+	path = write(directory / 'data.bin', b'0123456789')
+	chunks = list(path.iter_chunks(size=size))
+	assert b''.join(chunks) == b'0123456789'
+	assert all(len(chunk) == size for chunk in chunks[:-1])
+	assert 0 < len(chunks[-1]) <= size
+	assert list(write(directory / 'empty.bin', b'').iter_chunks()) == []
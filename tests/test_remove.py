@@ -0,0 +1,167 @@
+import importlib
+import os
+
+import pytest
+
+from disk import delete
+from disk import get_delete_method
+from disk import Path
+from disk import set_delete_method
+from disk.remove import remove_permanently
+
+individual_functions = importlib.import_module('disk.individual_functions')
+remove_module = importlib.import_module('disk.remove')
+
+
+def write(path, data=b'data'):
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, 'wb') as file:
+		file.write(data)
+
+
+@pytest.fixture
+def trash(tmp_path, monkeypatch):
+	"""
+	send2trash is replaced by a move into a directory of tmp_path so the trash of the user is left alone
+	"""
+	trash_path = tmp_path / 'trash'
+	trash_path.mkdir()
+
+	def send2trash(path):
+		os.rename(path, str(trash_path / os.path.basename(path)))
+
+	monkeypatch.setattr(individual_functions, 'send2trash', send2trash)
+	# the global policy is restored after each test
+	monkeypatch.setattr(individual_functions, '_delete_method', individual_functions._delete_method)
+	return trash_path
+
+
+def test_remove_a_single_file(tmp_path):
+	path = str(tmp_path / 'file.txt')
+	write(path)
+	remove_permanently(path)
+	assert not os.path.exists(path)
+	assert os.listdir(str(tmp_path)) == []
+
+
+@pytest.mark.parametrize('num_workers', [1, 4])
+def test_remove_a_deep_tree(tmp_path, monkeypatch, num_workers):
+	# small chunks make a directory with a few files use several tasks
+	monkeypatch.setattr(remove_module, '_CHUNK_SIZE', 3)
+	root = tmp_path / 'root'
+	directory = root
+	for depth in range(30):
+		directory = directory / f'level_{depth}'
+		for index in range(depth % 5):
+			write(str(directory / f'file_{index}.txt'))
+	for index in range(50):
+		write(str(root / 'wide' / f'file_{index}.txt'))
+
+	remove_permanently(str(root), num_workers=num_workers)
+	assert os.listdir(str(tmp_path)) == []
+
+
+def test_remove_empty_directories(tmp_path):
+	root = tmp_path / 'root'
+	(root / 'a' / 'b' / 'c').mkdir(parents=True)
+	(root / 'd').mkdir()
+	remove_permanently(str(root))
+	assert not root.exists()
+
+	(tmp_path / 'empty').mkdir()
+	remove_permanently(str(tmp_path / 'empty'))
+	assert os.listdir(str(tmp_path)) == []
+
+
+def test_remove_keeps_the_targets_of_symlinks(tmp_path):
+	outside = tmp_path / 'outside'
+	write(str(outside / 'kept.txt'), b'kept')
+	root = tmp_path / 'root'
+	write(str(root / 'file.txt'))
+	os.symlink(str(outside), str(root / 'link_to_directory'))
+	os.symlink(str(outside / 'kept.txt'), str(root / 'link_to_file'))
+
+	remove_permanently(str(root))
+	assert not root.exists()
+	assert (outside / 'kept.txt').read_bytes() == b'kept'
+
+	# a link given directly is removed, not what it points to
+	os.symlink(str(outside), str(tmp_path / 'link'))
+	remove_permanently(str(tmp_path / 'link'))
+	assert not os.path.lexists(str(tmp_path / 'link'))
+	assert (outside / 'kept.txt').exists()
+
+
+def test_remove_raises_permission_errors(tmp_path, monkeypatch):
+	root = tmp_path / 'root'
+	for index in range(10):
+		write(str(root / 'a' / f'file_{index}.txt'))
+	write(str(root / 'b' / 'protected.txt'))
+	unlink = os.unlink
+
+	def fail_for_protected(path):
+		if os.path.basename(path) == 'protected.txt':
+			raise PermissionError(13, 'Permission denied', path)
+		unlink(path)
+
+	monkeypatch.setattr(os, 'unlink', fail_for_protected)
+	with pytest.raises(PermissionError):
+		remove_permanently(str(root), num_workers=4)
+	assert (root / 'b' / 'protected.txt').exists()
+
+
+@pytest.mark.skipif(not hasattr(os, 'geteuid') or os.geteuid() == 0, reason='root can remove anything')
+def test_remove_raises_for_read_only_directories(tmp_path):
+	root = tmp_path / 'root'
+	write(str(root / 'locked' / 'file.txt'))
+	os.chmod(str(root / 'locked'), 0o500)
+	try:
+		with pytest.raises(PermissionError):
+			remove_permanently(str(root))
+		assert (root / 'locked' / 'file.txt').exists()
+	finally:
+		os.chmod(str(root / 'locked'), 0o700)
+
+
+def test_delete_permanently(tmp_path, trash):
+	write(str(tmp_path / 'root' / 'a' / 'file.txt'))
+	delete(str(tmp_path / 'root'), method='permanent', num_workers=2)
+	assert not (tmp_path / 'root').exists()
+	assert os.listdir(str(trash)) == []
+
+
+def test_delete_to_trash(tmp_path, trash):
+	write(str(tmp_path / 'root' / 'file.txt'), b'recoverable')
+	delete(str(tmp_path / 'root'), method='trash')
+	assert not (tmp_path / 'root').exists()
+	assert (trash / 'root' / 'file.txt').read_bytes() == b'recoverable'
+
+
+def test_delete_uses_the_delete_method(tmp_path, trash):
+	assert get_delete_method() == 'trash'
+	write(str(tmp_path / 'first.txt'))
+	Path(str(tmp_path / 'first.txt')).delete()
+	assert os.listdir(str(trash)) == ['first.txt']
+
+	set_delete_method('permanent')
+	assert get_delete_method() == 'permanent'
+	write(str(tmp_path / 'second.txt'))
+	Path(str(tmp_path / 'second.txt')).delete()
+	assert not (tmp_path / 'second.txt').exists()
+	assert os.listdir(str(trash)) == ['first.txt']
+
+
+def test_delete_rejects_unknown_methods(tmp_path, trash):
+	write(str(tmp_path / 'file.txt'))
+	with pytest.raises(ValueError):
+		delete(str(tmp_path / 'file.txt'), method='shred')
+	with pytest.raises(ValueError):
+		set_delete_method('shred')
+	assert get_delete_method() == 'trash'
+	assert (tmp_path / 'file.txt').exists()
+
+
+def test_delete_a_missing_path(tmp_path, trash):
+	for method in individual_functions.DELETE_METHODS:
+		with pytest.raises(FileNotFoundError):
+			delete(str(tmp_path / 'missing'), method=method)
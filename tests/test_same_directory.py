@@ -0,0 +1,96 @@
+import importlib
+import os
+import shutil
+
+import pytest
+
+from disk import HashIndex
+from disk import Path
+
+from .test_zip import make_tree
+
+fingerprint_module = importlib.import_module('disk.fingerprint')
+
+
+@pytest.fixture
+def reads(monkeypatch):
+	"""
+	records every file whose content is hashed
+	"""
+	result = []
+	get_content_hash = fingerprint_module.get_content_hash
+
+	def counting_get_content_hash(path, **kwargs):
+		result.append(os.path.basename(path))
+		return get_content_hash(path=path, **kwargs)
+
+	monkeypatch.setattr(fingerprint_module, 'get_content_hash', counting_get_content_hash)
+	return result
+
+
+@pytest.fixture
+def trees(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	make_tree('one')
+	# copytree keeps the modification times, like a synced copy
+	shutil.copytree('one', 'two')
+	return Path('one'), Path('two')
+
+
+def touch(path, data=None):
+	stat_result = os.stat(path)
+	if data is not None:
+		with open(path, 'wb') as file:
+			file.write(data)
+	os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10 ** 9))
+
+
+def test_identical_trees_are_not_read(trees, reads):
+	one, two = trees
+	assert one.is_the_same_directory(two, index=HashIndex())
+	assert reads == []
+
+
+def test_files_with_other_times_are_read_once(trees, reads):
+	one, two = trees
+	touch(os.path.join('two', 'f', 'g.txt'))
+	index = HashIndex()
+
+	assert one.is_the_same_directory(two, index=index)
+	assert sorted(reads) == ['g.txt', 'g.txt']
+	assert one.is_the_same_directory(two, index=index)
+	assert len(reads) == 2
+
+
+def test_different_trees(trees, reads):
+	one, two = trees
+	touch(os.path.join('two', 'a.txt'), data=b'ALPHA' * 100)
+	assert not one.is_the_same_directory(two, index=HashIndex())
+	assert sorted(reads) == ['a.txt', 'a.txt']
+
+
+def test_different_listings_are_found_without_reading(trees, reads):
+	one, two = trees
+	with open(os.path.join('two', 'b', 'new.txt'), 'w') as file:
+		file.write('new')
+	assert not one.is_the_same_directory(two)
+
+	os.remove(os.path.join('two', 'b', 'new.txt'))
+	with open(os.path.join('two', 'b', 'c.bin'), 'ab') as file:
+		file.write(b'longer')
+	assert not one.is_the_same_directory(two)
+	assert reads == []
+
+
+def test_content_comparison_reads_every_file(trees, reads):
+	one, two = trees
+	path = os.path.join('two', 'a.txt')
+	stat_result = os.stat(path)
+	with open(path, 'wb') as file:
+		file.write(b'ALPHA' * 100)
+	os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+	# like filecmp.cmp, the same size and time are trusted unless the content is asked for
+	assert one.is_the_same_directory(two, index=HashIndex())
+	assert not one.is_the_same_directory(two, content=True, index=HashIndex())
+	assert 'a.txt' in reads
@@ -0,0 +1,114 @@
+import importlib
+import os
+
+import pytest
+
+from disk import ChangeEvent
+from disk import Path
+from disk import StatSnapshot
+
+snapshot_module = importlib.import_module('disk.StatSnapshot')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+	"""
+	a clock that only moves when the test moves it
+	"""
+	now = [1000.0]
+	monkeypatch.setattr(snapshot_module, 'monotonic', lambda: now[0])
+	return now
+
+
+@pytest.fixture
+def file(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	with open('file.txt', 'wb') as opened:
+		opened.write(b'12345')
+	return 'file.txt'
+
+
+def append(path, data):
+	with open(path, 'ab') as opened:
+		opened.write(data)
+
+
+def test_snapshot_expires_after_its_ttl(file, clock):
+	snapshot = StatSnapshot(path=file, ttl=10)
+	assert snapshot.size_bytes == 5
+	assert snapshot.is_file and not snapshot.is_directory
+	assert snapshot.type == 'file'
+	assert snapshot.age == 0
+
+	clock[0] += 9.9
+	assert not snapshot.is_expired()
+	clock[0] += 0.1
+	assert snapshot.is_expired()
+
+	append(file, b'678')
+	assert snapshot.size_bytes == 5
+	assert snapshot.refresh() is snapshot
+	assert snapshot.size_bytes == 8
+	assert not snapshot.is_expired()
+
+
+def test_snapshot_without_ttl_never_expires(file, clock):
+	snapshot = StatSnapshot(path=file)
+	clock[0] += 10 ** 6
+	assert not snapshot.is_expired()
+
+	snapshot.expire()
+	assert snapshot.is_expired()
+	assert snapshot.age == float('inf')
+	snapshot.ttl = 5
+	assert snapshot.ttl == 5
+
+
+def test_snapshot_of_a_missing_path(tmp_path):
+	snapshot = StatSnapshot(path=str(tmp_path / 'missing'))
+	assert not snapshot.exists
+	assert snapshot.type == 'nonexistent path'
+	with pytest.raises(FileNotFoundError):
+		snapshot.size_bytes
+
+
+def test_path_serves_metadata_until_the_ttl(file, clock):
+	path = Path(file)
+	snapshot = path.stat(ttl=5)
+	assert path.stat() is snapshot
+	append(file, b'678')
+	assert path.size_bytes == 5
+
+	clock[0] += 5
+	# the snapshot is refreshed the next time it is used
+	assert path.size_bytes == 8
+
+	append(file, b'9')
+	assert path.size_bytes == 8
+	assert path.stat(refresh=True).size_bytes == 9
+	# a new ttl applies to the snapshot that is already there
+	path.stat(ttl=1)
+	append(file, b'0')
+	clock[0] += 1
+	assert path.size_bytes == 10
+
+
+def test_path_snapshot_of_a_deleted_file(file, clock):
+	path = Path(file)
+	path.stat(ttl=5)
+	os.remove(file)
+	assert path.exists()
+
+	clock[0] += 5
+	assert not path.exists()
+	assert path.type == 'nonexistent path'
+	with pytest.raises(ValueError):
+		path.is_file()
+
+
+def test_snapshot_expires_on_change(file, clock):
+	snapshot = StatSnapshot(path=file)
+	snapshot.on_change(ChangeEvent(kind=ChangeEvent.MODIFIED, path=os.path.abspath('other.txt')))
+	assert not snapshot.is_expired()
+	snapshot.on_change(ChangeEvent(kind=ChangeEvent.MODIFIED, path=os.path.abspath(file)))
+	assert snapshot.is_expired()
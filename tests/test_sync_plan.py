@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from disk import Path
+from disk import SyncManifest
+from disk import SyncPlan
+from disk.exceptions import DiskError
+
+from .test_archive import read_tree
+from .test_mimic import trees  # noqa: F401 the fixture is shared
+
+
+def test_plan_mimic_changes_nothing(trees):
+	destination, source = trees
+	before = read_tree('destination')
+	manifest = SyncManifest(path='sync.manifest')
+
+	plan = destination.plan_mimic(other=source, manifest=manifest)
+
+	assert isinstance(plan, SyncPlan)
+	assert read_tree('destination') == before
+	assert os.path.isdir(os.path.join('destination', 'extra', 'nested'))
+	assert len(manifest) == 0
+	assert not os.path.exists('sync.manifest')
+
+
+def test_plan_mimic_lists_the_operations(trees):
+	destination, source = trees
+	plan = destination.plan_mimic(other=source)
+
+	assert sorted(x.relative_path for x in plan.deletions) == ['extra', 'extra.txt']
+	assert plan.new_directories == []
+	copied = sorted(x.relative_path for x in plan.copies)
+	# c.bin is random so it differs between the two trees
+	assert copied == ['a.txt', os.path.join('b', 'c.bin')]
+	assert plan.size_bytes == sum(os.path.getsize(x.source) for x in plan.copies)
+	assert len(plan) == len(plan.operations) == 4
+
+
+def test_plan_mimic_of_a_new_directory(trees):
+	_, source = trees
+	plan = Path('new').plan_mimic(other=source)
+	assert [x.relative_path for x in plan.new_directories] == ['', 'b', os.path.join('b', 'd'), 'f']
+	assert plan.deletions == []
+	assert len(plan.copies) == len(read_tree('source'))
+	assert not os.path.exists('new')
+
+
+def test_sync_plan_execute(trees):
+	destination, source = trees
+	plan = destination.plan_mimic(other=source)
+	report = plan.execute(num_workers=2, delete_method='permanent', echo=0)
+
+	assert read_tree('destination') == read_tree('source')
+	assert not os.path.exists(os.path.join('destination', 'extra'))
+	assert report.size_bytes == plan.size_bytes
+	assert destination.plan_mimic(other=source).is_empty()
+
+
+def test_sync_plan_execute_records_the_manifest(trees):
+	destination, source = trees
+	manifest = SyncManifest(path='sync.manifest')
+	plan = destination.plan_mimic(other=source, manifest=manifest)
+	plan.execute(delete_method='permanent', echo=0)
+
+	# copied files and the files that were already the same are both recorded
+	assert len(manifest) == len(read_tree('source'))
+	assert len(SyncManifest(path='sync.manifest')) == len(manifest)
+
+
+def test_sync_plan_execute_fails_for_a_removed_source(trees):
+	destination, source = trees
+	plan = destination.plan_mimic(other=source)
+	os.remove(os.path.join('source', 'a.txt'))
+	with pytest.raises(FileNotFoundError):
+		plan.execute(delete_method='permanent', echo=0)
+
+
+def test_plan_mimic_of_a_sibling_with_a_longer_name(trees):
+	_, source = trees
+	# "source_copy" starts with "source" but is not inside it
+	plan = Path('source_copy').plan_mimic(other=source)
+	assert len(plan.copies) == len(read_tree('source'))
+	assert all(x.source_stat is not None for x in plan.copies)
+	plan.execute(echo=0)
+	assert read_tree('source_copy') == read_tree('source')
+
+
+def test_plan_mimic_rejects_nested_directories(trees):
+	_, source = trees
+	with pytest.raises(DiskError):
+		Path(os.path.join('source', 'inner')).plan_mimic(other=source)
+	with pytest.raises(DiskError):
+		source.plan_mimic(other=Path(os.path.join('source', 'b')))
@@ -0,0 +1,72 @@
+import os
+import zipfile
+
+import pytest
+
+from disk import Path
+from disk import unzip
+from disk import zip_directory
+
+
+@pytest.fixture
+def zip_path(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	for index in range(40):
+		path = os.path.join('tree', f'directory_{index % 4}', f'file_{index}.txt')
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		with open(path, 'w') as file:
+			file.write(f'{index}\n' * (index + 1))
+	zip_directory(path='tree', zip_path='tree.zip')
+	return 'tree.zip'
+
+
+def read_tree(root):
+	result = {}
+	for directory, _, files in os.walk(root):
+		for name in files:
+			path = os.path.join(directory, name)
+			with open(path) as file:
+				result[os.path.relpath(path, root)] = file.read()
+	return result
+
+
+@pytest.mark.parametrize('num_workers', [1, 4])
+def test_unzip_extracts_everything(zip_path, num_workers):
+	unzip(path=zip_path, unzip_path='out', num_workers=num_workers)
+	assert read_tree(os.path.join('out', 'tree')) == read_tree('tree')
+
+
+def test_unzip_extracts_a_list_of_members(zip_path):
+	unzip(path=zip_path, unzip_path='out', members=['tree/directory_1/file_1.txt', 'tree/directory_2/file_6.txt'])
+	assert sorted(read_tree('out')) == [
+		os.path.join('tree', 'directory_1', 'file_1.txt'), os.path.join('tree', 'directory_2', 'file_6.txt')
+	]
+
+
+def test_unzip_extracts_the_members_a_function_selects(zip_path):
+	unzip(path=zip_path, unzip_path='out', members=lambda name: '/directory_3/' in name)
+	extracted = read_tree('out')
+	assert len(extracted) == 10
+	assert all(name.startswith(os.path.join('tree', 'directory_3')) for name in extracted)
+
+
+def test_unzip_rejects_an_unknown_member(zip_path):
+	with pytest.raises(KeyError):
+		unzip(path=zip_path, unzip_path='out', members=['tree/missing.txt'])
+
+
+def test_unzip_keeps_members_inside_the_directory(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	with zipfile.ZipFile('evil.zip', 'w') as archive:
+		archive.writestr('../outside.txt', 'x')
+		archive.writestr('/absolute.txt', 'y')
+	unzip(path='evil.zip', unzip_path='out')
+	assert not os.path.exists('outside.txt')
+	assert read_tree('out') == {'outside.txt': 'x', 'absolute.txt': 'y'}
+
+
+def test_path_unzip(zip_path):
+	result = Path(zip_path).unzip(unzip_path='out', num_workers=2)
+	# the archive is named after the zipped directory, which is where its members are
+	assert result == Path(os.path.join('out', 'tree'))
+	assert read_tree(result.path) == read_tree('tree')
@@ -0,0 +1,136 @@
+import importlib
+import os
+import zipfile
+
+import pytest
+
+from disk import update_zip
+from disk import zip_directory
+
+from .test_zip import COMPRESSIONS
+from .test_zip import make_tree
+from .test_zip import read_members
+
+zip_module = importlib.import_module('disk.zip')
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	return make_tree('tree')
+
+
+def write(name, data):
+	os.makedirs(os.path.dirname(name), exist_ok=True)
+	with open(name, 'wb') as file:
+		file.write(data)
+
+
+def get_offsets(zip_path):
+	with zipfile.ZipFile(zip_path) as archive:
+		return {info.filename: info.header_offset for info in archive.infolist()}
+
+
+def test_update_zip_creates_a_missing_archive(tree):
+	update_zip(path='tree', zip_path='tree.zip')
+	assert read_members('tree.zip') == tree
+
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_update_zip_appends_new_files(tree, compression):
+	zip_directory(path='tree', zip_path='tree.zip', compression=compression)
+	offsets = get_offsets('tree.zip')
+	inode = os.stat('tree.zip').st_ino
+
+	write('tree/h/i.txt', b'new file' * 50)
+	update_zip(path='tree', zip_path='tree.zip', compression=compression)
+
+	assert os.stat('tree.zip').st_ino == inode
+	new_offsets = get_offsets('tree.zip')
+	assert {name: new_offsets[name] for name in offsets} == offsets
+	assert read_members('tree.zip') == {**tree, 'tree/h/i.txt': b'new file' * 50}
+
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_update_zip_rewrites_changed_files(tree, compression):
+	zip_directory(path='tree', zip_path='tree.zip', compression=compression)
+	inode = os.stat('tree.zip').st_ino
+
+	write('tree/a.txt', b'changed')
+	update_zip(path='tree', zip_path='tree.zip', compression=compression)
+
+	assert os.stat('tree.zip').st_ino != inode
+	# the archive was rewritten in a temporary file next to it, which is gone
+	assert sorted(os.listdir('.')) == ['tree', 'tree.zip']
+	assert read_members('tree.zip') == {**tree, 'tree/a.txt': b'changed'}
+	with zipfile.ZipFile('tree.zip') as archive:
+		assert all(info.compress_type == compression for info in archive.infolist())
+
+
+def test_update_zip_rewrite_leaves_other_files_and_permissions_alone(tree):
+	zip_directory(path='tree', zip_path='tree.zip')
+	os.chmod('tree.zip', 0o644)
+	# a file named the way the temporary file could have been named
+	write('./tree.zip.tmp', b'not a temporary file')
+
+	write('tree/a.txt', b'changed')
+	update_zip(path='tree', zip_path='tree.zip')
+
+	assert read_members('tree.zip') == {**tree, 'tree/a.txt': b'changed'}
+	assert os.stat('tree.zip').st_mode & 0o777 == 0o644
+	with open('tree.zip.tmp', 'rb') as file:
+		assert file.read() == b'not a temporary file'
+
+
+def test_update_zip_removes_the_temporary_file_on_failure(tree, monkeypatch):
+	zip_directory(path='tree', zip_path='tree.zip')
+	with open('tree.zip', 'rb') as file:
+		before = file.read()
+
+	def fail(path, compression, compression_level):
+		raise OSError(f'cannot read {path}')
+
+	monkeypatch.setattr(zip_module, '_compress', fail)
+	write('tree/a.txt', b'changed')
+	with pytest.raises(OSError):
+		update_zip(path='tree', zip_path='tree.zip')
+
+	with open('tree.zip', 'rb') as file:
+		assert file.read() == before
+	assert sorted(os.listdir('.')) == ['tree', 'tree.zip']
+
+
+def test_update_zip_keeps_deleted_files_unless_asked(tree):
+	zip_directory(path='tree', zip_path='tree.zip')
+	os.remove('tree/f/g.txt')
+
+	update_zip(path='tree', zip_path='tree.zip')
+	assert read_members('tree.zip') == tree
+
+	update_zip(path='tree', zip_path='tree.zip', remove_deleted=True)
+	expected = dict(tree)
+	del expected['tree/f/g.txt']
+	assert read_members('tree.zip') == expected
+
+
+def test_update_zip_leaves_an_unchanged_archive_alone(tree):
+	zip_directory(path='tree', zip_path='tree.zip')
+	stat_result = os.stat('tree.zip')
+
+	update_zip(path='tree', zip_path='tree.zip', check_crc=True)
+
+	new_stat_result = os.stat('tree.zip')
+	assert (new_stat_result.st_ino, new_stat_result.st_mtime_ns) == (stat_result.st_ino, stat_result.st_mtime_ns)
+
+
+def test_update_zip_check_crc_finds_same_size_changes(tree):
+	zip_directory(path='tree', zip_path='tree.zip')
+	stat_result = os.stat('tree/a.txt')
+	write('tree/a.txt', b'ALPHA' * 100)
+	os.utime('tree/a.txt', ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+	update_zip(path='tree', zip_path='tree.zip')
+	assert read_members('tree.zip') == tree
+
+	update_zip(path='tree', zip_path='tree.zip', check_crc=True)
+	assert read_members('tree.zip') == {**tree, 'tree/a.txt': b'ALPHA' * 100}
@@ -0,0 +1,84 @@
+import os
+import shutil
+
+import pytest
+
+from disk import Path
+
+from .test_zip import make_tree
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	make_tree('tree')
+	return Path('tree')
+
+
+def relative(paths):
+	return [x.get_relative_path(directory=Path('tree')).replace(os.sep, '/') for x in paths]
+
+
+def test_walk_is_top_down_and_sorted(tree):
+	# like Path.list, directories come before files
+	assert relative(tree.walk()) == ['b', 'b/d', 'b/d/e.txt', 'b/c.bin', 'f', 'f/g.txt', 'a.txt']
+	assert sorted(relative(tree.walk(sort=False))) == sorted(relative(tree.walk()))
+	assert relative(tree.iter_files()) == ['b/d/e.txt', 'b/c.bin', 'f/g.txt', 'a.txt']
+	assert relative(tree.walk(files=False)) == ['b', 'b/d', 'f']
+
+
+@pytest.mark.parametrize('sort', [True, False])
+def test_max_depth(tree, sort):
+	assert sorted(relative(tree.walk(max_depth=1, sort=sort))) == ['a.txt', 'b', 'f']
+	assert sorted(relative(tree.walk(max_depth=2, sort=sort))) == ['a.txt', 'b', 'b/c.bin', 'b/d', 'f', 'f/g.txt']
+	assert list(tree.walk(max_depth=0, sort=sort)) == []
+	assert sorted(relative(tree.iter_files(max_depth=2, sort=sort))) == ['a.txt', 'b/c.bin', 'f/g.txt']
+
+
+def test_include_and_exclude(tree):
+	# include only filters what is yielded, the directories are still walked into
+	assert relative(tree.walk(include=lambda x: x.extension == 'txt')) == ['b/d/e.txt', 'f/g.txt', 'a.txt']
+	# exclude skips a directory with everything under it
+	assert relative(tree.walk(exclude=lambda x: x.name_and_extension == 'b')) == ['f', 'f/g.txt', 'a.txt']
+	assert relative(tree.iter_files(
+		include=lambda x: x.extension == 'txt', exclude=lambda x: x.name_and_extension == 'd'
+	)) == ['f/g.txt', 'a.txt']
+
+
+def test_walked_paths_know_their_type(tree):
+	paths = list(tree.walk())
+	# the type comes from os.scandir, so it is known even after the tree is gone
+	shutil.rmtree('tree')
+	assert [x.type for x in paths] == ['directory', 'directory', 'file', 'file', 'directory', 'file', 'file']
+
+
+def test_symbolic_links_are_only_walked_into_if_asked(tree):
+	os.symlink(os.path.abspath(os.path.join('tree', 'f')), os.path.join('tree', 'b', 'link'))
+	assert 'b/link/g.txt' not in relative(tree.walk())
+	assert 'b/link' in relative(tree.walk())
+	assert 'b/link/g.txt' in relative(tree.walk(follow_symlinks=True))
+
+
+@pytest.mark.parametrize('sort', [True, False])
+def test_on_error(tree, monkeypatch, sort):
+	iterate_children = Path._iterate_children
+
+	def fail_for_b(path):
+		if path.name_and_extension == 'b':
+			raise PermissionError(13, 'Permission denied', path.path)
+		yield from iterate_children(path)
+
+	monkeypatch.setattr(Path, '_iterate_children', fail_for_b)
+	with pytest.raises(PermissionError):
+		list(tree.walk(sort=sort))
+
+	errors = []
+	assert sorted(relative(tree.walk(sort=sort, on_error=errors.append))) == ['a.txt', 'b', 'f', 'f/g.txt']
+	assert len(errors) == 1 and isinstance(errors[0], PermissionError)
+
+
+def test_a_walk_that_is_stopped_closes_its_directories(tree):
+	walker = tree.walk(sort=False)
+	next(walker)
+	walker.close()
+	assert list(walker) == []
@@ -0,0 +1,180 @@
+import ctypes
+import errno
+import importlib
+import os
+import time
+
+import pytest
+
+from disk import ChangeEvent
+from disk import Watcher
+
+watcher_module = importlib.import_module('disk.Watcher')
+
+METHODS = [Watcher.POLLING] + ([Watcher.INOTIFY] if watcher_module.is_inotify_available() else [])
+needs_inotify = pytest.mark.skipif(not watcher_module.is_inotify_available(), reason='inotify is not available')
+
+
+def write(path, data=b'data'):
+	with open(path, 'wb') as file:
+		file.write(data)
+
+
+def collect(watcher, until, timeout=5):
+	"""
+	polls until the events include every event in until
+	"""
+	events = []
+	deadline = time.monotonic() + timeout
+	while not set(until) <= set(events) and time.monotonic() < deadline:
+		events.extend(watcher.poll(timeout=0.05))
+	return events
+
+
+@pytest.fixture
+def root(tmp_path):
+	(tmp_path / 'root' / 'sub').mkdir(parents=True)
+	write(str(tmp_path / 'root' / 'existing.txt'))
+	return str(tmp_path / 'root')
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_create_modify_and_delete(root, method):
+	watcher = Watcher(root, method=method)
+	try:
+		assert watcher.method == method
+		assert watcher.poll() == []
+
+		new_file = os.path.join(root, 'sub', 'new.txt')
+		write(new_file)
+		created = ChangeEvent(kind=ChangeEvent.CREATED, path=new_file)
+		assert created in collect(watcher, until=[created])
+
+		existing = os.path.join(root, 'existing.txt')
+		# a different size is seen even where modification times are coarse
+		write(existing, b'modified data')
+		modified = ChangeEvent(kind=ChangeEvent.MODIFIED, path=existing)
+		assert modified in collect(watcher, until=[modified])
+
+		os.remove(new_file)
+		deleted = ChangeEvent(kind=ChangeEvent.DELETED, path=new_file)
+		assert deleted in collect(watcher, until=[deleted])
+	finally:
+		watcher.close()
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_entries_of_new_directories_are_reported(root, method):
+	watcher = Watcher(root, method=method)
+	try:
+		directory = os.path.join(root, 'new')
+		os.makedirs(os.path.join(directory, 'inner'))
+		write(os.path.join(directory, 'inner', 'file.txt'))
+		expected = [
+			ChangeEvent(kind=ChangeEvent.CREATED, path=directory, is_directory=True),
+			ChangeEvent(kind=ChangeEvent.CREATED, path=os.path.join(directory, 'inner', 'file.txt')),
+		]
+		assert set(expected) <= set(collect(watcher, until=expected))
+	finally:
+		watcher.close()
+
+
+def test_subscribers_on_the_background_thread(root):
+	received = []
+	with Watcher(root, interval=0.02, method=Watcher.POLLING) as watcher:
+		watcher.subscribe(received.append)
+		assert watcher.is_running
+		write(os.path.join(root, 'background.txt'))
+		deadline = time.monotonic() + 5
+		while not received and time.monotonic() < deadline:
+			time.sleep(0.01)
+	assert not watcher.is_running
+	assert received == [ChangeEvent(kind=ChangeEvent.CREATED, path=os.path.join(root, 'background.txt'))]
+
+
+def test_unsubscribe(root):
+	received = []
+	watcher = Watcher(root, method=Watcher.POLLING)
+	watcher.subscribe(received.append)
+	watcher.unsubscribe(received.append)
+	write(os.path.join(root, 'file.txt'))
+	assert len(watcher.poll()) == 1
+	assert received == []
+
+
+def test_on_error_receives_subscriber_errors(root):
+	errors = []
+	received = []
+	watcher = Watcher(root, method=Watcher.POLLING, on_error=lambda event, error: errors.append((event, error)))
+
+	def fail(event):
+		raise RuntimeError(f'cannot handle {event.path}')
+
+	watcher.subscribe(fail)
+	watcher.subscribe(received.append)
+	write(os.path.join(root, 'file.txt'))
+	events = watcher.poll()
+
+	assert len(events) == 1
+	# the other subscribers still receive the event
+	assert received == events
+	assert [event for event, _ in errors] == events
+	assert isinstance(errors[0][1], RuntimeError)
+
+
+def test_subscriber_errors_without_on_error(root):
+	watcher = Watcher(root, interval=0.02, method=Watcher.POLLING)
+	watcher.subscribe(lambda event: 1 / 0)
+	write(os.path.join(root, 'file.txt'))
+	with pytest.raises(ZeroDivisionError):
+		watcher.poll()
+
+	# on the background thread, nobody could catch it, so it is a warning
+	with pytest.warns(UserWarning, match='ZeroDivisionError'):
+		with watcher:
+			write(os.path.join(root, 'other.txt'))
+			time.sleep(0.3)
+
+
+def test_unknown_method(root):
+	with pytest.raises(ValueError):
+		Watcher(root, method='fanotify')
+
+
+def test_concerns():
+	file_event = ChangeEvent(kind=ChangeEvent.MODIFIED, path='/a/foo/file.txt')
+	assert file_event.concerns('/a/foo/file.txt')
+	assert file_event.concerns('/a/foo')
+	assert file_event.concerns('/a/')
+	assert not file_event.concerns('/a/foobar')
+	assert not file_event.concerns('/a/foo/file.txt/inner')
+	assert file_event.parent_directory == '/a/foo'
+
+	directory_event = ChangeEvent(kind=ChangeEvent.DELETED, path='/a/foo', is_directory=True)
+	assert directory_event.concerns('/a/foo/file.txt')
+	assert directory_event.concerns('/a')
+	assert not directory_event.concerns('/a/foobar/file.txt')
+
+
+@needs_inotify
+def test_directories_beyond_the_watch_limit_are_polled(root, monkeypatch):
+	add_watch = watcher_module._libc.inotify_add_watch
+	error_numbers = []
+
+	def add_watch_up_to_the_limit(fd, path, mask):
+		if os.fsdecode(path).endswith('sub'):
+			error_numbers.append(errno.ENOSPC)
+			return -1
+		return add_watch(fd, path, mask)
+
+	monkeypatch.setattr(watcher_module._libc, 'inotify_add_watch', add_watch_up_to_the_limit)
+	monkeypatch.setattr(ctypes, 'get_errno', lambda: error_numbers.pop() if error_numbers else 0)
+	with pytest.warns(UserWarning, match='polled'):
+		watcher = Watcher(root, method=Watcher.INOTIFY)
+	try:
+		path = os.path.join(root, 'sub', 'file.txt')
+		write(path)
+		created = ChangeEvent(kind=ChangeEvent.CREATED, path=path)
+		assert created in collect(watcher, until=[created])
+	finally:
+		watcher.close()
@@ -0,0 +1,128 @@
+import gc
+import os
+import time
+import weakref
+
+import pytest
+
+from disk import Writer
+
+
+def read(path):
+	with open(path, 'rb') as file:
+		return file.read()
+
+
+# writing to /dev/full always fails with ENOSPC, like a disk that is full
+DEVICE_FULL = '/dev/full'
+needs_device_full = pytest.mark.skipif(not os.path.exists(DEVICE_FULL), reason=f'{DEVICE_FULL} is missing')
+
+
+@pytest.fixture
+def path(tmp_path):
+	return str(tmp_path / 'records.txt')
+
+
+def test_writer_buffers_until_flush(path):
+	writer = Writer(path=path, buffer_size=100)
+	writer.write_line('first')
+	writer.write(b'second\n')
+	assert read(path) == b''
+	assert writer.num_records == 2
+
+	writer.flush()
+	assert read(path) == b'first\nsecond\n'
+	assert writer.num_flushes == 1
+
+	writer.flush()
+	assert writer.num_flushes == 1
+	writer.close()
+	assert writer.closed
+
+
+def test_writer_flushes_full_buffers(path):
+	writer = Writer(path=path, buffer_size=10)
+	writer.write('12345')
+	assert read(path) == b''
+	writer.write('67890')
+	assert read(path) == b'1234567890'
+	writer.close()
+
+
+def test_writer_close_writes_the_rest(path):
+	with Writer(path=path) as writer:
+		writer.write_lines(['a\n', b'b\n', 'c\n'])
+	assert writer.closed
+	assert read(path) == b'a\nb\nc\n'
+
+	writer.close()
+	with pytest.raises(ValueError):
+		writer.write('d')
+
+
+def test_writer_append(path):
+	with Writer(path=path) as writer:
+		writer.write_line('first')
+	with Writer(path=path, append=True, fsync='close') as writer:
+		writer.write_line('second')
+	assert read(path) == b'first\nsecond\n'
+
+	with Writer(path=path, fsync='flush') as writer:
+		writer.write_line('third')
+	assert read(path) == b'third\n'
+
+
+def test_writer_rejects_unknown_fsync(path):
+	with pytest.raises(ValueError):
+		Writer(path=path, fsync='always')
+
+
+@needs_device_full
+def test_writer_keeps_records_that_were_not_written():
+	writer = Writer(path=DEVICE_FULL, append=True)
+	writer.write('abcdefgh')
+
+	with pytest.raises(OSError):
+		writer.flush()
+	# the records are still there, so they are tried again and the file is not closed without them
+	with pytest.raises(OSError):
+		writer.close()
+	assert not writer.closed
+	assert writer.num_flushes == 0
+	# a writer that cannot write is dropped, its __del__ ignores the error
+	del writer
+	gc.collect()
+
+
+def test_writer_flushes_in_the_background(path):
+	writer = Writer(path=path, buffer_size=2 ** 20, flush_interval=0.05)
+	writer.write_line('idle')
+	deadline = time.monotonic() + 5
+	while read(path) == b'' and time.monotonic() < deadline:
+		time.sleep(0.01)
+	assert read(path) == b'idle\n'
+	writer.close()
+
+
+@needs_device_full
+def test_writer_raises_background_errors():
+	writer = Writer(path=DEVICE_FULL, append=True, buffer_size=2 ** 20, flush_interval=0.01)
+	writer.write('lost')
+	time.sleep(0.2)
+
+	with pytest.raises(OSError):
+		writer.write('next')
+	assert writer.num_records == 1
+	del writer
+	gc.collect()
+
+
+def test_writers_that_are_not_closed_are_collected(path):
+	writer = Writer(path=path, flush_interval=60)
+	writer.write_line('kept')
+	reference = weakref.ref(writer)
+	del writer
+	gc.collect()
+
+	assert reference() is None
+	assert read(path) == b'kept\n'
@@ -0,0 +1,116 @@
+import importlib
+import os
+import sys
+import tempfile
+import zipfile
+
+import pytest
+
+from disk import zip_directory
+from disk import zip_file
+
+zip_module = importlib.import_module('disk.zip')
+
+COMPRESSIONS = [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2, zipfile.ZIP_LZMA]
+
+
+def make_tree(root):
+	files = {
+		'a.txt': b'alpha' * 100,
+		'b/c.bin': os.urandom(5000),
+		'b/d/e.txt': b'',
+		'f/g.txt': b'gamma\n' * 1000
+	}
+	for name, data in files.items():
+		path = os.path.join(root, *name.split('/'))
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		with open(path, 'wb') as file:
+			file.write(data)
+	return {f'{root}/{name}': data for name, data in files.items()}
+
+
+def read_members(zip_path):
+	with zipfile.ZipFile(zip_path) as archive:
+		assert archive.testzip() is None
+		return {info.filename: archive.read(info) for info in archive.infolist()}
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	return make_tree('tree')
+
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_zip_directory_round_trip(tree, compression):
+	zip_directory(path='tree', zip_path='tree.zip', compression=compression, num_workers=3)
+	assert read_members('tree.zip') == tree
+	with zipfile.ZipFile('tree.zip') as archive:
+		assert archive.namelist() == sorted(tree)
+		assert all(info.compress_type == compression for info in archive.infolist())
+
+
+@pytest.mark.parametrize('use_processes', [False, True])
+def test_the_same_tree_gives_the_same_archive(tree, use_processes):
+	zip_directory(path='tree', zip_path='first.zip', use_processes=use_processes)
+	zip_directory(path='tree', zip_path='second.zip', num_workers=1)
+	with open('first.zip', 'rb') as first, open('second.zip', 'rb') as second:
+		assert first.read() == second.read()
+
+
+def test_compression_level(tree):
+	zip_directory(path='tree', zip_path='fast.zip', compression_level=1)
+	zip_directory(path='tree', zip_path='small.zip', compression_level=9)
+	assert read_members('fast.zip') == read_members('small.zip') == tree
+
+
+def test_large_members_are_spooled_and_removed(tree, tmp_path, monkeypatch):
+	spool_directory = tmp_path / 'spool'
+	spool_directory.mkdir()
+	monkeypatch.setattr(tempfile, 'tempdir', str(spool_directory))
+	monkeypatch.setattr(zip_module, '_SPOOL_SIZE', 1000)
+	for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+		zip_directory(path='tree', zip_path='tree.zip', compression=compression)
+		assert read_members('tree.zip') == tree
+	assert list(spool_directory.iterdir()) == []
+
+
+def test_spooled_members_are_removed_after_an_error(tree, tmp_path, monkeypatch):
+	spool_directory = tmp_path / 'spool'
+	spool_directory.mkdir()
+	monkeypatch.setattr(tempfile, 'tempdir', str(spool_directory))
+	monkeypatch.setattr(zip_module, '_SPOOL_SIZE', 1000)
+
+	def fail(*args, **kwargs):
+		raise OSError('disk full')
+
+	monkeypatch.setattr(zip_module, '_write_member', fail)
+	with pytest.raises(OSError):
+		zip_directory(path='tree', zip_path='tree.zip', num_workers=2)
+	assert list(spool_directory.iterdir()) == []
+
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_without_zip_file_internals(tree, monkeypatch, compression):
+	monkeypatch.setattr(zip_module, '_WRITES_RAW_MEMBERS', False)
+	zip_directory(path='tree', zip_path='tree.zip', compression=compression)
+	assert read_members('tree.zip') == tree
+
+
+@pytest.mark.skipif(sys.implementation.name != 'cpython', reason='only CPython writes members as they are')
+def test_raw_members_only_on_checked_versions(monkeypatch):
+	monkeypatch.setattr(zip_module, '_RAW_MEMBER_VERSIONS', (sys.version_info[:2], sys.version_info[:2]))
+	assert zip_module._supports_raw_members()
+	monkeypatch.setattr(zip_module, '_RAW_MEMBER_VERSIONS', ((3, 0), (3, 5)))
+	assert not zip_module._supports_raw_members()
+
+
+def test_changed_zip_file_internals_are_not_used(monkeypatch):
+	# an attribute that can no longer be set stands for internals that changed
+	monkeypatch.setattr(zipfile.ZipFile, 'start_dir', property(lambda self: 0), raising=False)
+	assert not zip_module._supports_raw_members()
+
+
+def test_zip_file(tree):
+	zip_file(path='tree/a.txt', zip_path='a.zip', compression_level=None)
+	assert read_members('a.zip') == {'tree/a.txt': tree['tree/a.txt']}